@@ -0,0 +1,99 @@
+"""adding foreign key and soft delete indexes
+
+Revision ID: 97aae39ee5c7
+Revises: 6a9a01e77bef
+Create Date: 2026-10-17 20:39:24.949154
+
+Indexes are built CONCURRENTLY, outside the migration transaction, so the
+tables stay writable while they build. A concurrent build that fails leaves
+an INVALID index behind; drop it before running the upgrade again.
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "97aae39ee5c7"
+down_revision = "6a9a01e77bef"
+branch_labels = None
+depends_on = None
+
+LIVE = sa.text("is_deleted = false")
+
+# (name, table, columns, extra index options)
+INDEXES = [
+    # Foreign keys
+    ("ix_projectmetadata_project_id", "projectmetadata", ["project_id"], {}),
+    ("ix_projectrule_project_id", "projectrule", ["project_id"], {}),
+    (
+        "ix_projectobjective_project_id",
+        "projectobjective",
+        ["project_id"],
+        {"postgresql_include": ["id", "physicalQuantity", "valueMin", "valueMax"]},
+    ),
+    ("ix_projectdeliverable_project_id", "projectdeliverable", ["project_id"], {}),
+    ("ix_projectconstraint_project_id", "projectconstraint", ["project_id"], {}),
+    ("ix_projectattachment_project_id", "projectattachment", ["project_id"], {}),
+    ("ix_realcondition_test_id", "realcondition", ["test_id"], {}),
+    ("ix_reading_test_id", "reading", ["test_id"], {}),
+    ("ix_vlreading_test_id", "vlreading", ["test_id"], {}),
+    (
+        "ix_testtemplategeneralinfo_test_template_id",
+        "testtemplategeneralinfo",
+        ["test_template_id"],
+        {},
+    ),
+    (
+        "ix_testtemplatecondition_test_template_id",
+        "testtemplatecondition",
+        ["test_template_id"],
+        {},
+    ),
+    (
+        "ix_testtemplatereading_test_template_id",
+        "testtemplatereading",
+        ["test_template_id"],
+        {},
+    ),
+    (
+        "ix_objecttemplaterule_object_template_id",
+        "objecttemplaterule",
+        ["object_template_id"],
+        {},
+    ),
+    ("ix_attachment_object_template_id", "attachment", ["object_template_id"], {}),
+    ("ix_attachment_file_storage_id", "attachment", ["file_storage_id"], {}),
+    ("ix_attachmentlink_attachment_id", "attachmentlink", ["attachment_id"], {}),
+    # Live rows, for the list endpoints
+    ("ix_project_live", "project", ["id"], {"postgresql_where": LIVE}),
+    ("ix_test_live", "test", ["id"], {"postgresql_where": LIVE}),
+    ("ix_testtemplate_live", "testtemplate", ["id"], {"postgresql_where": LIVE}),
+    ("ix_objecttemplate_live", "objecttemplate", ["id"], {"postgresql_where": LIVE}),
+    ("ix_unitsystem_live", "unitsystem", ["id"], {"postgresql_where": LIVE}),
+    (
+        "ix_attachment_live_object_template_id",
+        "attachment",
+        ["object_template_id"],
+        {"postgresql_where": LIVE},
+    ),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                **options,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
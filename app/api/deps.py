@@ -1,17 +1,19 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from typing import Annotated
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core import security
 from app.core.config import settings
-from app.core.db import engine
+from app.core.db import engine, replica_router
 from app.models import TokenPayload, User
+from app.units.registry import UnitRegistry, unit_registry
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
@@ -23,10 +25,28 @@ def get_db() -> Generator[Session, None, None]:
         yield session
 
 
+async def get_async_db(request: Request, response: Response) -> AsyncGenerator[AsyncSession, None]:
+    # Read-only requests may be served by the replica; see app.core.replica
+    engine = await replica_router.engine_for(request, response)
+    # Objects stay loaded after commit; lazy loads can't happen outside a query
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+
+
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
+# Sync on purpose: rebuilding a stale registry is CPU-bound and holds a
+# thread lock, so it runs in the thread pool, also for async routes
+def get_unit_registry(session: SessionDep) -> UnitRegistry:
+    return unit_registry.get(session)
+
+
+RegistryDep = Annotated[UnitRegistry, Depends(get_unit_registry)]
+
+
 def get_current_user(session: SessionDep, token: TokenDep) -> User:
     try:
         payload = jwt.decode(
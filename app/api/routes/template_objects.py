@@ -1,19 +1,27 @@
 
 from uuid import UUID
 from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 from datetime import datetime, timezone
-from app.api.deps import  SessionDep
+from app.api.deps import  AsyncSessionDep
+from app.core.soft_delete import soft_delete
 from fastapi import status
 from typing import List
 from app.models import ObjectTemplate, ObjectTemplateRule, AttachmentFileStorage, Attachment , AttachmentLink
 
 router = APIRouter(prefix="/template_objects", tags=["Template objects"])
 
+# Everything ObjectTemplate.Read serializes, loaded up front: async sessions can't lazy load
+READ_OPTIONS = [
+    selectinload(ObjectTemplate.rules),
+    selectinload(ObjectTemplate.attachments).selectinload(Attachment.file_storage),
+]
+
 @router.post("/", response_model=ObjectTemplate.Create, status_code=status.HTTP_201_CREATED)
-def create_template_object(
+async def create_template_object(
     template_object: ObjectTemplate.Create,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
     db_obj = ObjectTemplate(
         name=template_object.name,
@@ -30,7 +38,7 @@ def create_template_object(
         is_deleted=False
     )
     session.add(db_obj)
-    session.flush()  
+    await session.flush()  
     
     if template_object.rules:
         for rule_data in template_object.rules:
@@ -61,84 +69,82 @@ def create_template_object(
             session.add(attachment)
 
     session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
-    return db_obj
+    await session.commit()
+    return await session.get(
+        ObjectTemplate, db_obj.id, options=READ_OPTIONS, populate_existing=True
+    )
 
 @router.get("/", response_model=List[ObjectTemplate.Read])
-def read_template_objects(
-    session: SessionDep,
+async def read_template_objects(
+    session: AsyncSessionDep,
 ):
-    statement = select(ObjectTemplate).where(
-        ObjectTemplate.is_deleted == False
-    )
-    results = session.exec(statement).all()
+    statement = select(ObjectTemplate).options(*READ_OPTIONS)
+    results = (await session.exec(statement)).all()
     return results
 
 @router.get("/{template_object_id}", response_model=ObjectTemplate.Read)
-def read_template_object(
+async def read_template_object(
     template_object_id: UUID,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    template_object = session.get(ObjectTemplate, template_object_id)
-    if not template_object or template_object.is_deleted:
+    template_object = await session.get(ObjectTemplate, template_object_id, options=READ_OPTIONS)
+    if not template_object:
         raise HTTPException(status_code=404, detail="TemplateObject not found")
     return template_object
 
 @router.patch("/{template_object_id}", response_model=ObjectTemplate.Read)
-def update_template_object(
+async def update_template_object(
     template_object_id: UUID,
     template_object_update: ObjectTemplate.Update,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    db_obj = session.get(ObjectTemplate, template_object_id)
+    db_obj = await session.get(ObjectTemplate, template_object_id, options=READ_OPTIONS)
     if not db_obj:
         raise HTTPException(status_code=404, detail="TemplateObject not found")
     update_data = template_object_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_obj, key, value)
     session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
+    await session.commit()
+    await session.refresh(db_obj)
     return db_obj
 
 @router.delete("/{template_object_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_template_object(
+async def delete_template_object(
     template_object_id: UUID,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    db_obj = session.get(ObjectTemplate, template_object_id)
+    db_obj = await session.get(ObjectTemplate, template_object_id)
     if not db_obj:
         raise HTTPException(status_code=404, detail="TemplateObject not found")
-    db_obj.is_deleted= True 
+    soft_delete(db_obj)
     session.add(db_obj)
-    session.commit()
+    await session.commit()
 
 @router.get("/{template_object_id}/attachments", response_model=List[Attachment.Read])
-def get_template_object_attachments(
+async def get_template_object_attachments(
     template_object_id: UUID,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    db_obj = session.get(ObjectTemplate, template_object_id)
-    if not db_obj or db_obj.is_deleted:
+    db_obj = await session.get(ObjectTemplate, template_object_id)
+    if not db_obj:
         raise HTTPException(status_code=404, detail="TemplateObject not found")
     
-    attachments = session.exec(
+    attachments = (await session.exec(
         select(Attachment).where(
-            Attachment.object_template_id == template_object_id,
-            Attachment.is_deleted == False
-        )
-    ).all()
+            Attachment.object_template_id == template_object_id
+        ).options(selectinload(Attachment.file_storage))
+    )).all()
     
     return attachments
 @router.post("/{template_object_id}/attachments", response_model=Attachment.Read)
-def add_attachment_to_template_object(
+async def add_attachment_to_template_object(
     template_object_id: UUID,
     attachment_data: Attachment.Create,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    db_obj = session.get(ObjectTemplate, template_object_id)
-    if not db_obj or db_obj.is_deleted:
+    db_obj = await session.get(ObjectTemplate, template_object_id)
+    if not db_obj:
         raise HTTPException(status_code=404, detail="TemplateObject not found")
     file_storage_id = None
     if attachment_data.file_storage:
@@ -148,7 +154,7 @@ def add_attachment_to_template_object(
             bucket=attachment_data.file_storage.bucket
         )
         session.add(file_storage_obj)
-        session.flush()  
+        await session.flush()  
         file_storage_id = file_storage_obj.id
 
     attachment = Attachment(
@@ -165,21 +171,23 @@ def add_attachment_to_template_object(
     )
 
     session.add(attachment)
-    session.commit()
-    session.refresh(attachment)
+    await session.commit()
+    await session.refresh(attachment)
 @router.patch("/{template_object_id}/attachments/{attachment_id}", response_model=Attachment.Read)
-def update_attachment_of_template_object(
+async def update_attachment_of_template_object(
     template_object_id: UUID,
     attachment_id: UUID,
     attachment_update: Attachment.Update,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    db_obj = session.get(ObjectTemplate, template_object_id)
-    if not db_obj or db_obj.is_deleted:
+    db_obj = await session.get(ObjectTemplate, template_object_id)
+    if not db_obj:
         raise HTTPException(status_code=404, detail="TemplateObject not found")
 
-    attachment = session.get(Attachment, attachment_id)
-    if not attachment or attachment.is_deleted or attachment.object_template_id != template_object_id:
+    attachment = await session.get(
+        Attachment, attachment_id, options=[selectinload(Attachment.file_storage)]
+    )
+    if not attachment or attachment.object_template_id != template_object_id:
         raise HTTPException(status_code=404, detail="Attachment not found")
 
     update_data = attachment_update.dict(exclude_unset=True)
@@ -187,7 +195,7 @@ def update_attachment_of_template_object(
     if "file_storage" in update_data and update_data["file_storage"]:
         file_storage_data = update_data.pop("file_storage")
         if attachment.file_storage_id:
-            file_storage_obj = session.get(AttachmentFileStorage, attachment.file_storage_id)
+            file_storage_obj = await session.get(AttachmentFileStorage, attachment.file_storage_id)
             if file_storage_obj:
                 for key, value in file_storage_data.items():
                     setattr(file_storage_obj, key, value)
@@ -195,13 +203,13 @@ def update_attachment_of_template_object(
         else:
             file_storage_obj = AttachmentFileStorage(**file_storage_data)
             session.add(file_storage_obj)
-            session.flush()
+            await session.flush()
             attachment.file_storage_id = file_storage_obj.id
 
     for key, value in update_data.items():
         setattr(attachment, key, value)
 
     session.add(attachment)
-    session.commit()
-    session.refresh(attachment)
+    await session.commit()
+    await session.refresh(attachment)
     return attachment
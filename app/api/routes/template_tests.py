@@ -1,23 +1,32 @@
 
 from uuid import UUID
 from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 from datetime import datetime, timezone
-from app.api.deps import  SessionDep
+from app.api.deps import  AsyncSessionDep
+from app.core.soft_delete import soft_delete
 from app.models import TestTemplateGeneralInfo , TestTemplateCondition , TestTemplateReading , TestTemplate
 from fastapi import status
 from typing import List
 
 router = APIRouter(prefix="/template_tests", tags=["Template Tests"])
 
+# Everything TestTemplate.Read serializes, loaded up front: async sessions can't lazy load
+READ_OPTIONS = [
+    selectinload(TestTemplate.generalInfo),
+    selectinload(TestTemplate.conditions),
+    selectinload(TestTemplate.readings),
+]
+
 
 
 
 @router.get("/", response_model=List[TestTemplate.Read])
-def get_all_template_tests(session: SessionDep):
-    templates = session.exec(
-        select(TestTemplate).where(TestTemplate.is_deleted == False)
-    ).all()
+async def get_all_template_tests(session: AsyncSessionDep):
+    templates = (await session.exec(
+        select(TestTemplate).options(*READ_OPTIONS)
+    )).all()
     return templates
 
 
@@ -25,9 +34,9 @@ def get_all_template_tests(session: SessionDep):
 
 
 @router.post("/")
-def create_template_test(
+async def create_template_test(
     data: TestTemplate.Create,
-    session: SessionDep):
+    session: AsyncSessionDep):
     template = TestTemplate(
         name=data.name,
         tags=data.tags,
@@ -40,201 +49,206 @@ def create_template_test(
     )
 
     session.add(template)
-    session.commit()
-    session.refresh(template)
+    await session.commit()
+    await session.refresh(template)
     return template
 @router.put("/{template_id}", response_model=TestTemplate.Update)
-def update_template_test(
+async def update_template_test(
     template_id: UUID,
     template_in: TestTemplate.Update,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    template = session.get(TestTemplate, template_id)
-    if not template or template.is_deleted:
+    template = await session.get(TestTemplate, template_id)
+    if not template:
         raise HTTPException(status_code=404, detail="Template not found")
     for field, value in template_in.dict(exclude_unset=True).items():
         setattr(template, field, value)
     session.add(template)
-    session.commit()
-    session.refresh(template)
+    await session.commit()
+    await session.refresh(template)
     return template
 
 @router.delete("/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_template_test(
+async def delete_template_test(
     template_id: UUID,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    template = session.get(TestTemplate, template_id)
-    if not template or template.is_deleted:
+    template = await session.get(TestTemplate, template_id)
+    if not template:
         raise HTTPException(status_code=404, detail="Template not found")
-    template.is_deleted = True
-    template.deleted_at = datetime.now(timezone.utc)
+    soft_delete(template)
     session.add(template)
-    session.commit()
+    await session.commit()
 
 @router.post("/{template_id}/general_info", response_model=TestTemplateGeneralInfo)
-def add_general_info(
+async def add_general_info(
     template_id: UUID,
     general_info_in: TestTemplateGeneralInfo.Create,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    template = session.get(TestTemplate, template_id)
-    if not template or template.is_deleted:
+    template = await session.get(
+        TestTemplate, template_id, options=[selectinload(TestTemplate.generalInfo)]
+    )
+    if not template:
         raise HTTPException(status_code=404, detail="Template not found")
     general_info = TestTemplateGeneralInfo(**general_info_in.model_dump(), template_id=template_id)
     template.generalInfo = general_info
     session.add(general_info)
-    session.commit()
-    session.refresh(general_info)
+    await session.commit()
+    await session.refresh(general_info)
     return general_info
 
 @router.get("/{template_id}/general_info", response_model=TestTemplateGeneralInfo)
-def get_general_info(
+async def get_general_info(
     template_id: UUID,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    general_info = session.exec(
+    general_info = (await session.exec(
         select(TestTemplateGeneralInfo).where(TestTemplateGeneralInfo.test_template_id == template_id)
-    ).first()
+    )).first()
     if not general_info:
         raise HTTPException(status_code=404, detail="General info not found")
     return general_info
 
 @router.put("/{template_id}/general_info", response_model=TestTemplateGeneralInfo)
-def update_general_info(
+async def update_general_info(
     template_id: UUID,
     general_info_in: TestTemplateGeneralInfo.Create,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    template = session.get(TestTemplate, template_id)
-    if not template or template.is_deleted:
+    template = await session.get(TestTemplate, template_id)
+    if not template:
         raise HTTPException(status_code=404, detail="Template not found")
-    general_info = session.exec(
+    general_info = (await session.exec(
         select(TestTemplateGeneralInfo).where(TestTemplateGeneralInfo.template_id == template_id)
-    ).first()
+    )).first()
     if not general_info:
         raise HTTPException(status_code=404, detail="General info not found")
     for field, value in general_info_in.dict(exclude_unset=True).items():
         setattr(general_info, field, value)
     session.add(general_info)
-    session.commit()
-    session.refresh(general_info)
+    await session.commit()
+    await session.refresh(general_info)
     return general_info
 
 # --- Real Condition Endpoints ---
 
 @router.post("/{template_id}/conditions", response_model=TestTemplateCondition)
-def add_condition(
+async def add_condition(
     template_id: UUID,
     condition_in: TestTemplateCondition.Create,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    template = session.get(TestTemplate, template_id)
-    if not template or template.is_deleted:
+    template = await session.get(
+        TestTemplate, template_id, options=[selectinload(TestTemplate.conditions)]
+    )
+    if not template:
         raise HTTPException(status_code=404, detail="Template not found")
     condition = TestTemplateCondition(**condition_in.model_dump(), template_id=template_id)
     template.conditions.append(condition)
     session.add(condition)
-    session.commit()
-    session.refresh(condition)
+    await session.commit()
+    await session.refresh(condition)
     return condition
 
 @router.get("/{template_id}/conditions", response_model=List[TestTemplateCondition])
-def get_conditions(
+async def get_conditions(
     template_id: UUID,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    conditions = session.exec(
+    conditions = (await session.exec(
         select(TestTemplateCondition).where(TestTemplateCondition.test_template_id == template_id)
-    ).all()
+    )).all()
     return conditions
 
 @router.put("/{template_id}/conditions/{condition_id}", response_model=TestTemplateCondition)
-def update_condition(
+async def update_condition(
     template_id: UUID ,
     condition_id: UUID,
     condition_in: TestTemplateCondition.Create,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    template = session.get(TestTemplate, template_id)
-    if not template or template.is_deleted:
+    template = await session.get(TestTemplate, template_id)
+    if not template:
         raise HTTPException(status_code=404, detail="Template not found")
-    condition = session.get(TestTemplateCondition, condition_id)
+    condition = await session.get(TestTemplateCondition, condition_id)
     if not condition:
         raise HTTPException(status_code=404, detail="Condition not found")
     for field, value in condition_in.dict(exclude_unset=True).items():
         setattr(condition, field, value)
     session.add(condition)
-    session.commit()
-    session.refresh(condition)
+    await session.commit()
+    await session.refresh(condition)
     return condition
 
 @router.delete("/conditions/{condition_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_condition(
+async def delete_condition(
     condition_id: UUID,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    condition = session.get(TestTemplateCondition, condition_id)
+    condition = await session.get(TestTemplateCondition, condition_id)
     if not condition:
         raise HTTPException(status_code=404, detail="Condition not found")
-    session.delete(condition)
-    session.commit()
+    await session.delete(condition)
+    await session.commit()
 
 # --- Reading Endpoints ---
 
 @router.post("/{template_id}/readings", response_model=TestTemplateReading)
-def add_reading(
+async def add_reading(
     template_id: UUID,
     reading_in: TestTemplateReading.Create,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    template = session.get(TestTemplate, template_id)
-    if not template or template.is_deleted:
+    template = await session.get(
+        TestTemplate, template_id, options=[selectinload(TestTemplate.readings)]
+    )
+    if not template:
         raise HTTPException(status_code=404, detail="Template not found")
     reading = TestTemplateReading(**reading_in.model_dump(), template_id=template_id)
     template.readings.append(reading)
     session.add(reading)
-    session.commit()
-    session.refresh(reading)
+    await session.commit()
+    await session.refresh(reading)
     return reading
 
 @router.get("/{template_id}/readings", response_model=List[TestTemplateReading])
-def get_readings(
+async def get_readings(
     template_id: UUID,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    readings = session.exec(
+    readings = (await session.exec(
         select(TestTemplateReading).where(TestTemplateReading.test_template_id == template_id)
-    ).all()
+    )).all()
     return readings
 
 @router.put("/{template_id}/readings/{reading_id}", response_model=TestTemplateReading)
-def update_reading(
+async def update_reading(
     template_id: UUID ,
     reading_id: UUID,
     reading_in: TestTemplateReading.Create,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    template = session.get(TestTemplate, template_id)
-    if not template or template.is_deleted:
+    template = await session.get(TestTemplate, template_id)
+    if not template:
         raise HTTPException(status_code=404, detail="Template not found")
-    reading = session.get(TestTemplateReading, reading_id)
+    reading = await session.get(TestTemplateReading, reading_id)
     if not reading:
         raise HTTPException(status_code=404, detail="Reading not found")
     for field, value in reading_in.dict(exclude_unset=True).items():
         setattr(reading, field, value)
     session.add(reading)
-    session.commit()
-    session.refresh(reading)
+    await session.commit()
+    await session.refresh(reading)
     return reading
 
 @router.delete("/readings/{reading_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_reading(
+async def delete_reading(
     reading_id: UUID,
-    session: SessionDep,
+    session: AsyncSessionDep,
 ):
-    reading = session.get(TestTemplateReading, reading_id)
+    reading = await session.get(TestTemplateReading, reading_id)
     if not reading:
         raise HTTPException(status_code=404, detail="Reading not found")
-    session.delete(reading)
-    session.commit()
+    await session.delete(reading)
+    await session.commit()
@@ -1,19 +1,47 @@
 
 from uuid import UUID
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Annotated, Literal
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from pydantic_core import to_json
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime, timezone
-from app.api.deps import  SessionDep
-from app.models import UnitSystemCreate, UnitSystemRead, UnitSystemUpdate ,PhysicalQuantity  , UnitSystem , Unit ,  LinearUnit , FunctionalUnit
+import numpy as np
+from app.api.deps import  AsyncSessionDep, RegistryDep
+from app.core.config import settings
+from app.core.soft_delete import soft_delete
+from app.models import UnitSystemCreate, UnitSystemRead, UnitSystemUpdate ,PhysicalQuantity  , UnitSystem , Unit ,  LinearUnit , FunctionalUnit , ConversionBatch , ConversionBatchResult , ExactConversionBatch , ExactConversionBatchResult , UnitSearchResult , TabulatedUnit , UnitSystemMembers , UnitSystemMemberIds , UnitCatalog , UnitCatalogImportReport , UnitCatalogHashes , UnitCatalogDiff , UnitReexpressionRequest , UnitReexpressionReport , Project , Test
+from app.units.bundle import build_bundle, encode_bundle, etag_matches
+from app.units.catalog_hash import catalog_hashes_read, diff_catalog
+from app.units.catalog_import import CatalogImportError, apply_import, lock_catalog, plan_import
+from app.units.conversion import ConversionError, UnitNotFoundError, convert
+from app.units.exact import convert_exact, parse_exact
+from app.units.formulas import FormulaError, compile_formula, formula_cache
+from app.units.membership import add_members, get_members, remove_members
+from app.units.reexpress import apply_reexpression, plan_reexpression
+from app.units.registry import UnitRegistry, bump_catalog_version
+from app.units.streaming import StreamFormatError, convert_csv, convert_ndjson, csv_error, iter_line_batches, ndjson_error
+from app.units.tabulated import TableError, validate_table
 import os 
 import yaml
 router = APIRouter(prefix="/unitsystems", tags=["UnitSystems"])
+
+# The unit collections PhysicalQuantity.Read serializes; async sessions can't lazy load them
+PHYSICAL_QUANTITY_UNITS = [
+    selectinload(PhysicalQuantity.linear_units),
+    selectinload(PhysicalQuantity.functional_units),
+    selectinload(PhysicalQuantity.tabulated_units),
+]
 # ==================================================
 
 
 # Create a new unit system
 @router.post("/")
-def create_unit_system(data: UnitSystemCreate, session: SessionDep):
+async def create_unit_system(data: UnitSystemCreate, session: AsyncSessionDep):
     # Get all linear units and functional units
 
     unit_system = UnitSystem(
@@ -23,8 +51,8 @@ def create_unit_system(data: UnitSystemCreate, session: SessionDep):
         is_deleted=False
     )
     session.add(unit_system)
-    session.commit()
-    session.refresh(unit_system)
+    await session.commit()
+    await session.refresh(unit_system)
     return unit_system
 
 
@@ -33,43 +61,70 @@ def create_unit_system(data: UnitSystemCreate, session: SessionDep):
 
 # Read all unit systems or a specific one by ID
 @router.get("/", response_model=list[UnitSystemRead])
-def read_all_unit_systems(session: SessionDep):
-    statement = select(UnitSystem).where(UnitSystem.is_deleted == False)
-    return session.exec(statement).all()
+async def read_all_unit_systems(session: AsyncSessionDep):
+    statement = select(UnitSystem)
+    return (await session.exec(statement)).all()
 
 
 
 
 @router.get("/physicalquantities", response_model=list[PhysicalQuantity.Read])
-def get_all_physical_quantities(session: SessionDep):
-    statement = select(PhysicalQuantity)
-    return session.exec(statement).all()
+async def get_all_physical_quantities(registry: RegistryDep):
+    return registry.physical_quantities()
 
 
 # ==================================================
 
-# Reading a specific unit system by ID, updating it, and soft deleting it
-@router.get("/{unitsystem_id}", response_model=UnitSystemRead)
-def read_unit_system(unitsystem_id: UUID, session: SessionDep):
-    unit = session.get(UnitSystem, unitsystem_id)
-    if not unit or unit.is_deleted:
-        raise HTTPException(status_code=404, detail="UnitSystem not found")
-    unitread = UnitSystemRead(
+async def unit_system_read(unit: UnitSystem, session: AsyncSession, registry: UnitRegistry) -> UnitSystemRead:
+    # Only this system's rows are read; quantities come from the registry snapshot
+    members = await session.run_sync(get_members, unit.id)
+    quantities = [registry.quantities_by_id[q] for q in members if q in registry.quantities_by_id]
+    quantities.sort(key=lambda q: q.quantity)
+    return UnitSystemRead(
         id=unit.id,
         name=unit.name,
         createdAt=unit.createdAt,
         updatedAt=unit.updatedAt,
         is_deleted=unit.is_deleted,
         deleted_at=unit.deleted_at,
-        physical_quantities=session.exec(
-            select(PhysicalQuantity)
-        ).all())
-    return unitread
+        physical_quantities=[q.read for q in quantities],
+        preferred_units={q: u for q, u in members.items() if u is not None},
+    )
+
+# Reading a specific unit system by ID, updating it, and soft deleting it
+@router.get("/{unitsystem_id}", response_model=UnitSystemRead)
+async def read_unit_system(unitsystem_id: UUID, session: AsyncSessionDep, registry: RegistryDep):
+    unit = await session.get(UnitSystem, unitsystem_id)
+    if not unit:
+        raise HTTPException(status_code=404, detail="UnitSystem not found")
+    return await unit_system_read(unit, session, registry)
+
+@router.get(
+    "/{unitsystem_id}/bundle",
+    responses={200: {"content": {"application/json": {}}}, 304: {"description": "Not Modified"}},
+)
+async def read_unit_system_bundle(
+    unitsystem_id: UUID, request: Request, session: AsyncSessionDep, registry: RegistryDep
+):
+    """
+    Export the unit system as a compact bundle clients can cache and convert
+    with locally; see `app.units.bundle` for the layout. Send the ETag back in
+    `If-None-Match` to get an empty 304 while the bundle is unchanged.
+    """
+    unit = await session.get(UnitSystem, unitsystem_id)
+    if not unit:
+        raise HTTPException(status_code=404, detail="UnitSystem not found")
+    members = await session.run_sync(get_members, unit.id)
+    body, etag = encode_bundle(build_bundle(registry, unit, members))
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.patch("/{unitsystem_id}", response_model=UnitSystemRead)
-def update_unit_system(unitsystem_id: UUID, data: UnitSystemUpdate, session: SessionDep):
-    unit = session.get(UnitSystem, unitsystem_id)
-    if not unit or unit.is_deleted:
+async def update_unit_system(unitsystem_id: UUID, data: UnitSystemUpdate, session: AsyncSessionDep, registry: RegistryDep):
+    unit = await session.get(UnitSystem, unitsystem_id)
+    if not unit:
         raise HTTPException(status_code=404, detail="UnitSystem not found")
     
     for key, value in data.dict(exclude_unset=True).items():
@@ -77,126 +132,457 @@ def update_unit_system(unitsystem_id: UUID, data: UnitSystemUpdate, session: Ses
     
     unit.updatedAt = datetime.now(timezone.utc)
     session.add(unit)
-    session.commit()
-    session.refresh(unit)
-    unitread = UnitSystemRead(
-    id=unit.id,
-    name=unit.name,
-    createdAt=unit.createdAt,
-    updatedAt=unit.updatedAt,
-    is_deleted=unit.is_deleted,
-    deleted_at=unit.deleted_at,
-    physical_quantities=session.exec(
-        select(PhysicalQuantity)
-    ).all())
-    return unitread
+    await session.commit()
+    await session.refresh(unit)
+    return await unit_system_read(unit, session, registry)
 
 @router.delete("/{unitsystem_id}")
-def soft_delete_unit_system(unitsystem_id: UUID, session: SessionDep):
-    unit = session.get(UnitSystem, unitsystem_id)
-    if not unit or unit.is_deleted:
+async def soft_delete_unit_system(unitsystem_id: UUID, session: AsyncSessionDep):
+    unit = await session.get(UnitSystem, unitsystem_id)
+    if not unit:
         raise HTTPException(status_code=404, detail="UnitSystem not found")
 
-    unit.is_deleted = True
-    unit.deleted_at = datetime.now(timezone.utc)
+    soft_delete(unit)
     session.add(unit)
-    session.commit()
+    await session.commit()
     return {"message": "UnitSystem soft deleted"}
 
 
 
+# Adding and removing the physical quantities of a unit system, in bulk
+@router.post("/{unitsystem_id}/physicalquantities", response_model=UnitSystemRead)
+async def add_unit_system_members(
+    unitsystem_id: UUID, data: UnitSystemMembers, session: AsyncSessionDep, registry: RegistryDep
+):
+    unit = await session.get(UnitSystem, unitsystem_id)
+    if not unit:
+        raise HTTPException(status_code=404, detail="UnitSystem not found")
+    for member in data.members:
+        quantity = registry.quantities_by_id.get(member.physicalquantity_id)
+        if quantity is None:
+            raise HTTPException(
+                status_code=404, detail=f"PhysicalQuantity {member.physicalquantity_id} not found"
+            )
+        if member.unit_id is not None and member.unit_id not in quantity.unit_ids:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Unit {member.unit_id} does not belong to PhysicalQuantity {quantity.id}",
+            )
+    await session.run_sync(add_members, unit.id, data.members)
+    unit.updatedAt = datetime.now(timezone.utc)
+    session.add(unit)
+    await session.commit()
+    await session.refresh(unit)
+    return await unit_system_read(unit, session, registry)
+
+@router.post("/{unitsystem_id}/physicalquantities/remove", response_model=UnitSystemRead)
+async def remove_unit_system_members(
+    unitsystem_id: UUID, data: UnitSystemMemberIds, session: AsyncSessionDep, registry: RegistryDep
+):
+    unit = await session.get(UnitSystem, unitsystem_id)
+    if not unit:
+        raise HTTPException(status_code=404, detail="UnitSystem not found")
+    await session.run_sync(remove_members, unit.id, data.physicalquantity_ids)
+    unit.updatedAt = datetime.now(timezone.utc)
+    session.add(unit)
+    await session.commit()
+    await session.refresh(unit)
+    return await unit_system_read(unit, session, registry)
+
+@router.post("/{unitsystem_id}/reexpress", response_model=UnitReexpressionReport)
+async def reexpress_in_unit_system(
+    unitsystem_id: UUID,
+    data: UnitReexpressionRequest,
+    session: AsyncSessionDep,
+    registry: RegistryDep,
+    dry_run: bool = False,
+):
+    """
+    Convert the objectives of the given projects, and the real conditions and
+    readings of the given tests, to the units this system prefers, in one
+    transaction. Each row's unit is its `physicalQuantity`. With `dry_run`,
+    only return the converted values.
+    """
+    unit = await session.get(UnitSystem, unitsystem_id)
+    if not unit:
+        raise HTTPException(status_code=404, detail="UnitSystem not found")
+    for model, ids, label in ((Project, data.project_ids, "Project"), (Test, data.test_ids, "Test")):
+        if not ids:
+            continue
+        found = set(
+            (await session.exec(
+                select(model.id).where(model.id.in_(ids))
+            )).all()
+        )
+        missing = [i for i in ids if i not in found]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"{label} {missing[0]} not found")
+
+    plan = await session.run_sync(
+        plan_reexpression, registry, unit.id, data.project_ids, data.test_ids
+    )
+    if not dry_run and plan.rows:
+        await session.run_sync(apply_reexpression, plan, datetime.now(timezone.utc))
+        await session.commit()
+    return plan.report(dry_run)
+
 @router.delete("/physicalquantities/{pq_id}", status_code=204)
-def delete_physical_quantity(pq_id: UUID, session: SessionDep):
-    pq = session.get(PhysicalQuantity, pq_id)
+async def delete_physical_quantity(pq_id: UUID, session: AsyncSessionDep):
+    pq = await session.get(PhysicalQuantity, pq_id)
     if not pq:
         raise HTTPException(status_code=404, detail="PhysicalQuantity not found")
-    session.delete(pq)
-    session.commit()
+    await session.delete(pq)
+    await session.run_sync(bump_catalog_version)
+    await session.commit()
 
 @router.patch("/physicalquantities/{pq_id}", response_model=PhysicalQuantity.Read)
-def update_physical_quantity(pq_id: UUID, data: PhysicalQuantity.Create, session: SessionDep):
-    pq = session.get(PhysicalQuantity, pq_id)
+async def update_physical_quantity(pq_id: UUID, data: PhysicalQuantity.Create, session: AsyncSessionDep):
+    pq = await session.get(PhysicalQuantity, pq_id, options=PHYSICAL_QUANTITY_UNITS)
     if not pq:
         raise HTTPException(status_code=404, detail="PhysicalQuantity not found")
     for key, value in data.dict(exclude_unset=True).items():
         setattr(pq, key, value)
     session.add(pq)
-    session.commit()
-    session.refresh(pq)
+    await session.run_sync(bump_catalog_version)
+    await session.commit()
+    await session.refresh(pq)
     return pq
 
 @router.post("/physicalquantities/{pq_id}/addlinearunit", response_model=LinearUnit.Create)
-def add_linear_unit_to_physical_quantity(
+async def add_linear_unit_to_physical_quantity(
     pq_id: UUID,
     unit_data: LinearUnit.Create,
-    session: SessionDep
+    session: AsyncSessionDep
 ):
-    pq = session.get(PhysicalQuantity, pq_id)
+    pq = await session.get(
+        PhysicalQuantity, pq_id, options=[selectinload(PhysicalQuantity.linear_units)]
+    )
     if not pq:
         raise HTTPException(status_code=404, detail="PhysicalQuantity not found")
+    now = datetime.now(timezone.utc)
     unit = LinearUnit(
         name=unit_data.name,
         value=unit_data.value,
         base = unit_data.base , 
         factorToBase=unit_data.factorToBase,
+        aliases=unit_data.aliases,
+        createdAt=now,
+        updatedAt=now,
     )
     session.add(unit)
-    session.commit()
-    session.refresh(unit)
+    await session.commit()
+    await session.refresh(unit)
 
     pq.linear_units.append(unit)
     session.add(pq)
-    session.commit()
-    session.refresh(pq)
+    await session.run_sync(bump_catalog_version)
+    await session.commit()
+    await session.refresh(pq)
     return unit 
 
 @router.post("/physicalquantities/{pq_id}/addfunctionalunit", response_model=FunctionalUnit.Create)
-def add_functional_unit_to_physical_quantity(
+async def add_functional_unit_to_physical_quantity(
     pq_id: UUID,
     unit_data: FunctionalUnit.Create,
-    session: SessionDep
+    session: AsyncSessionDep
 ):
-    pq = session.get(PhysicalQuantity, pq_id)
+    pq = await session.get(
+        PhysicalQuantity, pq_id, options=[selectinload(PhysicalQuantity.functional_units)]
+    )
     if not pq:
         raise HTTPException(status_code=404, detail="PhysicalQuantity not found")
+    # Reject formulas that can't be compiled before they reach the catalog
+    try:
+        compile_formula(unit_data.toBase)
+        compile_formula(unit_data.fromBase)
+    except FormulaError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    now = datetime.now(timezone.utc)
     unit = FunctionalUnit(
         name=unit_data.name,
         value=unit_data.value,
         base = unit_data.base , 
         toBase=unit_data.toBase,
         fromBase=unit_data.fromBase,
+        aliases=unit_data.aliases,
+        createdAt=now,
+        updatedAt=now,
     )
     session.add(unit)
-    session.commit()
-    session.refresh(unit)
+    await session.commit()
+    await session.refresh(unit)
+    formula_cache.invalidate(unit.id)
 
     pq.functional_units.append(unit)
     session.add(pq)
-    session.commit()
-    session.refresh(pq)
+    await session.run_sync(bump_catalog_version)
+    await session.commit()
+    await session.refresh(pq)
+    return unit
+
+@router.post("/physicalquantities/{pq_id}/addtabulatedunit", response_model=TabulatedUnit.Create)
+async def add_tabulated_unit_to_physical_quantity(
+    pq_id: UUID,
+    unit_data: TabulatedUnit.Create,
+    session: AsyncSessionDep
+):
+    pq = await session.get(
+        PhysicalQuantity, pq_id, options=[selectinload(PhysicalQuantity.tabulated_units)]
+    )
+    if not pq:
+        raise HTTPException(status_code=404, detail="PhysicalQuantity not found")
+    try:
+        validate_table(unit_data.unitPoints, unit_data.basePoints)
+    except TableError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    now = datetime.now(timezone.utc)
+    unit = TabulatedUnit(
+        name=unit_data.name,
+        value=unit_data.value,
+        base=unit_data.base,
+        unitPoints=unit_data.unitPoints,
+        basePoints=unit_data.basePoints,
+        aliases=unit_data.aliases,
+        createdAt=now,
+        updatedAt=now,
+    )
+    session.add(unit)
+    pq.tabulated_units.append(unit)
+    session.add(pq)
+    await session.run_sync(bump_catalog_version)
+    await session.commit()
+    await session.refresh(unit)
     return unit
 
-@router.post("/addphysicalquantities")
-def add_physical_quantities_from_yaml(session: SessionDep):
+async def parse_conversion_batch(request: Request) -> ConversionBatch:
+    # Validating the raw bytes skips the intermediate json.loads, which is the
+    # slowest step for bodies holding millions of floats
+    try:
+        return ConversionBatch.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+
+@router.post(
+    "/convert/batch",
+    response_model=ConversionBatchResult,
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": ConversionBatch.model_json_schema()}},
+            "required": True,
+        }
+    },
+)
+def convert_batch(
+    data: Annotated[ConversionBatch, Depends(parse_conversion_batch)],
+    registry: RegistryDep,
+):
+    """
+    Convert an array of values from one unit to another in a single NumPy pass.
+    Either unit may be a compound expression of catalog units, e.g. `km/h` or `kg*m/s^2`.
+    Results that are not finite numbers (`log` of a negative value, overflow)
+    come back as null.
+
+    Throughput target: 3 million values per second end to end (JSON in and out)
+    for requests of up to `UNIT_BATCH_MAX_VALUES` values; the conversion itself
+    runs at over 100 million values per second.
+    """
+    if len(data.values) > settings.UNIT_BATCH_MAX_VALUES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.UNIT_BATCH_MAX_VALUES} values can be converted per request",
+        )
+    try:
+        converted = convert(
+            registry, np.asarray(data.values, dtype=np.float64), data.source, data.target
+        )
+    except UnitNotFoundError as e:
+        side = "Source" if e.reference == data.source else "Target"
+        raise HTTPException(status_code=404, detail=f"{side} unit not found")
+    except ConversionError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    # Serialize directly instead of re-validating millions of floats through the response model
+    content = {"source": data.source, "target": data.target, "values": converted.tolist()}
+    return Response(content=to_json(content, inf_nan_mode="null"), media_type="application/json")
+
+@router.post("/convert/exact", response_model=ExactConversionBatchResult)
+def convert_exact_batch(data: ExactConversionBatch, registry: RegistryDep):
+    """
+    Convert values exactly, with rational arithmetic: `0.3048` is read as
+    381/1250 and results come back as fractions. Only units with linear or
+    exactly affine conversions are supported. Slower than `/convert/batch`;
+    see `app.benchmarks.exact_conversion`.
+    """
+    if len(data.values) > settings.UNIT_EXACT_BATCH_MAX_VALUES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.UNIT_EXACT_BATCH_MAX_VALUES} values can be converted exactly per request",
+        )
+    try:
+        values = [parse_exact(value) for value in data.values]
+        converted = convert_exact(registry, values, data.source, data.target)
+    except UnitNotFoundError as e:
+        side = "Source" if e.reference == data.source else "Target"
+        raise HTTPException(status_code=404, detail=f"{side} unit not found")
+    except ConversionError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return ExactConversionBatchResult(
+        source=data.source, target=data.target, values=[str(value) for value in converted]
+    )
+
+STREAM_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+@router.post(
+    "/convert/stream",
+    response_class=StreamingResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {media_type: {"schema": {"type": "string"}} for media_type in STREAM_MEDIA_TYPES.values()},
+        }
+    },
+)
+async def convert_stream(
+    request: Request,
+    registry: RegistryDep,
+    column: str,
+    source: str,
+    target: str,
+    format: Literal["csv", "ndjson"] = "csv",
+):
+    """
+    Convert one column of an uploaded CSV (with a header row) or NDJSON file and
+    stream the converted file back. The body is read and converted
+    `UNIT_STREAM_CHUNK_ROWS` rows at a time, so files of any size run in
+    constant memory. Units and the CSV header are checked before anything is
+    sent; an error found after the first chunk ends the stream with an error
+    record: a `#error,<message>` CSV row or an `{"error": <message>}` NDJSON line.
+    """
+    def convert_values(values: np.ndarray) -> np.ndarray:
+        return convert(registry, values, source, target)
+
+    try:
+        convert_values(np.empty(0))
+    except UnitNotFoundError as e:
+        side = "Source" if e.reference == source else "Target"
+        raise HTTPException(status_code=404, detail=f"{side} unit not found")
+    except ConversionError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    batches = iter_line_batches(
+        request.stream(), settings.UNIT_STREAM_CHUNK_ROWS, settings.UNIT_STREAM_MAX_LINE_BYTES
+    )
+    converter, error_record = (
+        (convert_csv, csv_error) if format == "csv" else (convert_ndjson, ndjson_error)
+    )
+    chunks = converter(batches, column, convert_values)
+    # Convert the first chunk before answering, so a wrong column or a bad
+    # value at the top of the file still gets a proper error response
+    try:
+        first = await anext(chunks, b"")
+    except (StreamFormatError, ConversionError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    async def body():
+        yield first
+        try:
+            async for chunk in chunks:
+                yield chunk
+        except (StreamFormatError, ConversionError) as e:
+            yield error_record(str(e))
+
+    return StreamingResponse(body(), media_type=STREAM_MEDIA_TYPES[format])
+
+@router.get("/units/search", response_model=list[UnitSearchResult])
+async def search_units(
+    registry: RegistryDep,
+    q: Annotated[str, Query(min_length=1, max_length=100)],
+    limit: Annotated[int, Query(ge=1, le=settings.UNIT_SEARCH_MAX_RESULTS)] = 10,
+):
+    """
+    Rank units whose symbol, name or alias starts with `q`, then near matches,
+    for autocomplete. Served from an in-memory trie rebuilt with each catalog
+    version; see `app.benchmarks.unit_search` (~0.3 ms per prefix query and
+    ~0.7 ms per misspelled one on a 10k-term catalog).
+    """
+    return [
+        UnitSearchResult(
+            id=match.entry.unit.id,
+            name=match.entry.unit.name,
+            value=match.entry.unit.value,
+            base=match.entry.unit.base,
+            aliases=list(match.entry.unit.aliases),
+            matched=match.entry.term,
+            kind=match.entry.kind,
+            distance=match.distance,
+        )
+        for match in registry.search_index.search(q, limit)
+    ]
+
+@router.post("/addphysicalquantities", response_model=UnitCatalogImportReport)
+async def add_physical_quantities_from_yaml(session: AsyncSessionDep, dry_run: bool = False):
+    """
+    Import `config/units.yaml` (physical quantities with their linear, functional
+    and tabulated units) in one transaction. Existing quantities and units are
+    matched and updated in place, so importing twice changes nothing. With
+    `dry_run`, only report what would change.
+    """
     # Get path to config directory
     config_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), "config")
     units_yaml_path = os.path.join(config_dir, "units.yaml")
     if not os.path.exists(units_yaml_path):
         raise HTTPException(status_code=404, detail="Units configuration file not found")
 
-    with open(units_yaml_path, "r") as file:
+    with open(units_yaml_path) as file:
         data = yaml.safe_load(file)
+    try:
+        catalog = UnitCatalog.model_validate(data or {})
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
 
-    physical_quantities = data.get("physicalQuantities", [])
-    created_quantities = []
-    for pq in physical_quantities:
-        name = pq.get("name")
-        if not name:
-            continue
-        new_pq = PhysicalQuantity(
-            quantity=name
-        )
-        session.add(new_pq)
-        created_quantities.append(new_pq)
-        session.commit()
-    return {"message": f"{len(created_quantities)} physical quantities added", "physical_quantities": [q.quantity for q in created_quantities]}
+    return await session.run_sync(import_catalog, catalog, dry_run)
+
+
+def import_catalog(session: Session, catalog: UnitCatalog, dry_run: bool) -> UnitCatalogImportReport:
+    if not dry_run:
+        lock_catalog(session)
+    try:
+        plan = plan_import(session, catalog, datetime.now(timezone.utc))
+    except CatalogImportError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+    if not dry_run and not plan.is_empty:
+        apply_import(session, plan)
+        bump_catalog_version(session)
+    session.commit()
+    return plan.report(dry_run)
+
+
+# Comparing and syncing catalogs across environments by content hash
+@router.get("/catalog/hashes", response_model=UnitCatalogHashes)
+async def read_catalog_hashes(
+    registry: RegistryDep, quantity: Annotated[list[str] | None, Query()] = None
+):
+    """
+    Root and per-quantity content hashes of the unit catalog, plus the per-unit
+    hashes of each `quantity` asked for. Equal roots mean equal catalogs.
+    """
+    return catalog_hashes_read(registry.catalog_hashes, quantity or ())
+
+@router.post("/catalog/diff", response_model=UnitCatalogDiff)
+async def diff_unit_catalog(data: UnitCatalogHashes, registry: RegistryDep):
+    """
+    Compare this catalog with another one's hashes (from its `/catalog/hashes`)
+    and return the units the other side lacks or holds differently, ready to
+    POST to its `/catalog/merge`. Changed quantities are only expanded to
+    their changed units when their unit hashes are sent; the others come back
+    in `pending_quantities`.
+    """
+    return diff_catalog(registry.catalog_hashes, data)
+
+@router.post("/catalog/merge", response_model=UnitCatalogImportReport)
+async def merge_unit_catalog(data: UnitCatalog, session: AsyncSessionDep, dry_run: bool = False):
+    """
+    Add or update the given quantities and units, as the YAML import does, in
+    one transaction. Only the quantities listed are read; nothing is deleted.
+    """
+    return await session.run_sync(import_catalog, data, dry_run)
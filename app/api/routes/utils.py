@@ -2,7 +2,8 @@ from fastapi import APIRouter, Depends
 from pydantic.networks import EmailStr
 
 from app.api.deps import get_current_active_superuser
-from app.models import Message
+from app.core.db import pool_stats
+from app.models import ConnectionPoolStats, Message
 from app.utils import generate_test_email, send_email
 
 router = APIRouter(prefix="/utils", tags=["utils"])
@@ -26,6 +27,18 @@ def test_email(email_to: EmailStr) -> Message:
     return Message(message="Test email sent")
 
 
+@router.get(
+    "/pool-metrics/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=list[ConnectionPoolStats],
+)
+def pool_metrics() -> list[ConnectionPoolStats]:
+    """
+    Connection pool metrics of the worker that serves the request.
+    """
+    return pool_stats()
+
+
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
@@ -0,0 +1,199 @@
+"""
+Request latency of a sync route (sync Session, run in Starlette's thread
+pool) against the same route written async (AsyncSession on psycopg's async
+driver), under rising concurrency.
+
+    python -m app.benchmarks.api_latency
+    python -m app.benchmarks.api_latency --concurrency 50,200,800 --delay 0.1
+
+Both routes sleep `--delay` seconds in Postgres (standing in for a slow query
+or a distant database) and then list unit systems. They are served by one
+uvicorn worker in a child process; each of `concurrency` clients sends
+`--requests` requests back to back over its own keep-alive connection, with
+raw asyncio streams (an HTTP client library costs more CPU per request than
+the routes do). Sync routes share the 40 threads of Starlette's pool (and a
+pool of as many connections), while async ones only wait on their own
+connection pool of `--pool-size` connections. Both pools must fit in
+Postgres' `max_connections`.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import re
+import statistics
+import sys
+import time
+from multiprocessing.context import SpawnProcess
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.pool import MeteredAsyncQueuePool, MeteredQueuePool
+from app.models import ConnectionPoolStats, UnitSystem
+
+# anyio's default thread limiter, which Starlette runs sync routes on
+THREADS = 40
+SLEEP = text("SELECT pg_sleep(:delay)")
+LIST_UNIT_SYSTEMS = select(UnitSystem).where(UnitSystem.is_deleted == False).limit(20)  # noqa: E712
+
+
+def build_app(pool_size: int) -> FastAPI:
+    url = str(settings.SQLALCHEMY_DATABASE_URI)
+    # Sync routes can't use more connections than the thread pool has threads
+    engine = create_engine(
+        url, poolclass=MeteredQueuePool, pool_size=THREADS, max_overflow=0
+    )
+    async_engine = create_async_engine(
+        url, poolclass=MeteredAsyncQueuePool, pool_size=pool_size, max_overflow=0
+    )
+    app = FastAPI()
+
+    @app.get("/sync")
+    def read_sync(delay: float) -> list[UnitSystem]:
+        with Session(engine) as session:
+            session.execute(SLEEP, {"delay": delay})
+            return list(session.exec(LIST_UNIT_SYSTEMS).all())
+
+    @app.get("/async")
+    async def read_async(delay: float) -> list[UnitSystem]:
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            await session.execute(SLEEP, {"delay": delay})
+            return list((await session.exec(LIST_UNIT_SYSTEMS)).all())
+
+    @app.get("/pools")
+    def read_pools() -> list[ConnectionPoolStats]:
+        return [engine.pool.stats("sync"), async_engine.pool.stats("async")]  # type: ignore[attr-defined]
+
+    return app
+
+
+def serve(port: int, pool_size: int) -> None:
+    app = build_app(pool_size)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def start_server(port: int, pool_size: int) -> SpawnProcess:
+    server = multiprocessing.get_context("spawn").Process(
+        target=serve, args=(port, pool_size), daemon=True
+    )
+    server.start()
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/pools").raise_for_status()
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("the benchmark server did not start")
+
+
+async def get(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, target: str
+) -> int:
+    """One keep-alive HTTP/1.1 GET; returns the status after reading the whole body."""
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = re.search(rb"(?i)content-length: *(\d+)", head)
+    await reader.readexactly(int(length.group(1)) if length else 0)
+    return int(head.split(b" ", 2)[1])
+
+
+async def measure(
+    port: int, path: str, concurrency: int, requests: int, delay: float
+) -> tuple[list[float], float]:
+    latencies: list[float] = []
+    target = f"{path}?delay={delay}"
+
+    async def client() -> None:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            for _ in range(requests):
+                started = time.perf_counter()
+                status = await get(reader, writer, target)
+                latencies.append(time.perf_counter() - started)
+                if status != 200:
+                    raise RuntimeError(f"{path} answered {status}")
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+
+def percentile(values: list[float], q: int) -> float:
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+async def run(
+    concurrency: tuple[int, ...], requests: int, delay: float, pool_size: int, port: int
+) -> None:
+    # Warm both pools, so connection setup isn't measured
+    await measure(port, "/sync", THREADS, 1, 0)
+    await measure(port, "/async", pool_size, 1, 0)
+    print(
+        f"{'route':<6} {'clients':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    )
+    for clients in concurrency:
+        for path in ("/sync", "/async"):
+            latencies, elapsed = await measure(port, path, clients, requests, delay)
+            print(
+                f"{path[1:]:<6} {clients:>7} {len(latencies) / elapsed:>9.0f}"
+                + "".join(
+                    f" {percentile(latencies, q) * 1e3:>9.1f}" for q in (50, 95, 99)
+                )
+                + f" {max(latencies) * 1e3:>9.1f}",
+                flush=True,
+            )
+    for stats in httpx.get(f"http://127.0.0.1:{port}/pools").json():
+        print(
+            f"{stats['name']} pool: {stats['checkouts']} checkouts, "
+            f"max wait {stats['wait_seconds_max'] * 1e3:.1f} ms, {stats['timeouts']} timeouts"
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--concurrency",
+        default="10,50,200",
+        help="comma-separated client counts (default: %(default)s)",
+    )
+    parser.add_argument("--requests", type=int, default=10, help="requests per client")
+    parser.add_argument(
+        "--delay",
+        type=float,
+        default=0.5,
+        help="seconds each request sleeps in Postgres",
+    )
+    parser.add_argument(
+        "--pool-size", type=int, default=55, help="connections of the async engine"
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+    server = start_server(args.port, args.pool_size)
+    try:
+        asyncio.run(
+            run(
+                tuple(int(c) for c in args.concurrency.split(",")),
+                args.requests,
+                args.delay,
+                args.pool_size,
+                args.port,
+            )
+        )
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,85 @@
+"""
+Synthetic unit catalogs of any size, built in memory without a database.
+
+Units are spread over quantities of `UNITS_PER_QUANTITY` units each, and in
+every quantity 70% are linear, 20% functional with affine formulas (which
+fold onto the multiply-add path) and 10% functional with non-linear formulas.
+Catalogs are deterministic for a given size and seed.
+"""
+
+import random
+from dataclasses import dataclass
+from functools import cache
+
+from app.models import FunctionalUnit, LinearUnit, PhysicalQuantity
+from app.units.registry import UnitRegistry, assemble_registry
+
+UNITS_PER_QUANTITY = 20
+# A small palette keeps the number of distinct formulas realistic
+_COEFFICIENTS = [0.5, 1.8, 2.54, 3.6, 9.80665, 14.5, 101.325, 273.15]
+
+
+@dataclass(frozen=True)
+class SyntheticCatalog:
+    size: int
+    quantities: list[PhysicalQuantity]
+    units: list[LinearUnit | FunctionalUnit]
+
+    def registry(self, version: int = 1) -> UnitRegistry:
+        return assemble_registry(version, self.quantities, self.units)
+
+    def values(self, kind: str) -> list[str]:
+        """Symbols of one kind of unit: 'linear', 'affine' or 'formula'."""
+        return [u.value for u in self.units if u.value.startswith(kind[0])]
+
+
+def _unit(
+    rng: random.Random, index: int, slot: int, base: str
+) -> LinearUnit | FunctionalUnit:
+    if slot == 0:
+        return LinearUnit(
+            name=f"base {index}", value=f"l{index}", base=base, factorToBase=1.0
+        )
+    kind = slot % 10
+    if kind < 7:
+        return LinearUnit(
+            name=f"linear {index}",
+            value=f"l{index}",
+            base=base,
+            factorToBase=10 ** rng.randint(-6, 6) * rng.choice(_COEFFICIENTS),
+        )
+    a, b = rng.choice(_COEFFICIENTS), rng.choice(_COEFFICIENTS)
+    if kind < 9:
+        return FunctionalUnit(
+            name=f"affine {index}",
+            value=f"a{index}",
+            base=base,
+            toBase=f"x * {a} + {b}",
+            fromBase=f"(x - {b}) / {a}",
+        )
+    return FunctionalUnit(
+        name=f"formula {index}",
+        value=f"f{index}",
+        base=base,
+        toBase=f"10 ^ (x / {a})",
+        fromBase=f"{a} * log10(x)",
+    )
+
+
+@cache
+def synthetic_catalog(size: int, seed: int = 0) -> SyntheticCatalog:
+    rng = random.Random(seed)
+    quantities: list[PhysicalQuantity] = []
+    units: list[LinearUnit | FunctionalUnit] = []
+    for index in range(size):
+        slot = index % UNITS_PER_QUANTITY
+        if slot == 0:
+            quantities.append(PhysicalQuantity(quantity=f"quantity {len(quantities)}"))
+        pq = quantities[-1]
+        unit = _unit(rng, index, slot, base=f"b{len(quantities)}")
+        if isinstance(unit, LinearUnit):
+            pq.linear_units.append(unit)
+        else:
+            pq.functional_units.append(unit)
+        units.append(unit)
+    return SyntheticCatalog(size, quantities, units)
@@ -0,0 +1,78 @@
+"""
+Compare precomputed pair tables with the two-step path through `factorToBase`.
+
+    python -m app.benchmarks.conversion_tables
+"""
+
+import random
+import timeit
+import uuid
+
+import numpy as np
+
+from app.units.conversion import from_base_array, to_base_array
+from app.units.registry import RegisteredUnit
+from app.units.tables import build_table, table_signature
+
+
+def synthetic_units(count: int) -> list[RegisteredUnit]:
+    quantity_id = uuid.uuid4()
+    return [
+        RegisteredUnit(
+            id=uuid.uuid4(),
+            name=f"unit{i}",
+            value=f"u{i}",
+            base="u0",
+            index=i,
+            quantity_ids=(quantity_id,),
+            factorToBase=10 ** random.uniform(-9, 9),
+        )
+        for i in range(count)
+    ]
+
+
+def main(
+    unit_count: int = 50, pair_count: int = 100_000, array_size: int = 1_000_000
+) -> None:
+    units = synthetic_units(unit_count)
+    table = build_table(units[0].quantity_ids[0], table_signature(units))
+    pairs = [(random.choice(units), random.choice(units)) for _ in range(pair_count)]
+
+    def two_step_scalar() -> None:
+        for source, target in pairs:
+            1.5 * source.factorToBase / target.factorToBase  # type: ignore[operator]
+
+    def table_scalar() -> None:
+        for source, target in pairs:
+            a, b = table.lookup(source.id, target.id)  # type: ignore[misc]
+            1.5 * a + b
+
+    values = np.random.default_rng(0).random(array_size)
+    source, target = units[1], units[2]
+
+    def two_step_array() -> None:
+        from_base_array(target, to_base_array(source, values))
+
+    def table_array() -> None:
+        a, b = table.lookup(source.id, target.id)  # type: ignore[misc]
+        converted = values * a
+        if b:
+            converted += b
+
+    print(
+        f"{unit_count} units, {pair_count} scalar conversions, arrays of {array_size}"
+    )
+    for name, func, count in (
+        ("two-step scalar", two_step_scalar, pair_count),
+        ("table scalar", table_scalar, pair_count),
+        ("two-step array", two_step_array, array_size),
+        ("table array", table_array, array_size),
+    ):
+        seconds = min(timeit.repeat(func, number=1, repeat=5))
+        print(
+            f"{name:>16}: {seconds * 1e3:8.2f} ms  {count / seconds / 1e6:8.1f} M values/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
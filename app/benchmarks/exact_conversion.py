@@ -0,0 +1,98 @@
+"""
+Compare exact (Fraction) conversion with the float path on batch inputs, and
+the cost of composing a factor chain with that of a memoized one.
+
+    python -m app.benchmarks.exact_conversion
+"""
+
+import random
+import timeit
+import uuid
+from types import MappingProxyType
+
+import numpy as np
+
+from app.units.conversion import convert
+from app.units.exact import (
+    _chain,
+    convert_exact,
+    exact_chain,
+    exact_decimal,
+    parse_exact,
+)
+from app.units.registry import RegisteredUnit, UnitRegistry
+
+FACTORS = [1.0, 0.3048, 0.0254, 0.9144, 1609.344, 1852.0, 1e-10, 0.201168, 5.0292]
+
+
+def synthetic_registry() -> UnitRegistry:
+    units = tuple(
+        RegisteredUnit(
+            id=uuid.uuid4(),
+            name=f"unit{i}",
+            value=f"u{i}",
+            base="u0",
+            index=i,
+            quantity_ids=(),
+            factorToBase=factor,
+        )
+        for i, factor in enumerate(FACTORS)
+    )
+    return UnitRegistry(
+        version=1,
+        units=units,
+        quantities=(),
+        units_by_id=MappingProxyType({u.id: u for u in units}),
+        units_by_name=MappingProxyType({u.name: u for u in units}),
+        units_by_value=MappingProxyType({u.value: u for u in units}),
+        units_by_alias=MappingProxyType({}),
+        quantities_by_id=MappingProxyType({}),
+        quantities_by_name=MappingProxyType({}),
+        factors=np.array(FACTORS),
+    )
+
+
+def main(sizes: tuple[int, ...] = (1_000, 100_000), chain_count: int = 10_000) -> None:
+    registry = synthetic_registry()
+    rng = random.Random(0)
+    for size in sizes:
+        floats = [round(rng.uniform(-1e3, 1e3), 3) for _ in range(size)]
+        array = np.array(floats)
+        fractions = [parse_exact(value) for value in floats]
+        number = max(1, 100_000 // size)
+        timings = {
+            "float": lambda array=array: convert(registry, array, "u1", "u2"),
+            "exact": lambda fractions=fractions: convert_exact(
+                registry, fractions, "u1", "u2"
+            ),
+            "exact incl. parsing": lambda floats=floats: convert_exact(
+                registry, [parse_exact(v) for v in floats], "u1", "u2"
+            ),
+        }
+        for kind, run in timings.items():
+            seconds = min(timeit.repeat(run, number=number, repeat=5)) / number
+            print(
+                f"{size:>8} values {kind:>20}: {seconds * 1e3:9.3f} ms ({size / seconds / 1e6:8.2f} M values/s)"
+            )
+
+    pairs = [
+        (f"u{rng.randrange(len(FACTORS))}", f"u{rng.randrange(len(FACTORS))}")
+        for _ in range(chain_count)
+    ]
+
+    def composed() -> None:
+        exact_decimal.cache_clear()
+        for source, target in pairs:
+            _chain(registry, source, target)
+
+    def memoized() -> None:
+        for source, target in pairs:
+            exact_chain(registry, source, target)
+
+    for kind, chain in {"composed": composed, "memoized": memoized}.items():
+        seconds = min(timeit.repeat(chain, number=1, repeat=5))
+        print(f"chain {kind:>9}: {seconds / chain_count * 1e6:7.2f} µs per pair")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+A small benchmark harness with the shape of pytest-benchmark.
+
+Benchmarks are `bench_*` functions whose parameters are fixtures, injected by
+name: `benchmark` times a callable, and the other fixtures are provided by
+the suite (see `app.benchmarks.suite`). As with pytest-benchmark:
+
+    def bench_parse(benchmark, registry):
+        benchmark(parse_expression, "km/h")
+
+`benchmark(func, *args)` calibrates the number of calls per round so each
+round lasts at least `min_time`, then runs rounds until `max_time` has passed
+(at least `min_rounds`). `benchmark.pedantic(func, setup=..., rounds=...)`
+runs a fixed number of rounds, calling `setup` untimed before each one, for
+cases that are too slow to repeat or that need fresh state.
+"""
+
+import gc
+import inspect
+import statistics
+import time
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class Stats:
+    # Seconds per call
+    min: float
+    max: float
+    mean: float
+    median: float
+    stddev: float
+    rounds: int
+    iterations: int
+
+    @property
+    def ops(self) -> float:
+        return 1 / self.mean if self.mean else float("inf")
+
+    @classmethod
+    def from_rounds(cls, timings: list[float], iterations: int) -> "Stats":
+        per_call = [t / iterations for t in timings]
+        return cls(
+            min=min(per_call),
+            max=max(per_call),
+            mean=statistics.fmean(per_call),
+            median=statistics.median(per_call),
+            stddev=statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+            rounds=len(per_call),
+            iterations=iterations,
+        )
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "median": self.median,
+            "stddev": self.stddev,
+            "rounds": self.rounds,
+            "iterations": self.iterations,
+            "ops": self.ops,
+        }
+
+
+@dataclass
+class Benchmark:
+    min_time: float = 0.005
+    max_time: float = 1.0
+    min_rounds: int = 5
+    stats: Stats | None = field(default=None, init=False)
+    extra_info: dict[str, Any] = field(default_factory=dict, init=False)
+
+    def _round(self, func: Callable[[], Any], iterations: int) -> float:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return time.perf_counter() - started
+
+    def __call__(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        def call() -> Any:
+            return func(*args, **kwargs)
+
+        result = call()  # warm-up, and the value handed back to the caller
+        iterations = 1
+        while (elapsed := self._round(call, iterations)) < self.min_time:
+            iterations *= 10 if elapsed < self.min_time / 10 else 2
+        timings = [elapsed]
+        deadline = time.perf_counter() + self.max_time
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            while len(timings) < self.min_rounds or time.perf_counter() < deadline:
+                timings.append(self._round(call, iterations))
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        self.stats = Stats.from_rounds(timings, iterations)
+        return result
+
+    def pedantic(
+        self,
+        func: Callable[..., Any],
+        args: Iterable[Any] = (),
+        kwargs: Mapping[str, Any] | None = None,
+        setup: Callable[[], Any] | None = None,
+        rounds: int = 1,
+        iterations: int = 1,
+    ) -> Any:
+        args, kwargs = tuple(args), dict(kwargs or {})
+        timings = []
+        result = None
+        for _ in range(rounds):
+            if setup is not None:
+                setup()
+            started = time.perf_counter()
+            for _ in range(iterations):
+                result = func(*args, **kwargs)
+            timings.append(time.perf_counter() - started)
+        self.stats = Stats.from_rounds(timings, iterations)
+        return result
+
+
+def call_with_fixtures(func: Callable[..., Any], fixtures: Mapping[str, Any]) -> None:
+    """Call a `bench_*` function with the fixtures its parameters name."""
+    names = inspect.signature(func).parameters
+    missing = [name for name in names if name not in fixtures]
+    if missing:
+        raise TypeError(f"{func.__name__}: unknown fixture(s) {', '.join(missing)}")
+    func(**{name: fixtures[name] for name in names})
@@ -0,0 +1,238 @@
+"""
+Query plans of the list endpoints and child lookups, without and with the
+foreign key, soft-delete and covering indexes of the models.
+
+    python -m app.benchmarks.index_plans
+    python -m app.benchmarks.index_plans --projects 20000 --deleted 0.5 --verbose
+
+Seeds a large dataset into a scratch schema of the configured database
+(dropped afterwards): `--projects` projects and as many tests, each with
+`--children` objectives and readings, and a tenth as many object templates
+with `--children` attachments each. A `--deleted` fraction of every table is
+soft-deleted. Each query is run through EXPLAIN (ANALYZE, BUFFERS) once with
+only the primary keys, and once more after creating the indexes, and the
+scans, execution time and buffers touched are compared. `--verbose` prints
+the plans themselves.
+"""
+
+import argparse
+import sys
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import ClauseElement, Connection, create_engine, func, select, text
+from sqlmodel import SQLModel, col
+
+from app.core.config import settings
+from app.models import (
+    Attachment,
+    AttachmentFileStorage,
+    ObjectTemplate,
+    Project,
+    ProjectObjective,
+    Reading,
+    Test,
+)
+
+SCHEMA = "index_plans"
+TABLES = [
+    Project,
+    ProjectObjective,
+    Test,
+    Reading,
+    ObjectTemplate,
+    AttachmentFileStorage,
+    Attachment,
+]
+
+# Each statement is run with :n, :children and :deleted bound
+SEED = [
+    """
+    INSERT INTO project (id, name, client, status, type, "startDate", "expectedDeliveryDate", version,
+        "isLastVersion", "createdAt", "createdBy", "updatedAt", "updatedBy", is_deleted)
+    SELECT gen_random_uuid(), 'project ' || i, 'client ' || i % 97, 'open', 'type', now(), now(), 1,
+        true, now(), gen_random_uuid(), now(), gen_random_uuid(), random() < :deleted
+    FROM generate_series(1, :n) AS i
+    """,
+    """
+    INSERT INTO projectobjective (id, project_id, name, "valueMin", "valueMax", "physicalQuantity", "isOptional")
+    SELECT gen_random_uuid(), p.id, 'objective ' || j, j, j * 10, 'm', false
+    FROM project AS p, generate_series(1, :children) AS j
+    """,
+    """
+    INSERT INTO test (id, "isVLCompatible", version, "isLastVersion", "createdAt", "createdBy",
+        "updatedAt", "updatedBy", is_deleted)
+    SELECT gen_random_uuid(), false, 1, true, now(), gen_random_uuid(), now(), gen_random_uuid(),
+        random() < :deleted
+    FROM generate_series(1, :n) AS i
+    """,
+    """
+    INSERT INTO reading (id, test_id, name, value, "physicalQuantity", "isRequired")
+    SELECT gen_random_uuid(), t.id, 'reading ' || j, j::text, 'm', true
+    FROM test AS t, generate_series(1, :children) AS j
+    """,
+    """
+    INSERT INTO objecttemplate (id, name, description, type, tags, "allowedComposition", fabricant,
+        fournisseur, version, "isLastVersion", "createdAt", "updatedAt", is_deleted)
+    SELECT gen_random_uuid(), 'object ' || i, '', 'type', '[]', '[]', 'fabricant', 'fournisseur', 1,
+        true, now(), now(), random() < :deleted
+    FROM generate_series(1, :n / 10) AS i
+    """,
+    """
+    INSERT INTO attachmentfilestorage (id, provider, path)
+    SELECT gen_random_uuid(), 'local', '/files/' || i
+    FROM generate_series(1, :n / 10 * :children) AS i
+    """,
+    """
+    INSERT INTO attachment (id, file_name, file_type, file_storage_id, size_bytes, uploaded_at,
+        reference_count, meta_data, is_deleted, object_template_id)
+    SELECT gen_random_uuid(), 'file', 'pdf', s.id, 1024, now(), 1, '{}', random() < :deleted, o.id
+    FROM (SELECT id, row_number() OVER () - 1 AS k FROM attachmentfilestorage) AS s
+    JOIN (SELECT id, row_number() OVER () - 1 AS k FROM objecttemplate) AS o ON o.k = s.k % (:n / 10)
+    """,
+]
+
+
+def _some_ids(connection: Connection, model: Any, count: int) -> list[uuid.UUID]:
+    return list(
+        connection.scalars(select(model.id).order_by(func.random()).limit(count))
+    )
+
+
+# name -> statement built from sample ids; the same statements the routes run
+QUERIES: dict[str, Callable[[Connection], ClauseElement]] = {
+    "list projects": lambda c: select(Project).where(col(Project.is_deleted) == False),  # noqa: E712
+    "list tests": lambda c: select(Test).where(col(Test.is_deleted) == False),  # noqa: E712
+    "readings of a test": lambda c: select(Reading).where(
+        col(Reading.test_id) == _some_ids(c, Test, 1)[0]
+    ),
+    "objectives to re-express": lambda c: select(
+        col(ProjectObjective.id),
+        col(ProjectObjective.project_id),
+        col(ProjectObjective.physicalQuantity),
+        col(ProjectObjective.valueMin),
+        col(ProjectObjective.valueMax),
+    ).where(col(ProjectObjective.project_id).in_(_some_ids(c, Project, 50))),
+    "live tests among ids": lambda c: select(col(Test.id)).where(
+        col(Test.id).in_(_some_ids(c, Test, 50)),
+        col(Test.is_deleted) == False,  # noqa: E712
+    ),
+    "attachments of a template": lambda c: select(Attachment).where(
+        col(Attachment.object_template_id) == _some_ids(c, ObjectTemplate, 1)[0],
+        col(Attachment.is_deleted) == False,  # noqa: E712
+    ),
+    "attachment of a file": lambda c: select(Attachment).where(
+        col(Attachment.file_storage_id) == _some_ids(c, AttachmentFileStorage, 1)[0]
+    ),
+}
+
+
+def _scans(node: dict[str, Any]) -> list[str]:
+    scans = []
+    if "Relation Name" in node or "Index Name" in node:
+        # Bitmap index scans name their index but not their table
+        scan = node["Node Type"]
+        if "Relation Name" in node:
+            scan += f" on {node['Relation Name']}"
+        if "Index Name" in node:
+            scan += f" using {node['Index Name']}"
+        scans.append(scan)
+    for child in node.get("Plans", []):
+        scans.extend(_scans(child))
+    return scans
+
+
+def explain(connection: Connection, statement: ClauseElement) -> dict[str, Any]:
+    compiled = statement.compile(
+        connection, compile_kwargs={"render_postcompile": True}
+    )
+    # Once to warm the cache, once measured
+    connection.exec_driver_sql(str(compiled), compiled.params).all()
+    (plan,) = connection.exec_driver_sql(
+        f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {compiled}", compiled.params
+    ).scalar_one()
+    top = plan["Plan"]
+    return {
+        "scans": ", ".join(_scans(top)),
+        "ms": plan["Execution Time"],
+        "buffers": top.get("Shared Hit Blocks", 0) + top.get("Shared Read Blocks", 0),
+        "rows": top["Actual Rows"],
+        "text": connection.exec_driver_sql(f"EXPLAIN {compiled}", compiled.params)
+        .scalars()
+        .all(),
+    }
+
+
+def run_queries(connection: Connection) -> dict[str, dict[str, Any]]:
+    connection.exec_driver_sql("VACUUM ANALYZE")
+    return {
+        name: explain(connection, build(connection)) for name, build in QUERIES.items()
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--projects",
+        type=int,
+        default=100_000,
+        help="projects and tests (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--children", type=int, default=10, help="children of each parent row"
+    )
+    parser.add_argument(
+        "--deleted", type=float, default=0.8, help="fraction of soft-deleted rows"
+    )
+    parser.add_argument("--verbose", action="store_true", help="print the plans")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI), isolation_level="AUTOCOMMIT"
+    )
+    tables = [model.__table__ for model in TABLES]  # type: ignore[attr-defined]
+    with engine.connect() as connection:
+        connection.exec_driver_sql(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        connection.exec_driver_sql(f"CREATE SCHEMA {SCHEMA}")
+        try:
+            # Only the scratch schema, so the tables are created and queried there
+            connection.exec_driver_sql(f"SET search_path TO {SCHEMA}")
+            SQLModel.metadata.create_all(connection, tables=tables)
+            for table in tables:
+                for index in table.indexes:
+                    index.drop(connection)
+            params = {
+                "n": args.projects,
+                "children": args.children,
+                "deleted": args.deleted,
+            }
+            for statement in SEED:
+                connection.execute(text(statement), params)
+            before = run_queries(connection)
+            for table in tables:
+                for index in table.indexes:
+                    index.create(connection)
+            after = run_queries(connection)
+        finally:
+            connection.exec_driver_sql(f"DROP SCHEMA {SCHEMA} CASCADE")
+
+    print(
+        f"{args.projects} projects and tests, {args.children} children each, "
+        f"{args.deleted:.0%} soft-deleted\n"
+    )
+    print(
+        f"{'query':<26} {'rows':>7} {'ms before':>10} {'ms after':>10} {'buffers before':>15} {'buffers after':>14}"
+    )
+    for name in QUERIES:
+        b, a = before[name], after[name]
+        print(
+            f"{name:<26} {a['rows']:>7} {b['ms']:>10.2f} {a['ms']:>10.2f} {b['buffers']:>15} {a['buffers']:>14}"
+        )
+        print(f"  before: {b['scans']}\n  after:  {a['scans']}")
+        if args.verbose:
+            print("\n".join(f"    {line}" for line in [*b["text"], "", *a["text"]]))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,261 @@
+"""
+Benchmarks of the unit conversion hot path, against synthetic catalogs.
+
+    python -m app.benchmarks.suite
+    python -m app.benchmarks.suite --sizes 100,10000 -k batch --output after.json --compare before.json
+
+Every `bench_*` function runs once per catalog size, with fixtures injected
+by name (see `app.benchmarks.harness`). Results are printed and, with
+`--output`, written as JSON laid out like pytest-benchmark's (a `benchmarks`
+list of `name`, `params` and `stats` in seconds per call), so runs from two
+commits can be compared with `--compare` or any pytest-benchmark tooling.
+Registry rebuilds build their tables per process; nothing is published to
+`UNIT_SNAPSHOT_DIR`.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+from collections.abc import Callable, Iterator
+from datetime import datetime, timezone
+from typing import Any
+
+import numpy as np
+
+from app.benchmarks.catalog import (
+    UNITS_PER_QUANTITY,
+    SyntheticCatalog,
+    synthetic_catalog,
+)
+from app.benchmarks.harness import Benchmark, call_with_fixtures
+from app.core.config import settings
+from app.units.conversion import convert
+from app.units.expressions import _resolve, parse_expression
+from app.units.registry import UnitRegistry
+
+DEFAULT_SIZES = (100, 10_000, 100_000)
+BATCH_SIZE = 1_000_000
+PAIR_COUNT = 1_000
+
+
+def _pairs(
+    catalog: SyntheticCatalog, source_kind: str, target_kind: str
+) -> Iterator[tuple[str, str]]:
+    """Endlessly cycle through same-quantity pairs, so lookups do not hit one hot entry."""
+    rng = random.Random(1)
+    by_quantity: dict[int, dict[str, list[str]]] = {}
+    for index, unit in enumerate(catalog.units):
+        kinds = by_quantity.setdefault(index // UNITS_PER_QUANTITY, {})
+        kinds.setdefault(unit.value[0], []).append(unit.value)
+    candidates = [
+        kinds
+        for kinds in by_quantity.values()
+        if source_kind[0] in kinds and target_kind[0] in kinds
+    ]
+    pairs = []
+    for _ in range(PAIR_COUNT):
+        kinds = rng.choice(candidates)
+        pairs.append(
+            (rng.choice(kinds[source_kind[0]]), rng.choice(kinds[target_kind[0]]))
+        )
+    return itertools.cycle(pairs)
+
+
+def _converting(
+    registry: UnitRegistry, pairs: Iterator[tuple[str, str]], values: np.ndarray
+) -> Callable[[], Any]:
+    def run() -> np.ndarray:
+        source, target = next(pairs)
+        return convert(registry, values, source, target)
+
+    return run
+
+
+def bench_scalar_linear(
+    benchmark: Benchmark, registry: UnitRegistry, catalog: SyntheticCatalog
+) -> None:
+    benchmark(
+        _converting(registry, _pairs(catalog, "linear", "linear"), np.array([1.5]))
+    )
+
+
+def bench_scalar_formula(
+    benchmark: Benchmark, registry: UnitRegistry, catalog: SyntheticCatalog
+) -> None:
+    benchmark(
+        _converting(registry, _pairs(catalog, "formula", "linear"), np.array([1.5]))
+    )
+
+
+def bench_scalar_affine_chain(
+    benchmark: Benchmark, registry: UnitRegistry, catalog: SyntheticCatalog
+) -> None:
+    # Affine-folded functional units on both sides collapse into one multiply-add
+    benchmark(
+        _converting(registry, _pairs(catalog, "affine", "affine"), np.array([1.5]))
+    )
+
+
+def _expressions(catalog: SyntheticCatalog) -> Iterator[str]:
+    rng = random.Random(2)
+    linear = catalog.values("linear")
+    return itertools.cycle(
+        [
+            f"{rng.choice(linear)}*{rng.choice(linear)}/{rng.choice(linear)}^2"
+            for _ in range(PAIR_COUNT)
+        ]
+    )
+
+
+def bench_compound_parse(benchmark: Benchmark, catalog: SyntheticCatalog) -> None:
+    expressions = _expressions(catalog)
+    # Past the lru_cache, so every call parses
+    benchmark(lambda: parse_expression.__wrapped__(next(expressions)))
+
+
+def bench_compound_resolve(
+    benchmark: Benchmark, registry: UnitRegistry, catalog: SyntheticCatalog
+) -> None:
+    expressions = _expressions(catalog)
+    # Resolved against the registry (parsing stays memoized), without the per-snapshot memo
+    benchmark(lambda: _resolve(registry, next(expressions)))
+
+
+def bench_batch_linear(
+    benchmark: Benchmark, registry: UnitRegistry, catalog: SyntheticCatalog
+) -> None:
+    values = np.random.default_rng(0).random(BATCH_SIZE)
+    benchmark.extra_info["values"] = BATCH_SIZE
+    benchmark(_converting(registry, _pairs(catalog, "linear", "linear"), values))
+
+
+def bench_batch_formula(
+    benchmark: Benchmark, registry: UnitRegistry, catalog: SyntheticCatalog
+) -> None:
+    values = np.random.default_rng(0).random(BATCH_SIZE) + 1
+    benchmark.extra_info["values"] = BATCH_SIZE
+    benchmark(_converting(registry, _pairs(catalog, "formula", "linear"), values))
+
+
+def bench_registry_rebuild(benchmark: Benchmark, catalog: SyntheticCatalog) -> None:
+    # Formulas stay compiled across rebuilds, as they do in a running worker
+    benchmark.pedantic(catalog.registry, rounds=3)
+
+
+BENCHMARKS = [
+    value for name, value in sorted(globals().items()) if name.startswith("bench_")
+]
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(
+    sizes: tuple[int, ...], keyword: str = "", max_time: float = 1.0
+) -> dict[str, Any]:
+    settings.UNIT_SNAPSHOT_DIR = ""
+    results = []
+    for size in sizes:
+        catalog = synthetic_catalog(size)
+        fixtures: dict[str, Any] = {"catalog": catalog, "registry": catalog.registry()}
+        for func in BENCHMARKS:
+            name = f"{func.__name__.removeprefix('bench_')}[{size}]"
+            if keyword not in name:
+                continue
+            benchmark = Benchmark(max_time=max_time)
+            call_with_fixtures(func, {**fixtures, "benchmark": benchmark})
+            assert benchmark.stats is not None
+            results.append(
+                {
+                    "name": name,
+                    "fullname": f"{__name__}::{func.__name__}[{size}]",
+                    "params": {"size": size},
+                    "extra_info": benchmark.extra_info,
+                    "stats": benchmark.stats.as_dict(),
+                }
+            )
+            stats = benchmark.stats
+            print(
+                f"{name:<32} mean {stats.mean * 1e6:12.2f} µs  median {stats.median * 1e6:12.2f} µs"
+                f"  ±{stats.stddev * 1e6:10.2f}  ({stats.rounds} × {stats.iterations})",
+                flush=True,
+            )
+    return {
+        "datetime": datetime.now(timezone.utc).isoformat(),
+        "commit_info": {"id": _commit()},
+        "machine_info": {
+            "python_version": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "numpy_version": np.__version__,
+        },
+        "benchmarks": results,
+    }
+
+
+def compare(results: dict[str, Any], previous: dict[str, Any]) -> None:
+    before = {b["name"]: b["stats"] for b in previous["benchmarks"]}
+    print(
+        f"\ncompared with {previous.get('commit_info', {}).get('id') or 'previous run'}:"
+    )
+    for benchmark in results["benchmarks"]:
+        old = before.get(benchmark["name"])
+        if old is None:
+            continue
+        ratio = benchmark["stats"]["median"] / old["median"]
+        print(
+            f"{benchmark['name']:<32} {ratio:6.2f}x median ({'slower' if ratio > 1 else 'faster'})"
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(map(str, DEFAULT_SIZES)),
+        help="comma-separated catalog sizes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-k",
+        "--keyword",
+        default="",
+        help="only run benchmarks whose name contains this",
+    )
+    parser.add_argument(
+        "--max-time", type=float, default=1.0, help="seconds spent per benchmark"
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument(
+        "--compare", help="JSON results of an earlier run to compare against"
+    )
+    args = parser.parse_args(argv)
+
+    results = run(
+        tuple(int(s) for s in args.sizes.split(",")), args.keyword, args.max_time
+    )
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
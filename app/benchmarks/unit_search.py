@@ -0,0 +1,132 @@
+"""
+Time autocomplete queries against a synthetic catalog of prefixed and
+compound unit names ("kilometre per hour", ...).
+
+    python -m app.benchmarks.unit_search
+"""
+
+import random
+import time
+import timeit
+import uuid
+
+from app.units.prefixes import SI_PREFIXES
+from app.units.registry import RegisteredUnit
+from app.units.search import UnitSearchIndex
+
+BASES = [
+    "metre",
+    "gram",
+    "second",
+    "ampere",
+    "kelvin",
+    "mole",
+    "candela",
+    "litre",
+    "pascal",
+    "joule",
+    "watt",
+    "newton",
+    "volt",
+    "ohm",
+    "farad",
+    "henry",
+    "tesla",
+    "weber",
+    "hertz",
+    "coulomb",
+    "siemens",
+    "becquerel",
+    "gray",
+    "sievert",
+    "lumen",
+    "lux",
+    "katal",
+    "bar",
+    "tonne",
+    "electronvolt",
+    "calorie",
+    "byte",
+    "bit",
+    "radian",
+    "steradian",
+    "hectare",
+    "parsec",
+    "gauss",
+    "poise",
+    "stokes",
+]
+DENOMINATORS = [
+    "",
+    "second",
+    "hour",
+    "metre",
+    "square metre",
+    "kelvin",
+    "litre",
+    "mole",
+    "gram",
+]
+
+
+def synthetic_units() -> list[RegisteredUnit]:
+    units: list[RegisteredUnit] = []
+    for prefix in SI_PREFIXES:
+        for base in BASES:
+            for denominator in DENOMINATORS:
+                name = (
+                    prefix.name + base + (f" per {denominator}" if denominator else "")
+                )
+                value = (
+                    prefix.symbol
+                    + base[:2]
+                    + (f"/{denominator[:2]}" if denominator else "")
+                )
+                units.append(
+                    RegisteredUnit(
+                        id=uuid.uuid4(),
+                        name=name,
+                        value=value,
+                        base=base,
+                        index=len(units),
+                        quantity_ids=(),
+                        aliases=(name.replace("metre", "meter"),)
+                        if "metre" in name
+                        else (),
+                        factorToBase=prefix.factor,
+                    )
+                )
+    return units
+
+
+def typo(rng: random.Random, word: str) -> str:
+    i = rng.randrange(1, len(word))
+    return word[:i] + rng.choice("aeiouz") + word[i + 1 :]
+
+
+def main(query_count: int = 2_000) -> None:
+    units = synthetic_units()
+    started = time.perf_counter()
+    index = UnitSearchIndex(units, keep=50)
+    print(
+        f"{len(units)} units, {len(index)} terms, index built in {time.perf_counter() - started:.2f} s"
+    )
+
+    rng = random.Random(0)
+    names = [rng.choice(units).name for _ in range(query_count)]
+    queries = {
+        "prefix": [name[: rng.randint(1, len(name))] for name in names],
+        "typo": [typo(rng, name[: rng.randint(4, len(name))]) for name in names],
+    }
+    for kind, batch in queries.items():
+
+        def search(batch: list[str] = batch) -> None:
+            for q in batch:
+                index.search(q, 10)
+
+        seconds = min(timeit.repeat(search, number=1, repeat=5))
+        print(f"{kind:>8}: {seconds / len(batch) * 1e6:8.1f} µs per query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Archival of soft-deleted rows.
+
+Rows soft-deleted more than `ARCHIVE_AFTER_DAYS` days ago move from their
+table to its archive table (see `archive_tables` in app.models), together
+with the rows that depend on them through a foreign key: a project with its
+objectives, rules and the like, an object template with its rules and
+attachments and their links. The hot tables keep only live and recently
+deleted rows, and their indexes stay small.
+
+Each batch of `ARCHIVE_BATCH_SIZE` root rows moves in a transaction of its
+own, one `WITH moved AS (DELETE ... RETURNING *) INSERT INTO ..._archive`
+statement per table, so no row is ever in both tables or in neither. Roots
+are locked with SKIP LOCKED, so several workers can run the job at once, and
+rows a request holds locked are left for the next run.
+
+Soft-deleted units aren't archived: the catalog import revives them when a
+catalog brings them back. Rows deleted without a `deleted_at` are kept, as
+their age is unknown.
+
+    python -m app.core.archive            # every ARCHIVE_INTERVAL seconds
+    python -m app.core.archive --once
+"""
+
+import argparse
+import logging
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import (
+    ColumnElement,
+    Connection,
+    DateTime,
+    Engine,
+    Table,
+    delete,
+    insert,
+    literal,
+    select,
+)
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models import (
+    Attachment,
+    AttachmentLink,
+    ObjectTemplate,
+    ObjectTemplateRule,
+    Project,
+    ProjectAttachment,
+    ProjectConstraint,
+    ProjectDeliverable,
+    ProjectMetaData,
+    ProjectObjective,
+    ProjectRule,
+    Reading,
+    RealCondition,
+    Test,
+    TestTemplate,
+    TestTemplateCondition,
+    TestTemplateGeneralInfo,
+    TestTemplateReading,
+    UnitSystem,
+    VLReading,
+    archive_tables,
+    model_table,
+    unitsystem_physicalquantity_link,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Dependent:
+    table: Table
+    # Foreign key to the id of the parent
+    column: str
+    dependents: tuple["Dependent", ...] = ()
+
+
+def _dependent(model: type, column: str, *dependents: Dependent) -> Dependent:
+    return Dependent(model_table(model), column, dependents)
+
+
+_LINKS = _dependent(AttachmentLink, "attachment_id")
+
+# Soft-deletable tables and what moves along with their rows
+ROOTS: tuple[tuple[Table, tuple[Dependent, ...]], ...] = (
+    (
+        model_table(Project),
+        tuple(
+            _dependent(model, "project_id")
+            for model in (
+                ProjectMetaData,
+                ProjectRule,
+                ProjectObjective,
+                ProjectDeliverable,
+                ProjectConstraint,
+                ProjectAttachment,
+            )
+        ),
+    ),
+    (
+        model_table(Test),
+        tuple(
+            _dependent(model, "test_id")
+            for model in (RealCondition, Reading, VLReading)
+        ),
+    ),
+    (
+        model_table(TestTemplate),
+        tuple(
+            _dependent(model, "test_template_id")
+            for model in (
+                TestTemplateGeneralInfo,
+                TestTemplateCondition,
+                TestTemplateReading,
+            )
+        ),
+    ),
+    (
+        model_table(ObjectTemplate),
+        (
+            _dependent(ObjectTemplateRule, "object_template_id"),
+            _dependent(Attachment, "object_template_id", _LINKS),
+        ),
+    ),
+    (model_table(Attachment), (_LINKS,)),
+    (model_table(AttachmentLink), ()),
+    (
+        model_table(UnitSystem),
+        (Dependent(unitsystem_physicalquantity_link, "unitsystem_id"),),
+    ),
+)
+
+
+def _move(
+    connection: Connection,
+    table: Table,
+    where: ColumnElement[bool],
+    dependents: tuple[Dependent, ...],
+    now: datetime,
+    moved: Counter[str],
+) -> None:
+    # Dependents first, while their parents can still be selected
+    for dependent in dependents:
+        parents = select(table.c.id).where(where).scalar_subquery()
+        where_dependent = dependent.table.c[dependent.column].in_(parents)
+        _move(
+            connection,
+            dependent.table,
+            where_dependent,
+            dependent.dependents,
+            now,
+            moved,
+        )
+    rows = delete(table).where(where).returning(*table.c).cte("moved")
+    archive = archive_tables[table.name]
+    statement = (
+        insert(archive)
+        .from_select(
+            [*rows.c.keys(), "archived_at"],
+            select(*rows.c, literal(now, DateTime(timezone=True))),
+        )
+        .add_cte(rows)
+        .execution_options(preserve_rowcount=True)
+    )
+    moved[table.name] += connection.execute(statement).rowcount
+
+
+def archive_deleted(
+    engine: Engine,
+    older_than: timedelta = timedelta(days=settings.ARCHIVE_AFTER_DAYS),
+    batch_size: int = settings.ARCHIVE_BATCH_SIZE,
+) -> Counter[str]:
+    """Archive what was soft-deleted before `older_than` ago; returns the rows moved per table."""
+    now = datetime.now(timezone.utc)
+    cutoff = now - older_than
+    moved: Counter[str] = Counter()
+    for root, dependents in ROOTS:
+        while True:
+            with engine.begin() as connection:
+                ids = connection.scalars(
+                    select(root.c.id)
+                    .where(root.c.is_deleted, root.c.deleted_at < cutoff)
+                    .order_by(root.c.deleted_at)
+                    .limit(batch_size)
+                    .with_for_update(skip_locked=True)
+                ).all()
+                if ids:
+                    _move(connection, root, root.c.id.in_(ids), dependents, now, moved)
+            if len(ids) < batch_size:
+                break
+    return moved
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--once", action="store_true", help="archive once and exit")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    while True:
+        moved = archive_deleted(engine)
+        logger.info(
+            "Archived %d rows%s",
+            sum(moved.values()),
+            "".join(
+                f", {count} from {table}" for table, count in sorted(moved.items())
+            ),
+        )
+        if args.once or not settings.ARCHIVE_INTERVAL:
+            break
+        time.sleep(settings.ARCHIVE_INTERVAL)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -69,6 +69,48 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Connection pool of each worker (see app.core.pool); the defaults are SQLAlchemy's
+    DB_POOL_SIZE: int = 5
+    DB_POOL_MAX_OVERFLOW: int = 10
+    # Seconds a request waits for a free connection before failing
+    DB_POOL_TIMEOUT: float = 30.0
+    # Seconds after which a connection is replaced on checkout; -1 never
+    DB_POOL_RECYCLE: int = -1
+    # Test connections with a round trip on checkout, replacing dead ones
+    DB_POOL_PRE_PING: bool = False
+
+    # Optional streaming replica of the primary (same user, password and
+    # database), serving the async routers' read-only requests; see app.core.replica
+    POSTGRES_REPLICA_SERVER: str | None = None
+    POSTGRES_REPLICA_PORT: int = 5432
+    # Seconds of replay lag past which reads go back to the primary
+    DB_REPLICA_MAX_LAG: float = 2.0
+    # How often (in seconds) a worker measures the replica's lag
+    DB_REPLICA_CHECK_INTERVAL: float = 1.0
+    # Seconds to wait for a connection to the replica (libpq's minimum is 2)
+    DB_REPLICA_CONNECT_TIMEOUT: int = 2
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def SQLALCHEMY_REPLICA_DATABASE_URI(self) -> MultiHostUrl | None:
+        if not self.POSTGRES_REPLICA_SERVER:
+            return None
+        return MultiHostUrl.build(
+            scheme="postgresql+psycopg",
+            username=self.POSTGRES_USER,
+            password=self.POSTGRES_PASSWORD,
+            host=self.POSTGRES_REPLICA_SERVER,
+            port=self.POSTGRES_REPLICA_PORT,
+            path=self.POSTGRES_DB,
+        )
+
+    # Soft-deleted rows older than this many days move to the archive tables
+    # (see app.core.archive), that many root rows per transaction
+    ARCHIVE_AFTER_DAYS: int = 30
+    ARCHIVE_BATCH_SIZE: int = 500
+    # Seconds between runs of the archival job; 0 runs it once
+    ARCHIVE_INTERVAL: float = 3600.0
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -95,6 +137,31 @@ class Settings(BaseSettings):
     FIRST_SUPERUSER: EmailStr
     FIRST_SUPERUSER_PASSWORD: str
 
+    # Upper bound on the number of values accepted by /unitsystems/convert/batch
+    UNIT_BATCH_MAX_VALUES: int = 5_000_000
+    # How often (in seconds) a worker checks whether its unit registry is stale
+    UNIT_REGISTRY_CHECK_INTERVAL: float = 5.0
+    # Compound unit expressions memoized per registry snapshot
+    UNIT_EXPRESSION_CACHE_SIZE: int = 1024
+    # Quantities with more units than this get no all-pairs conversion table
+    UNIT_TABLE_MAX_UNITS: int = 256
+    # SI-prefixed units (km, µm, ...) derived per registry snapshot
+    UNIT_PREFIX_CACHE_SIZE: int = 4096
+    # Exact (rational) conversion chains memoized per registry snapshot
+    UNIT_EXACT_CACHE_SIZE: int = 4096
+    # Upper bound on the number of values accepted by /unitsystems/convert/exact
+    UNIT_EXACT_BATCH_MAX_VALUES: int = 100_000
+    # Upper bound on the `limit` of the unit search endpoint
+    UNIT_SEARCH_MAX_RESULTS: int = 50
+    # Rows converted per chunk by the streaming conversion endpoint
+    UNIT_STREAM_CHUNK_ROWS: int = 50_000
+    # Longest line (in bytes) the streaming conversion endpoint accepts
+    UNIT_STREAM_MAX_LINE_BYTES: int = 1 << 20
+    # Directory where workers share memory-mapped conversion tables, e.g. a
+    # directory under /dev/shm owned by the app's user; empty keeps them per
+    # process. Must be local to the host and writable by that user alone.
+    UNIT_SNAPSHOT_DIR: str = ""
+
     def _check_default_secret(self, var_name: str, value: str | None) -> None:
         if value == "changethis":
             message = (
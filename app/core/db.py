@@ -1,10 +1,55 @@
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import Session, create_engine, select
 
+import app.core.soft_delete  # noqa: F401  (hides soft-deleted rows from every session)
 from app import crud
 from app.core.config import settings
-from app.models import User, UserCreate
+from app.core.pool import MeteredAsyncQueuePool, MeteredQueuePool
+from app.core.replica import ReplicaRouter
+from app.models import ConnectionPoolStats, User, UserCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+pool_options = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_POOL_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+}
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI), poolclass=MeteredQueuePool, **pool_options
+)
+# Same database through psycopg's async driver, for the async routers; each
+# engine has a pool of its own
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI), poolclass=MeteredAsyncQueuePool, **pool_options
+)
+async_replica_engine = (
+    create_async_engine(
+        str(settings.SQLALCHEMY_REPLICA_DATABASE_URI),
+        poolclass=MeteredAsyncQueuePool,
+        connect_args={"connect_timeout": settings.DB_REPLICA_CONNECT_TIMEOUT},
+        **pool_options,
+    )
+    if settings.SQLALCHEMY_REPLICA_DATABASE_URI
+    else None
+)
+replica_router = ReplicaRouter(
+    async_engine,
+    async_replica_engine,
+    max_lag=settings.DB_REPLICA_MAX_LAG,
+    check_interval=settings.DB_REPLICA_CHECK_INTERVAL,
+)
+
+
+def pool_stats() -> list[ConnectionPoolStats]:
+    pools = [("primary", engine.pool), ("primary-async", async_engine.pool)]
+    if async_replica_engine is not None:
+        pools.append(("replica-async", async_replica_engine.pool))
+    stats = []
+    for name, pool in pools:
+        assert isinstance(pool, MeteredQueuePool)
+        stats.append(pool.stats(name))
+    return stats
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -16,8 +61,6 @@ def init_db(session: Session) -> None:
     # Tables should be created with Alembic migrations
     # But if you don't want to use migrations, create
     # the tables un-commenting the next lines
-    from sqlmodel import SQLModel
-
     # This works because the models are already imported and registered from app.models
     print("Created all tables in the database.")
     user = session.exec(
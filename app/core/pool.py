@@ -0,0 +1,132 @@
+"""
+Connection pools that measure their own checkouts.
+
+`MeteredQueuePool` is a drop-in `QueuePool` (pass it as `poolclass` to
+`create_engine`) that times every checkout, from the request for a connection
+to its delivery, whether it came from the pool, was opened as overflow, or
+had to wait for another request to return one. Waits go into a cumulative
+histogram with Prometheus-style `le` buckets, and checkouts that gave up
+after `pool_timeout` are counted as timeouts.
+
+`MeteredAsyncQueuePool` does the same for async engines.
+
+Metrics live in the pool, so they are per worker process and start from zero
+when the worker starts; `stats()` tags them with the pid so the reports of
+several workers can be told apart.
+"""
+
+import os
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.models import ConnectionPoolStats
+
+# Upper bounds (in seconds) of the checkout wait histogram buckets
+WAIT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class PoolMetrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        # One count per bucket, plus the +Inf bucket; cumulated when reported
+        self.wait_counts = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        bucket = next(
+            (i for i, le in enumerate(WAIT_BUCKETS) if seconds <= le), len(WAIT_BUCKETS)
+        )
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_sum += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.wait_counts[bucket] += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def wait_buckets(self) -> dict[str, int]:
+        with self._lock:
+            counts = list(self.wait_counts)
+        buckets, total = {}, 0
+        for le, count in zip([*map(str, WAIT_BUCKETS), "+Inf"], counts, strict=True):
+            total += count
+            buckets[le] = total
+        return buckets
+
+
+class MeteredQueuePool(QueuePool):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return entry
+
+    def _create_connection(self) -> Any:
+        connection = super()._create_connection()
+        self.metrics.record_connect()
+        return connection
+
+    def recreate(self) -> "MeteredQueuePool":
+        # Engine.dispose() swaps in a fresh pool; its counters carry on
+        pool = super().recreate()
+        assert isinstance(pool, MeteredQueuePool)
+        pool.metrics = self.metrics
+        return pool
+
+    def stats(self, name: str) -> ConnectionPoolStats:
+        metrics = self.metrics
+        return ConnectionPoolStats(
+            name=name,
+            pid=os.getpid(),
+            pool_size=self.size(),
+            max_overflow=self._max_overflow,
+            timeout=self.timeout(),
+            checked_out=self.checkedout(),
+            checked_in=self.checkedin(),
+            overflow=max(self.overflow(), 0),
+            checkouts=metrics.checkouts,
+            connects=metrics.connects,
+            timeouts=metrics.timeouts,
+            wait_seconds_sum=metrics.wait_sum,
+            wait_seconds_max=metrics.wait_max,
+            wait_buckets=metrics.wait_buckets(),
+        )
+
+
+class MeteredAsyncQueuePool(MeteredQueuePool, AsyncAdaptedQueuePool):
+    pass
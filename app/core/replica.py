@@ -0,0 +1,113 @@
+"""
+Routing of read-only requests to a streaming replica.
+
+Safe requests (GET, HEAD, OPTIONS) get their async session from the replica
+when one is configured and its replay lag is within `DB_REPLICA_MAX_LAG`
+seconds; everything else, and any request while the replica is lagging or
+unreachable, uses the primary. The lag is measured at most once every
+`DB_REPLICA_CHECK_INTERVAL` seconds per worker.
+
+Read-your-writes: any other request pins its client to the primary with a
+cookie, for as long as a write can take to show on a replica the router would
+still use (the lag tolerance plus one check interval). Clients that drop
+cookies only lose that guarantee, not correctness of the writes themselves.
+
+To try it with two local instances, clone the primary into a streaming
+replica and point `POSTGRES_REPLICA_SERVER`/`POSTGRES_REPLICA_PORT` at it:
+
+    pg_basebackup -h localhost -U postgres -D replica -R -X stream
+    pg_ctl -D replica -o "-p 5433" start
+"""
+
+import asyncio
+import math
+import time
+
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+PRIMARY_COOKIE = "db_primary_until"
+
+# Seconds the replica is behind; 0 when it has replayed all it received, so an
+# idle primary doesn't look like lag. A server not in recovery has no lag.
+REPLICA_LAG = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 'Infinity')"
+    " END"
+)
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replica: AsyncEngine | None,
+        max_lag: float,
+        check_interval: float,
+    ) -> None:
+        self.primary = primary
+        self.replica = replica
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        # Last measured lag in seconds; None while unknown or unreachable
+        self.lag: float | None = None
+        self._checked_at = float("-inf")
+
+    @property
+    def pin_seconds(self) -> float:
+        return self.max_lag + self.check_interval
+
+    async def _query_lag(self) -> float:
+        assert self.replica is not None
+        async with self.replica.connect() as connection:
+            return float((await connection.execute(REPLICA_LAG)).scalar_one())
+
+    async def measure_lag(self) -> float | None:
+        # Bounded by the check interval, so a replica that stopped answering
+        # holds up no more than the request that measures it. Before Python 3.11
+        # wait_for raises asyncio.TimeoutError, which isn't the builtin one.
+        try:
+            return await asyncio.wait_for(
+                self._query_lag(), timeout=max(self.check_interval, 0.1)
+            )
+        except (SQLAlchemyError, OSError, asyncio.TimeoutError):
+            return None
+
+    async def replica_usable(self) -> bool:
+        if self.replica is None:
+            return False
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            # Set first, so concurrent requests don't all measure at once
+            self._checked_at = now
+            self.lag = await self.measure_lag()
+        return self.lag is not None and self.lag <= self.max_lag
+
+    def pinned(self, request: Request) -> bool:
+        try:
+            return float(request.cookies.get(PRIMARY_COOKIE, "0")) > time.time()
+        except ValueError:
+            return False
+
+    def pin(self, response: Response) -> None:
+        response.set_cookie(
+            PRIMARY_COOKIE,
+            repr(time.time() + self.pin_seconds),
+            max_age=math.ceil(self.pin_seconds),
+            httponly=True,
+            samesite="lax",
+        )
+
+    async def engine_for(self, request: Request, response: Response) -> AsyncEngine:
+        if self.replica is None:
+            return self.primary
+        if request.method not in SAFE_METHODS:
+            self.pin(response)
+            return self.primary
+        if self.pinned(request) or not await self.replica_usable():
+            return self.primary
+        return self.replica
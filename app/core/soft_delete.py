@@ -0,0 +1,68 @@
+"""
+Soft-deleted rows, hidden from every ORM query.
+
+Every mapped model with an `is_deleted` column is soft-deletable. Each ORM
+SELECT gets loader criteria that filter out their deleted rows, wherever the
+model appears: in the FROM clause, in joins, and in the relationships the
+query loads, eagerly or later. `Session.get()` returns None for a deleted
+row, so routers only need to check for a missing row.
+
+Code that has to see deleted rows (the catalog import reviving units, the
+archival job) opts out per statement:
+
+    select(LinearUnit).execution_options(include_deleted=True)
+
+The filter applies to ORM statements only; Core statements on tables, like
+the archival job's, see every row.
+"""
+
+import uuid
+from datetime import datetime, timezone
+from functools import cache
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, with_loader_criteria
+from sqlmodel import SQLModel
+
+INCLUDE_DELETED = "include_deleted"
+
+
+@cache
+def soft_deletable_models() -> tuple[type[SQLModel], ...]:
+    # Resolved on first use, once every model is mapped
+    return tuple(
+        mapper.class_
+        for mapper in SQLModel._sa_registry.mappers
+        if "is_deleted" in mapper.columns
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _hide_deleted(state: ORMExecuteState) -> None:
+    if (
+        not state.is_select
+        # Refreshes and relationship loads inherit the criteria of the query
+        # that loaded their object
+        or state.is_column_load
+        or state.is_relationship_load
+        or state.execution_options.get(INCLUDE_DELETED, False)
+    ):
+        return
+    state.statement = state.statement.options(
+        *(
+            with_loader_criteria(
+                model,
+                lambda cls: cls.is_deleted == False,  # noqa: E712
+                include_aliases=True,
+            )
+            for model in soft_deletable_models()
+        )
+    )
+
+
+def soft_delete(row: Any, deleted_by: uuid.UUID | None = None) -> None:
+    row.is_deleted = True
+    row.deleted_at = datetime.now(timezone.utc)
+    if deleted_by is not None:
+        row.deleted_by = deleted_by
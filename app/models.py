@@ -3,12 +3,12 @@ import uuid
 from pydantic import EmailStr
 from sqlalchemy import Column
 from sqlmodel import Field, Relationship, SQLModel
-from typing import TYPE_CHECKING, Optional, Dict , List
+from typing import TYPE_CHECKING, Optional, Dict , List , Union
 from sqlmodel import SQLModel, Field
 from uuid import UUID
 from datetime import datetime
 from sqlalchemy.dialects.postgresql import JSONB as PG_JSONB
-from sqlalchemy import Table, Column, ForeignKey
+from sqlalchemy import ARRAY, DateTime, Float, Index, Table, Column, ForeignKey, Uuid, text
 from sqlmodel import SQLModel
 # Shared properties
 class UserBase(SQLModel):
@@ -119,6 +119,25 @@ class NewPassword(SQLModel):
     new_password: str = Field(min_length=8, max_length=40)
 
 
+# Connection pool of one engine in one worker process (app.core.pool)
+class ConnectionPoolStats(SQLModel):
+    name: str
+    pid: int
+    pool_size: int
+    max_overflow: int
+    timeout: float
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts: int
+    connects: int
+    timeouts: int
+    wait_seconds_sum: float
+    wait_seconds_max: float
+    # Cumulative counts of checkouts (and timeouts) that waited at most `le` seconds
+    wait_buckets: Dict[str, int]
+
+
 # ============================================================================
 
 # There start the added code 
@@ -129,6 +148,7 @@ class UnitBase(SQLModel):
     base : str
     createdAt: Optional[datetime] = None
     createdBy: Optional[UUID] = None
+    updatedAt: Optional[datetime] = None
     is_deleted: bool = Field(default=False)
     deleted_at: Optional[datetime] = None
     deleted_by: Optional[UUID] = None
@@ -138,6 +158,10 @@ class Unit(UnitBase, table=True):
 
 class UnitSystem(SQLModel, table=True):
     __tablename__ = "unitsystem"
+    # Live rows only, for the list endpoints and id checks that skip deleted rows
+    __table_args__ = (
+        Index("ix_unitsystem_live", "id", postgresql_where=text("is_deleted = false")),
+    )
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     name: str
     createdAt: datetime
@@ -148,6 +172,12 @@ class UnitSystem(SQLModel, table=True):
     deleted_at: Optional[datetime] = None
     deleted_by: Optional[UUID] = None
 
+class CatalogVersion(SQLModel, table=True):
+    # Single row, bumped on every write to physical quantities or units
+    __tablename__ = "catalogversion"
+    id: int = Field(default=1, primary_key=True)
+    version: int = 0
+
 # Link models are no longer needed since each PhysicalQuantity only has one unit (either linear or functional)
 
 # Association tables for many-to-many relationships
@@ -166,10 +196,31 @@ physicalquantity_functionalunit_link = Table(
     Column("functionalunit_id", ForeignKey("functionalunit.id"), primary_key=True),
 )
 
+physicalquantity_tabulatedunit_link = Table(
+    "physicalquantity_tabulatedunit_link",
+    SQLModel.metadata,
+    Column("physicalquantity_id", ForeignKey("physicalquantity.id"), primary_key=True),
+    Column("tabulatedunit_id", ForeignKey("tabulatedunit.id"), primary_key=True),
+)
+
+# Physical quantities a unit system uses. The primary key serves reads of one
+# system; the reverse index serves "which systems use this quantity".
+unitsystem_physicalquantity_link = Table(
+    "unitsystem_physicalquantity_link",
+    SQLModel.metadata,
+    Column("unitsystem_id", ForeignKey("unitsystem.id", ondelete="CASCADE"), primary_key=True),
+    Column("physicalquantity_id", ForeignKey("physicalquantity.id", ondelete="CASCADE"), primary_key=True),
+    # Unit the system expresses the quantity in; a linear, functional or tabulated unit
+    Column("unit_id", Uuid, nullable=True),
+    Index("ix_unitsystem_physicalquantity_link_quantity", "physicalquantity_id", "unitsystem_id"),
+)
+
 class LinearUnit(UnitBase, table=True):
     __tablename__ = "linearunit"
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     factorToBase: float
+    # Alternative names and symbols, e.g. ["meter"] for metre
+    aliases: List[str] = Field(default_factory=list, sa_column=Column(PG_JSONB))
     physical_quantities: List["PhysicalQuantity"] = Relationship(
         back_populates="linear_units",
         sa_relationship_kwargs={"secondary": physicalquantity_linearunit_link},
@@ -179,6 +230,7 @@ class LinearUnit(UnitBase, table=True):
         value: str
         base: str
         factorToBase: float
+        aliases: List[str] = Field(default_factory=list)
 
 
 class FunctionalUnit(UnitBase, table=True):
@@ -186,6 +238,7 @@ class FunctionalUnit(UnitBase, table=True):
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     toBase: str
     fromBase: str
+    aliases: List[str] = Field(default_factory=list, sa_column=Column(PG_JSONB))
     physical_quantities: List["PhysicalQuantity"] = Relationship(
         back_populates="functional_units",
         sa_relationship_kwargs={"secondary": physicalquantity_functionalunit_link},
@@ -196,6 +249,27 @@ class FunctionalUnit(UnitBase, table=True):
         base : str
         toBase: str
         fromBase: str
+        aliases: List[str] = Field(default_factory=list)
+
+
+class TabulatedUnit(UnitBase, table=True):
+    __tablename__ = "tabulatedunit"
+    id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    # Calibration table: unitPoints[i] in this unit is basePoints[i] in the base unit
+    unitPoints: List[float] = Field(sa_column=Column(ARRAY(Float), nullable=False))
+    basePoints: List[float] = Field(sa_column=Column(ARRAY(Float), nullable=False))
+    aliases: List[str] = Field(default_factory=list, sa_column=Column(PG_JSONB))
+    physical_quantities: List["PhysicalQuantity"] = Relationship(
+        back_populates="tabulated_units",
+        sa_relationship_kwargs={"secondary": physicalquantity_tabulatedunit_link},
+    )
+    class Create(SQLModel):
+        name: str
+        value: str
+        base: str
+        unitPoints: List[float]
+        basePoints: List[float]
+        aliases: List[str] = Field(default_factory=list)
 class PhysicalQuantity(SQLModel, table=True):
     __tablename__ = "physicalquantity"
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
@@ -209,6 +283,10 @@ class PhysicalQuantity(SQLModel, table=True):
         back_populates="physical_quantities",
         sa_relationship_kwargs={"secondary": physicalquantity_functionalunit_link},
     )
+    tabulated_units: List["TabulatedUnit"] = Relationship(
+        back_populates="physical_quantities",
+        sa_relationship_kwargs={"secondary": physicalquantity_tabulatedunit_link},
+    )
 
 
     class Create(SQLModel):
@@ -219,10 +297,13 @@ class PhysicalQuantity(SQLModel, table=True):
         quantity: str
         linear_units: Optional[List["LinearUnit"]] = None
         functional_units: Optional[List["FunctionalUnit"]] = None
+        tabulated_units: Optional[List["TabulatedUnit"]] = None
 class UnitSystemRead(SQLModel):
     id: UUID
     name: str
     physical_quantities: List["PhysicalQuantity.Read"] = Field(default_factory=list)
+    # Physical quantity id -> unit the system expresses it in
+    preferred_units: Dict[UUID, UUID] = Field(default_factory=dict)
     createdAt: datetime
     createdBy: Optional[UUID] = None
     updatedAt: datetime
@@ -236,6 +317,116 @@ class UnitSystemUpdate(SQLModel):
 class UnitSystemCreate(SQLModel):
     name: str
 
+class UnitSystemMember(SQLModel):
+    physicalquantity_id: UUID
+    unit_id: Optional[UUID] = None
+
+class UnitSystemMembers(SQLModel):
+    members: List[UnitSystemMember]
+
+class UnitSystemMemberIds(SQLModel):
+    physicalquantity_ids: List[UUID]
+
+# Unit catalog file (config/units.yaml)
+class UnitCatalogQuantity(SQLModel):
+    name: str
+    linearUnits: List[LinearUnit.Create] = Field(default_factory=list)
+    functionalUnits: List[FunctionalUnit.Create] = Field(default_factory=list)
+    tabulatedUnits: List[TabulatedUnit.Create] = Field(default_factory=list)
+
+class UnitCatalog(SQLModel):
+    physicalQuantities: List[UnitCatalogQuantity] = Field(default_factory=list)
+
+class UnitCatalogImportReport(SQLModel):
+    message: str
+    dry_run: bool
+    # Physical quantity names, and units as "<quantity>/<value>"
+    created_quantities: List[str] = Field(default_factory=list)
+    created_units: List[str] = Field(default_factory=list)
+    updated_units: List[str] = Field(default_factory=list)
+    unchanged_units: int = 0
+
+# Content hashes of the unit catalog (app.units.catalog_hash)
+class UnitCatalogHashes(SQLModel):
+    root: str
+    # Quantity name -> hash
+    quantities: Dict[str, str]
+    # Quantity name -> unit key ("linear:m") -> hash, for the quantities asked about
+    units: Dict[str, Dict[str, str]] = Field(default_factory=dict)
+
+class UnitCatalogDiff(SQLModel):
+    root: str
+    identical: bool
+    # Quantities only on this side, only on the other side, and on both but different
+    added_quantities: List[str] = Field(default_factory=list)
+    removed_quantities: List[str] = Field(default_factory=list)
+    changed_quantities: List[str] = Field(default_factory=list)
+    # Changed quantities sent without unit hashes; send them again with their units
+    pending_quantities: List[str] = Field(default_factory=list)
+    # "quantity/kind:value" of units only on the other side
+    removed_units: List[str] = Field(default_factory=list)
+    # Units the other side lacks or holds differently, ready to merge
+    catalog: UnitCatalog = Field(default_factory=UnitCatalog)
+
+class ConversionBatch(SQLModel):
+    # Units are referenced by id or by their `value` (symbol)
+    source: str
+    target: str
+    values: List[float]
+
+class ConversionBatchResult(SQLModel):
+    source: str
+    target: str
+    # null where a result is not a finite number (e.g. log of a negative value)
+    values: List[Optional[float]]
+
+class ExactConversionBatch(SQLModel):
+    source: str
+    target: str
+    # Numbers are read as the decimals they are written as; strings may also be fractions ("1/3")
+    values: List[Union[int, float, str]]
+
+class ExactConversionBatchResult(SQLModel):
+    source: str
+    target: str
+    # Exact results as "numerator/denominator", or integers
+    values: List[str]
+
+class UnitReexpressionRequest(SQLModel):
+    project_ids: List[UUID] = Field(default_factory=list)
+    test_ids: List[UUID] = Field(default_factory=list)
+
+class ReexpressedValues(SQLModel):
+    # "objective", "realCondition", "reading" or "vlReading"
+    kind: str
+    id: UUID
+    source: str
+    target: str
+    values: Dict[str, Optional[float]]
+
+class SkippedReexpression(SQLModel):
+    kind: str
+    id: UUID
+    reason: str
+
+class UnitReexpressionReport(SQLModel):
+    dry_run: bool
+    converted: List[ReexpressedValues]
+    skipped: List[SkippedReexpression]
+    # Rows already in the system's unit, or whose quantity has no preferred unit in it
+    unchanged: int
+
+class UnitSearchResult(SQLModel):
+    id: UUID
+    name: str
+    value: str
+    base: str
+    aliases: List[str] = Field(default_factory=list)
+    # The name, symbol or alias that matched, and whether it was a value, name or alias
+    matched: str
+    kind: str
+    distance: int
+
 #===========================================================================
 
 # Project models 
@@ -244,7 +435,7 @@ if TYPE_CHECKING:
 
 class ProjectMetaData(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    project_id: UUID = Field(foreign_key="project.id")
+    project_id: UUID = Field(foreign_key="project.id", index=True)
     name: str
     value: str
     project: "Project" = Relationship(back_populates="project_metadata")
@@ -255,7 +446,7 @@ class ProjectMetaData(SQLModel, table=True):
 
 class ProjectRule(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    project_id: UUID = Field(foreign_key="project.id")
+    project_id: UUID = Field(foreign_key="project.id", index=True)
     name: str
     isLink: bool
     isFile: bool
@@ -269,6 +460,13 @@ class ProjectRule(SQLModel, table=True):
         link: Optional[str] = None
 
 class ProjectObjective(SQLModel, table=True):
+    # Covers the re-expression scans of a project's objectives
+    __table_args__ = (
+        Index(
+            "ix_projectobjective_project_id", "project_id",
+            postgresql_include=["id", "physicalQuantity", "valueMin", "valueMax"],
+        ),
+    )
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     project_id: UUID = Field(foreign_key="project.id")
     name: str
@@ -289,7 +487,7 @@ class ProjectObjective(SQLModel, table=True):
 
 class ProjectDeliverable(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    project_id: UUID = Field(foreign_key="project.id")
+    project_id: UUID = Field(foreign_key="project.id", index=True)
     name: str
     content: str
     isOptional: bool
@@ -302,7 +500,7 @@ class ProjectDeliverable(SQLModel, table=True):
 
 class ProjectConstraint(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    project_id: UUID = Field(foreign_key="project.id")
+    project_id: UUID = Field(foreign_key="project.id", index=True)
     name: str
     value: str
     project: "Project" = Relationship(back_populates="constraints")
@@ -313,7 +511,7 @@ class ProjectConstraint(SQLModel, table=True):
 
 class ProjectAttachment(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    project_id: UUID = Field(foreign_key="project.id")
+    project_id: UUID = Field(foreign_key="project.id", index=True)
     name: str
     project: "Project" = Relationship(back_populates="attachments")
     
@@ -339,6 +537,9 @@ class ProjectBase(SQLModel):
     deleted_by: Optional[UUID] = None
 
 class Project(ProjectBase, table=True):
+    __table_args__ = (
+        Index("ix_project_live", "id", postgresql_where=text("is_deleted = false")),
+    )
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     
 
@@ -371,7 +572,7 @@ class UpdateProject(SQLModel):
 
 class RealCondition(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    test_id: UUID = Field(foreign_key="test.id")
+    test_id: UUID = Field(foreign_key="test.id", index=True)
     name: str
     value: str
     physicalQuantity: str
@@ -387,7 +588,7 @@ class RealCondition(SQLModel, table=True):
 
 class Reading(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    test_id: UUID = Field(foreign_key="test.id")
+    test_id: UUID = Field(foreign_key="test.id", index=True)
     name: str
     value: Optional[str] = None  # formula
     physicalQuantity: str
@@ -403,7 +604,7 @@ class Reading(SQLModel, table=True):
 
 class VLReading(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    test_id: UUID = Field(foreign_key="test.id")
+    test_id: UUID = Field(foreign_key="test.id", index=True)
     name: str
     value: Optional[str] = None  # formula
     physicalQuantity: str
@@ -447,6 +648,9 @@ class TestUpdate(SQLModel):
 
 class Test(TestBase, table=True):
     __tablename__ = "test"
+    __table_args__ = (
+        Index("ix_test_live", "id", postgresql_where=text("is_deleted = false")),
+    )
 
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     realConditions: List[RealCondition] = Relationship(
@@ -470,7 +674,7 @@ class TestTemplateGeneralInfo(SQLModel, table=True):  # Changed to table=True
     isLink: bool
     link: Optional[str] = None
     isFile: bool
-    test_template_id: Optional[UUID] = Field(default=None, foreign_key="testtemplate.id")
+    test_template_id: Optional[UUID] = Field(default=None, foreign_key="testtemplate.id", index=True)
     test_template: Optional["TestTemplate"] = Relationship(back_populates="generalInfo")
     
     class Create(SQLModel):
@@ -495,7 +699,7 @@ class TestTemplateCondition(SQLModel, table=True):  # Changed to table=True
     value: float
     physicalQuantity: str
     required: bool
-    test_template_id: Optional[UUID] = Field(default=None, foreign_key="testtemplate.id")
+    test_template_id: Optional[UUID] = Field(default=None, foreign_key="testtemplate.id", index=True)
     test_template: Optional["TestTemplate"] = Relationship(back_populates="conditions")
     
     class Create(SQLModel):
@@ -518,7 +722,7 @@ class TestTemplateReading(SQLModel, table=True):  # Changed to table=True
     value: Optional[str] = None  # formula
     physicalQuantity: str
     isRequired: bool
-    test_template_id: Optional[UUID] = Field(default=None, foreign_key="testtemplate.id")
+    test_template_id: Optional[UUID] = Field(default=None, foreign_key="testtemplate.id", index=True)
     test_template: Optional["TestTemplate"] = Relationship(back_populates="readings")
     
     class Create(SQLModel):
@@ -552,6 +756,9 @@ class TestTemplateBase(SQLModel):
 
 
 class TestTemplate(TestTemplateBase, table=True):
+    __table_args__ = (
+        Index("ix_testtemplate_live", "id", postgresql_where=text("is_deleted = false")),
+    )
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     
     # Remove the explicit foreign key and let the relationship handle it
@@ -607,7 +814,7 @@ class TestTemplate(TestTemplateBase, table=True):
 
 class ObjectTemplateRule(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    object_template_id: UUID = Field(foreign_key="objecttemplate.id")
+    object_template_id: UUID = Field(foreign_key="objecttemplate.id", index=True)
     name: str
     value: str
     isLink: bool
@@ -642,6 +849,9 @@ class ObjectTemplateBase(SQLModel):
     deleted_by: Optional[UUID] = None
 
 class ObjectTemplate(ObjectTemplateBase, table=True):
+    __table_args__ = (
+        Index("ix_objecttemplate_live", "id", postgresql_where=text("is_deleted = false")),
+    )
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     rules: List["ObjectTemplateRule"] = Relationship(
         back_populates="object_template", sa_relationship_kwargs={"cascade": "all, delete-orphan"}
@@ -707,10 +917,16 @@ class AttachmentFileStorage(SQLModel, table=True):
         bucket: Optional[str] = None
 
 class Attachment(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "ix_attachment_live_object_template_id", "object_template_id",
+            postgresql_where=text("is_deleted = false"),
+        ),
+    )
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     file_name: str
     file_type: str
-    file_storage_id: Optional[UUID] = Field(default=None, foreign_key="attachmentfilestorage.id")
+    file_storage_id: Optional[UUID] = Field(default=None, foreign_key="attachmentfilestorage.id", index=True)
     file_storage: Optional["AttachmentFileStorage"] = Relationship(back_populates="attachment")
     size_bytes: int
     file_hash: Optional[str] = None
@@ -721,7 +937,7 @@ class Attachment(SQLModel, table=True):
     is_deleted: bool = False
     deleted_at: Optional[datetime] = None
     deleted_by: Optional[UUID] = None
-    object_template_id: Optional[UUID] = Field(default=None, foreign_key="objecttemplate.id")
+    object_template_id: Optional[UUID] = Field(default=None, foreign_key="objecttemplate.id", index=True)
     object_template: Optional["ObjectTemplate"] = Relationship(back_populates="attachments")
 
     class Create(SQLModel):
@@ -759,7 +975,7 @@ class Attachment(SQLModel, table=True):
 
 class AttachmentLink(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    attachment_id: UUID = Field(foreign_key="attachment.id")
+    attachment_id: UUID = Field(foreign_key="attachment.id", index=True)
     attachment: "Attachment" = Relationship()
     class_type: str
     object_id: UUID
@@ -776,4 +992,40 @@ class AttachmentLink(SQLModel, table=True):
         class_type: str
         object_id: UUID
         is_required: bool
-        link_metadata: dict = Field(default_factory=dict)
\ No newline at end of file
+        link_metadata: dict = Field(default_factory=dict)
+
+
+# ===========================================================================
+
+def model_table(model: type) -> Table:
+    """The table of a table model; SQLModel doesn't declare `__table__` to type checkers."""
+    table: Table = model.__table__  # type: ignore[attr-defined]
+    return table
+
+
+# Soft-deleted rows that app.core.archive moved out of the hot tables. Each
+# archive table has the columns of its table and when the row was archived,
+# and no constraint but the primary key, so rows archive in any order.
+def _archive_table(table: Table) -> Table:
+    return Table(
+        f"{table.name}_archive",
+        SQLModel.metadata,
+        *(Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable) for c in table.columns),
+        Column("archived_at", DateTime(timezone=True), nullable=False),
+    )
+
+
+archive_tables: Dict[str, Table] = {
+    table.name: _archive_table(table)
+    for table in (
+        *map(model_table, (
+            Project, ProjectMetaData, ProjectRule, ProjectObjective, ProjectDeliverable,
+            ProjectConstraint, ProjectAttachment,
+            Test, RealCondition, Reading, VLReading,
+            TestTemplate, TestTemplateGeneralInfo, TestTemplateCondition, TestTemplateReading,
+            ObjectTemplate, ObjectTemplateRule, Attachment, AttachmentLink,
+            UnitSystem,
+        )),
+        unitsystem_physicalquantity_link,
+    )
+}
@@ -0,0 +1,45 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.tests.utils.utils import random_lower_string
+
+
+def test_template_object_relationships(client: TestClient) -> None:
+    # Served from an async session, so the nested rules and attachments must
+    # come back loaded rather than lazy loaded
+    name = random_lower_string()
+    data = {
+        "name": name,
+        "description": "bolt",
+        "type": "part",
+        "tags": ["m8"],
+        "allowedComposition": [["nut"]],
+        "rules": [{"name": "torque", "value": "25", "isLink": False, "isFile": False}],
+        "attachments": [],
+        "fabricant": "acme",
+        "fournisseur": "acme",
+        "version": 1,
+        "isLastVersion": True,
+    }
+    r = client.post(f"{settings.API_V1_STR}/template_objects/", json=data)
+    assert r.status_code == 201
+    assert [rule["name"] for rule in r.json()["rules"]] == ["torque"]
+
+    r = client.get(f"{settings.API_V1_STR}/template_objects/")
+    assert r.status_code == 200
+    (created,) = [t for t in r.json() if t["name"] == name]
+    assert created["rules"][0]["value"] == "25"
+    assert created["attachments"] == []
+
+    r = client.patch(
+        f"{settings.API_V1_STR}/template_objects/{created['id']}",
+        json={"description": "nut"},
+    )
+    assert r.status_code == 200
+    assert r.json()["description"] == "nut"
+    assert len(r.json()["rules"]) == 1
+
+    r = client.delete(f"{settings.API_V1_STR}/template_objects/{created['id']}")
+    assert r.status_code == 204
+    r = client.get(f"{settings.API_V1_STR}/template_objects/{created['id']}")
+    assert r.status_code == 404
@@ -0,0 +1,644 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import models
+from app.core.config import settings
+from app.tests.utils.unitsystem import (
+    create_random_functional_unit,
+    create_random_linear_unit,
+    create_random_physical_quantity,
+    create_random_tabulated_unit,
+)
+from app.tests.utils.utils import random_lower_string
+from app.units.registry import bump_catalog_version
+
+
+def test_add_functional_unit_rejects_unsafe_formula(
+    client: TestClient, db: Session
+) -> None:
+    pq = create_random_physical_quantity(db)
+    data = {
+        "name": "evil",
+        "value": "evil",
+        "base": "K",
+        "toBase": "__import__('os').getcwd()",
+        "fromBase": "x",
+    }
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/physicalquantities/{pq.id}/addfunctionalunit",
+        json=data,
+    )
+    assert r.status_code == 422
+
+
+def test_units_that_do_not_compile_are_skipped(client: TestClient, db: Session) -> None:
+    # Rows written before formulas and tables were validated
+    pq = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, pq, factor=1.0)
+    kilometre = create_random_linear_unit(db, pq, factor=1000.0)
+    formula = create_random_functional_unit(
+        db, pq, to_base="__import__('os').getcwd()", from_base="x"
+    )
+    table = create_random_tabulated_unit(
+        db, pq, unit_points=[0.0, 1.0], base_points=[0.0]
+    )
+    try:
+        r = client.get(f"{settings.API_V1_STR}/unitsystems/physicalquantities")
+        assert r.status_code == 200
+        r = client.post(
+            f"{settings.API_V1_STR}/unitsystems/convert/batch",
+            json={"source": kilometre.value, "target": metre.value, "values": [2]},
+        )
+        assert r.status_code == 200
+        assert r.json()["values"] == [2000]
+        for broken in (formula, table):
+            r = client.post(
+                f"{settings.API_V1_STR}/unitsystems/convert/batch",
+                json={"source": broken.value, "target": metre.value, "values": [1]},
+            )
+            assert r.status_code == 404
+    finally:
+        pq.functional_units.remove(formula)
+        pq.tabulated_units.remove(table)
+        db.delete(formula)
+        db.delete(table)
+        bump_catalog_version(db)
+        db.commit()
+
+
+def test_convert_batch_linear(client: TestClient, db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, pq, factor=1.0)
+    kilometre = create_random_linear_unit(db, pq, factor=1000.0)
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/convert/batch",
+        json={
+            "source": kilometre.value,
+            "target": str(metre.id),
+            "values": [0, 1.5, -2],
+        },
+    )
+    assert r.status_code == 200
+    assert r.json()["values"] == [0, 1500, -2000]
+
+
+def test_convert_batch_functional(client: TestClient, db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    kelvin = create_random_linear_unit(db, pq, factor=1.0)
+    fahrenheit = create_random_functional_unit(
+        db,
+        pq,
+        to_base="(x - 32) * 5 / 9 + 273.15",
+        from_base="(x - 273.15) * 9 / 5 + 32",
+    )
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/convert/batch",
+        json={"source": fahrenheit.value, "target": kelvin.value, "values": [32, 212]},
+    )
+    assert r.status_code == 200
+    assert r.json()["values"] == pytest.approx([273.15, 373.15])
+
+
+def test_convert_exact(client: TestClient, db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    foot = create_random_linear_unit(db, pq, factor=0.3048)
+    inch = create_random_linear_unit(db, pq, factor=0.0254)
+    decibel = create_random_functional_unit(
+        db, pq, to_base="10 ^ (x / 10)", from_base="10 * log10(x)"
+    )
+    url = f"{settings.API_V1_STR}/unitsystems/convert/exact"
+    r = client.post(
+        url,
+        json={"source": foot.value, "target": inch.value, "values": [0.1, 2, "1/3"]},
+    )
+    assert r.status_code == 200
+    assert r.json()["values"] == ["6/5", "24", "4"]
+
+    r = client.post(
+        url, json={"source": foot.value, "target": inch.value, "values": ["x"]}
+    )
+    assert r.status_code == 422
+    r = client.post(
+        url,
+        json={"source": foot.value, "target": inch.value, "values": ["1e200000000"]},
+    )
+    assert r.status_code == 422
+    r = client.post(
+        url,
+        json={
+            "source": f"{foot.value}^30000000",
+            "target": f"{inch.value}^30000000",
+            "values": [1],
+        },
+    )
+    assert r.status_code == 422
+    r = client.post(
+        url, json={"source": decibel.value, "target": inch.value, "values": [1]}
+    )
+    assert r.status_code == 422
+    r = client.post(url, json={"source": "nope", "target": inch.value, "values": [1]})
+    assert r.status_code == 404
+
+
+def test_convert_batch_non_finite_results_are_null(
+    client: TestClient, db: Session
+) -> None:
+    pq = create_random_physical_quantity(db)
+    base = create_random_linear_unit(db, pq, factor=1.0)
+    decibel = create_random_functional_unit(
+        db, pq, to_base="10 ^ (x / 10)", from_base="10 * log10(x)"
+    )
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/convert/batch",
+        json={"source": base.value, "target": decibel.value, "values": [100, 0, -1]},
+    )
+    assert r.status_code == 200
+    assert r.json()["values"] == [pytest.approx(20), None, None]
+
+
+def test_convert_batch_incompatible_units(client: TestClient, db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, pq, factor=1.0, base="m")
+    gram = create_random_linear_unit(db, pq, factor=1.0, base="kg")
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/convert/batch",
+        json={"source": metre.value, "target": gram.value, "values": [1]},
+    )
+    assert r.status_code == 422
+
+
+@pytest.mark.parametrize("expression", ["{m}/0", "2^5000*{m}", "{m}^1000"])
+def test_convert_batch_invalid_expression(
+    client: TestClient, db: Session, expression: str
+) -> None:
+    pq = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, pq, factor=1000.0, base="m")
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/convert/batch",
+        json={"source": expression.format(m=metre.value), "target": "m", "values": [1]},
+    )
+    assert r.status_code == 422
+
+
+def test_convert_batch_unknown_unit(client: TestClient) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/convert/batch",
+        json={"source": str(uuid.uuid4()), "target": "m", "values": [1]},
+    )
+    assert r.status_code == 404
+    assert r.json()["detail"] == "Source unit not found"
+
+
+def test_convert_batch_compound_units(client: TestClient, db: Session) -> None:
+    length = create_random_physical_quantity(db)
+    time = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, length, factor=1.0, base="m")
+    kilometre = create_random_linear_unit(db, length, factor=1000.0, base="m")
+    second = create_random_linear_unit(db, time, factor=1.0, base="s")
+    hour = create_random_linear_unit(db, time, factor=3600.0, base="s")
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/convert/batch",
+        json={
+            "source": f"{kilometre.value}/{hour.value}",
+            "target": f"{metre.value}*{second.value}^-1",
+            "values": [36, 72],
+        },
+    )
+    assert r.status_code == 200
+    assert r.json()["values"] == pytest.approx([10, 20])
+
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/convert/batch",
+        json={
+            "source": f"{kilometre.value}/{hour.value}",
+            "target": metre.value,
+            "values": [1],
+        },
+    )
+    assert r.status_code == 422
+
+
+def test_search_units(client: TestClient, db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    alias = f"furlongish{random_lower_string()[:8]}"
+    unit = create_random_linear_unit(db, pq, factor=1.0, aliases=[alias])
+    r = client.get(
+        f"{settings.API_V1_STR}/unitsystems/units/search",
+        params={"q": unit.value[:10], "limit": 5},
+    )
+    assert r.status_code == 200
+    assert r.json()[0]["id"] == str(unit.id)
+
+    r = client.get(
+        f"{settings.API_V1_STR}/unitsystems/units/search", params={"q": alias}
+    )
+    assert r.status_code == 200
+    match = next(m for m in r.json() if m["id"] == str(unit.id))
+    assert match["kind"] == "alias" and match["distance"] == 0
+
+
+def test_convert_batch_tabulated(client: TestClient, db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    celsius = create_random_linear_unit(db, pq, factor=1.0)
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/physicalquantities/{pq.id}/addtabulatedunit",
+        json={
+            "name": "type K millivolt",
+            "value": random_lower_string(),
+            "base": "base",
+            "unitPoints": [0.0, 4.096, 8.138],
+            "basePoints": [0.0, 100.0, 200.0],
+        },
+    )
+    assert r.status_code == 200
+    millivolt = r.json()["value"]
+
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/convert/batch",
+        json={"source": millivolt, "target": celsius.value, "values": [2.048, 8.138]},
+    )
+    assert r.status_code == 200
+    assert r.json()["values"] == pytest.approx([50, 200])
+
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/convert/batch",
+        json={"source": celsius.value, "target": millivolt, "values": [500]},
+    )
+    assert r.status_code == 422
+
+
+def test_add_tabulated_unit_rejects_unsorted_points(
+    client: TestClient, db: Session
+) -> None:
+    pq = create_random_physical_quantity(db)
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/physicalquantities/{pq.id}/addtabulatedunit",
+        json={
+            "name": "bad",
+            "value": "bad",
+            "base": "base",
+            "unitPoints": [1.0, 0.0],
+            "basePoints": [0.0, 1.0],
+        },
+    )
+    assert r.status_code == 422
+
+
+def test_convert_stream_csv(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "UNIT_STREAM_CHUNK_ROWS", 2)
+    pq = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, pq, factor=1.0)
+    kilometre = create_random_linear_unit(db, pq, factor=1000.0)
+    rows = "".join(f"{i},{i / 2}\n" for i in range(5))
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/convert/stream",
+        params={"column": "distance", "source": kilometre.value, "target": metre.value},
+        content=f"id,distance\n{rows}",
+        headers={"Content-Type": "text/csv"},
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    assert r.text.splitlines() == ["id,distance"] + [
+        f"{i},{i * 500.0}" for i in range(5)
+    ]
+
+
+def test_convert_stream_ndjson(client: TestClient, db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, pq, factor=1.0)
+    kilometre = create_random_linear_unit(db, pq, factor=1000.0)
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/convert/stream",
+        params={
+            "column": "d",
+            "source": metre.value,
+            "target": kilometre.value,
+            "format": "ndjson",
+        },
+        content=b'{"d": 1500}\n{"d": 20}\n',
+    )
+    assert r.status_code == 200
+    assert r.text.splitlines() == ['{"d":1.5}', '{"d":0.02}']
+
+
+def test_convert_stream_ends_with_error_record(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "UNIT_STREAM_CHUNK_ROWS", 2)
+    pq = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, pq, factor=1.0)
+    params = {"column": "d", "source": metre.value, "target": metre.value}
+    url = f"{settings.API_V1_STR}/unitsystems/convert/stream"
+
+    r = client.post(url, params=params, content=b"d\n1\n2\n3\nabc\n")
+    assert r.status_code == 200
+    lines = r.text.splitlines()
+    assert lines[:3] == ["d", "1.0", "2.0"] and lines[-1].startswith("#error,")
+
+    r = client.post(
+        url,
+        params={**params, "format": "ndjson"},
+        content=b'{"d": 1}\n{"d": 2}\n{"d": "x"}\n',
+    )
+    assert r.status_code == 200
+    lines = r.text.splitlines()
+    assert lines[:2] == ['{"d":1.0}', '{"d":2.0}'] and '"error"' in lines[-1]
+
+
+def test_convert_stream_rejects_unknown_column(client: TestClient, db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, pq, factor=1.0)
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/convert/stream",
+        params={"column": "nope", "source": metre.value, "target": metre.value},
+        content=b"a,b\n1,2\n",
+    )
+    assert r.status_code == 422
+
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/convert/stream",
+        params={"column": "a", "source": "nosuchunit", "target": metre.value},
+        content=b"a,b\n1,2\n",
+    )
+    assert r.status_code == 404
+
+
+def test_unit_system_membership(client: TestClient, db: Session) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/", json={"name": random_lower_string()}
+    )
+    unitsystem_id = r.json()["id"]
+    url = f"{settings.API_V1_STR}/unitsystems/{unitsystem_id}"
+    length = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, length, factor=1.0)
+    mass = create_random_physical_quantity(db)
+    create_random_physical_quantity(db)
+
+    r = client.get(url)
+    assert r.status_code == 200
+    assert r.json()["physical_quantities"] == []
+
+    r = client.post(
+        f"{url}/physicalquantities",
+        json={
+            "members": [
+                {"physicalquantity_id": str(length.id), "unit_id": str(metre.id)},
+                {"physicalquantity_id": str(mass.id)},
+            ]
+        },
+    )
+    assert r.status_code == 200
+    assert {q["id"] for q in r.json()["physical_quantities"]} == {
+        str(length.id),
+        str(mass.id),
+    }
+    assert r.json()["preferred_units"] == {str(length.id): str(metre.id)}
+
+    r = client.post(
+        f"{url}/physicalquantities/remove",
+        json={"physicalquantity_ids": [str(mass.id)]},
+    )
+    assert r.status_code == 200
+    assert [q["id"] for q in client.get(url).json()["physical_quantities"]] == [
+        str(length.id)
+    ]
+
+
+def test_unit_system_membership_validation(client: TestClient, db: Session) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/", json={"name": random_lower_string()}
+    )
+    url = f"{settings.API_V1_STR}/unitsystems/{r.json()['id']}/physicalquantities"
+    length = create_random_physical_quantity(db)
+    mass = create_random_physical_quantity(db)
+    gram = create_random_linear_unit(db, mass, factor=0.001)
+
+    r = client.post(url, json={"members": [{"physicalquantity_id": str(uuid.uuid4())}]})
+    assert r.status_code == 404
+    r = client.post(
+        url,
+        json={
+            "members": [
+                {"physicalquantity_id": str(length.id), "unit_id": str(gram.id)}
+            ]
+        },
+    )
+    assert r.status_code == 422
+
+
+def test_import_unit_catalog(client: TestClient) -> None:
+    url = f"{settings.API_V1_STR}/unitsystems/addphysicalquantities"
+    r = client.post(url, params={"dry_run": True})
+    assert r.status_code == 200
+    assert r.json()["dry_run"] is True
+
+    r = client.post(url)
+    assert r.status_code == 200
+    r = client.post(url, params={"dry_run": True})
+    report = r.json()
+    assert report["created_quantities"] == []
+    assert report["created_units"] == [] and report["updated_units"] == []
+    assert report["unchanged_units"] > 0
+
+
+def test_unit_system_bundle(client: TestClient, db: Session) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/", json={"name": random_lower_string()}
+    )
+    url = f"{settings.API_V1_STR}/unitsystems/{r.json()['id']}"
+    temperature = create_random_physical_quantity(db)
+    kelvin = create_random_linear_unit(db, temperature, factor=1.0)
+    celsius = create_random_functional_unit(
+        db, temperature, to_base="x + 273.15", from_base="x - 273.15"
+    )
+    decibel = create_random_functional_unit(
+        db, temperature, to_base="10 ^ (x / 10)", from_base="10 * log10(x)"
+    )
+    client.post(
+        f"{url}/physicalquantities",
+        json={
+            "members": [
+                {"physicalquantity_id": str(temperature.id), "unit_id": str(celsius.id)}
+            ]
+        },
+    )
+
+    r = client.get(f"{url}/bundle")
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+    assert etag.startswith('"')
+    bundle = r.json()
+    units = {row[0]: row for row in bundle["units"]}
+    assert units[str(kelvin.id)][4:] == ["affine", 1.0, 0.0]
+    assert units[str(celsius.id)][4:] == ["affine", 1.0, 273.15]
+    assert units[str(decibel.id)][4:] == ["formula", "10 ^ (x / 10)", "10 * log10(x)"]
+    [quantity] = bundle["quantities"]
+    assert quantity[0] == str(temperature.id)
+    assert bundle["units"][quantity[2]][0] == str(celsius.id)
+    assert sorted(quantity[3]) == [0, 1, 2]
+
+    r = client.get(f"{url}/bundle", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+
+    # Catalog changes outside the bundled quantities keep the ETag
+    create_random_linear_unit(db, create_random_physical_quantity(db), factor=2.0)
+    r = client.get(f"{url}/bundle", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+
+    create_random_linear_unit(db, temperature, factor=0.5)
+    r = client.get(f"{url}/bundle", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+    assert len(r.json()["units"]) == 4
+
+
+def test_reexpress_in_unit_system(client: TestClient, db: Session) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/unitsystems/", json={"name": random_lower_string()}
+    )
+    url = f"{settings.API_V1_STR}/unitsystems/{r.json()['id']}"
+    length = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, length, factor=1.0)
+    foot = create_random_linear_unit(db, length, factor=0.3048)
+    client.post(
+        f"{url}/physicalquantities",
+        json={
+            "members": [
+                {"physicalquantity_id": str(length.id), "unit_id": str(metre.id)}
+            ]
+        },
+    )
+
+    now = datetime.now(timezone.utc)
+    audit: dict[str, Any] = {
+        "createdAt": now,
+        "createdBy": uuid.uuid4(),
+        "updatedAt": now,
+        "updatedBy": uuid.uuid4(),
+    }
+    project = models.Project(
+        name="p",
+        client="c",
+        status="s",
+        type="t",
+        startDate=now,
+        expectedDeliveryDate=now,
+        version=1,
+        isLastVersion=True,
+        is_deleted=False,
+        **audit,
+    )
+    test = models.Test(
+        isVLCompatible=True, version=1, isLastVersion=True, is_deleted=False, **audit
+    )
+    objective = models.ProjectObjective(
+        project=project,
+        project_id=project.id,
+        name="o",
+        valueMin=10,
+        valueMax=None,
+        physicalQuantity=foot.value,
+        isOptional=False,
+    )
+    condition = models.RealCondition(
+        test=test,
+        test_id=test.id,
+        name="c",
+        value="100",
+        physicalQuantity=foot.value,
+        required=True,
+    )
+    formula = models.Reading(
+        test=test,
+        test_id=test.id,
+        name="r",
+        value="x * 2",
+        physicalQuantity=foot.value,
+        isRequired=True,
+    )
+    unknown = models.VLReading(
+        test=test,
+        test_id=test.id,
+        name="v",
+        value="1",
+        physicalQuantity="no-such-unit",
+        isRequired=True,
+    )
+    db.add_all([project, test, objective, condition, formula, unknown])
+    db.commit()
+
+    body = {"project_ids": [str(project.id)], "test_ids": [str(test.id)]}
+    r = client.post(f"{url}/reexpress", json=body, params={"dry_run": True})
+    assert r.status_code == 200
+    report = r.json()
+    converted = {row["id"]: row for row in report["converted"]}
+    assert converted[str(objective.id)]["values"] == {
+        "valueMin": pytest.approx(3.048),
+        "valueMax": None,
+    }
+    assert converted[str(condition.id)]["values"] == {"value": pytest.approx(30.48)}
+    assert converted[str(condition.id)]["target"] == metre.value
+    assert {row["id"] for row in report["skipped"]} == {
+        str(formula.id),
+        str(unknown.id),
+    }
+    db.refresh(condition)
+    assert condition.value == "100"
+
+    r = client.post(f"{url}/reexpress", json=body)
+    assert r.status_code == 200
+    db.refresh(condition)
+    db.refresh(objective)
+    assert float(condition.value) == pytest.approx(30.48)
+    assert condition.physicalQuantity == metre.value
+    assert objective.valueMin == pytest.approx(3.048) and objective.valueMax is None
+    r = client.post(f"{url}/reexpress", json=body)
+    assert r.json()["converted"] == [] and r.json()["unchanged"] == 2
+
+    r = client.post(f"{url}/reexpress", json={"test_ids": [str(uuid.uuid4())]})
+    assert r.status_code == 404
+
+
+def test_catalog_diff_and_merge(client: TestClient, db: Session) -> None:
+    url = f"{settings.API_V1_STR}/unitsystems/catalog"
+    pq = create_random_physical_quantity(db)
+    create_random_linear_unit(db, pq, factor=1.0)
+    foot = create_random_linear_unit(db, pq, factor=0.3048)
+
+    r = client.get(f"{url}/hashes", params={"quantity": pq.quantity})
+    assert r.status_code == 200
+    hashes = r.json()
+    assert list(hashes["units"]) == [pq.quantity]
+    r = client.post(f"{url}/diff", json=hashes)
+    assert r.json()["identical"] is True
+
+    # Another environment holding a stale foot sends its hashes
+    stale = {**hashes, "root": "stale"}
+    stale["quantities"] = {**hashes["quantities"], pq.quantity: "stale"}
+    stale["units"] = {
+        pq.quantity: {**hashes["units"][pq.quantity], f"linear:{foot.value}": "stale"}
+    }
+    diff = client.post(f"{url}/diff", json=stale).json()
+    assert diff["changed_quantities"] == [pq.quantity]
+    [entry] = diff["catalog"]["physicalQuantities"]
+    assert [u["value"] for u in entry["linearUnits"]] == [foot.value]
+
+    # Merging the exported units here changes nothing, since they came from here
+    r = client.post(f"{url}/merge", json=diff["catalog"], params={"dry_run": True})
+    assert r.status_code == 200
+    assert r.json()["updated_units"] == [] and r.json()["unchanged_units"] == 1
+
+    entry["linearUnits"][0]["factorToBase"] = 0.3
+    r = client.post(f"{url}/merge", json={"physicalQuantities": [entry]})
+    assert r.json()["updated_units"] == [f"{pq.quantity}/{foot.value}"]
+    r = client.get(f"{url}/hashes")
+    assert r.json()["quantities"][pq.quantity] != hashes["quantities"][pq.quantity]
@@ -0,0 +1,114 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlmodel import Session, col, select
+
+from app.core.archive import archive_deleted
+from app.core.db import engine
+from app.models import (
+    Attachment,
+    AttachmentLink,
+    ObjectTemplate,
+    Project,
+    ProjectObjective,
+    archive_tables,
+)
+
+
+def archived_ids(db: Session, table: str) -> set[uuid.UUID]:
+    return set(db.exec(select(archive_tables[table].c.id)).all())
+
+
+def hot_ids(db: Session, model: type, ids: list[uuid.UUID]) -> set[uuid.UUID]:
+    id_column = col(model.id)  # type: ignore[attr-defined]
+    statement = select(id_column).where(id_column.in_(ids))
+    return set(db.exec(statement.execution_options(include_deleted=True)).all())
+
+
+def test_archive_deleted(db: Session) -> None:
+    now = datetime.now(timezone.utc)
+    audit: dict[str, Any] = {
+        "createdAt": now,
+        "createdBy": uuid.uuid4(),
+        "updatedAt": now,
+        "updatedBy": uuid.uuid4(),
+    }
+
+    def project(deleted_days_ago: int | None) -> Project:
+        project = Project(
+            name="p",
+            client="c",
+            status="s",
+            type="t",
+            startDate=now,
+            expectedDeliveryDate=now,
+            version=1,
+            isLastVersion=True,
+            is_deleted=deleted_days_ago is not None,
+            deleted_at=None
+            if deleted_days_ago is None
+            else now - timedelta(days=deleted_days_ago),
+            **audit,
+        )
+        project.objectives = [
+            ProjectObjective(name="o", isOptional=False, project_id=project.id)
+        ]
+        return project
+
+    old, recent, live = project(40), project(2), project(None)
+    template = ObjectTemplate(
+        name="o",
+        description="",
+        type="t",
+        fabricant="f",
+        fournisseur="f",
+        version=1,
+        isLastVersion=True,
+        createdAt=now,
+        updatedAt=now,
+        is_deleted=True,
+        deleted_at=now - timedelta(days=31),
+    )
+    attachment = Attachment(
+        file_name="a",
+        file_type="pdf",
+        size_bytes=1,
+        uploaded_at=now,
+        reference_count=1,
+        object_template=template,
+    )
+    link = AttachmentLink(
+        attachment=attachment,
+        attachment_id=attachment.id,
+        class_type="project",
+        object_id=live.id,
+        added_at=now,
+        is_required=False,
+    )
+    db.add_all([old, recent, live, template, link])
+    db.commit()
+    old_id, recent_id, live_id = old.id, recent.id, live.id
+    objectives = {p.id: p.objectives[0].id for p in (old, recent, live)}
+    template_id, attachment_id, link_id = template.id, attachment.id, link.id
+
+    # One root per batch, so the job goes through several
+    moved = archive_deleted(engine, timedelta(days=30), batch_size=1)
+    assert moved["project"] >= 1 and moved["objecttemplate"] >= 1
+
+    assert hot_ids(db, Project, [old_id, recent_id, live_id]) == {recent_id, live_id}
+    assert old_id in archived_ids(db, "project")
+    assert objectives[old_id] in archived_ids(db, "projectobjective")
+    assert hot_ids(db, ProjectObjective, list(objectives.values())) == {
+        objectives[recent_id],
+        objectives[live_id],
+    }
+    # A live attachment goes with its deleted template, and its links with it
+    assert template_id in archived_ids(db, "objecttemplate")
+    assert attachment_id in archived_ids(db, "attachment")
+    assert link_id in archived_ids(db, "attachmentlink")
+    assert not hot_ids(db, Attachment, [attachment_id])
+
+    archived = archive_tables["project"]
+    row = db.execute(archived.select().where(archived.c.id == old_id)).one()
+    assert row.name == "p" and row.is_deleted and row.archived_at is not None
@@ -0,0 +1,65 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+
+from app.core.config import settings
+from app.core.pool import WAIT_BUCKETS, MeteredQueuePool
+
+
+def test_pool_metrics() -> None:
+    engine = create_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI),
+        poolclass=MeteredQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    pool = engine.pool
+    assert isinstance(pool, MeteredQueuePool)
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            stats = pool.stats("test")
+            assert (stats.checked_out, stats.checkouts, stats.connects) == (1, 1, 1)
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+        with engine.connect():
+            pass
+
+        stats = pool.stats("test")
+        assert (stats.checked_out, stats.checked_in) == (0, 1)
+        assert (stats.checkouts, stats.connects, stats.timeouts) == (2, 1, 1)
+        assert stats.wait_seconds_max >= 0.05
+        assert list(stats.wait_buckets) == [*map(str, WAIT_BUCKETS), "+Inf"]
+        assert stats.wait_buckets["+Inf"] == 3
+        # The timed-out checkout waited past the 0.05 s bucket
+        assert stats.wait_buckets["0.05"] <= 2
+
+        # Counters survive the pool being recreated
+        engine.dispose()
+        assert engine.pool is not pool
+        assert engine.pool.stats("test").timeouts == 1  # type: ignore[attr-defined]
+    finally:
+        engine.dispose()
+
+
+def test_read_pool_metrics(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/pool-metrics/", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    pools = {pool["name"]: pool for pool in r.json()}
+    assert pools.keys() == {"primary", "primary-async"}
+    assert pools["primary"]["pool_size"] == settings.DB_POOL_SIZE
+    assert pools["primary"]["checkouts"] >= 1
+
+
+def test_read_pool_metrics_requires_superuser(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/pool-metrics/", headers=normal_user_token_headers
+    )
+    assert r.status_code == 403
@@ -0,0 +1,154 @@
+import asyncio
+import time
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.core.config import settings
+from app.core.replica import PRIMARY_COOKIE, ReplicaRouter
+
+
+def make_request(method: str, cookie: str | None = None) -> Request:
+    headers = [(b"cookie", f"{PRIMARY_COOKIE}={cookie}".encode())] if cookie else []
+    return Request({"type": "http", "method": method, "path": "/", "headers": headers})
+
+
+class LaggingRouter(ReplicaRouter):
+    lag_seconds = 0.0
+
+    async def measure_lag(self) -> float | None:
+        return self.lag_seconds
+
+
+class StalledRouter(ReplicaRouter):
+    async def _query_lag(self) -> float:
+        await asyncio.sleep(60)
+        return 0.0
+
+
+def test_replica_routing() -> None:
+    async def run() -> None:
+        url = str(settings.SQLALCHEMY_DATABASE_URI)
+        # The primary stands in for its own replica: a server not in recovery has no lag
+        primary, replica = create_async_engine(url), create_async_engine(url)
+        router = ReplicaRouter(primary, replica, max_lag=2.0, check_interval=1.0)
+        try:
+            assert await router.engine_for(make_request("GET"), Response()) is replica
+            assert router.lag == 0.0
+
+            response = Response()
+            assert await router.engine_for(make_request("POST"), response) is primary
+            cookie = response.headers["set-cookie"]
+            # Pinned for the lag tolerance plus one check interval
+            assert cookie.startswith(f"{PRIMARY_COOKIE}=") and "Max-Age=3" in cookie
+            value = cookie.split(";")[0].split("=", 1)[1]
+            # Read-your-writes: reads after a write stay on the primary for a while
+            assert (
+                await router.engine_for(make_request("GET", value), Response())
+                is primary
+            )
+            assert (
+                await router.engine_for(make_request("GET", "1.0"), Response())
+                is replica
+            )
+            assert (
+                await router.engine_for(make_request("GET", "junk"), Response())
+                is replica
+            )
+        finally:
+            await primary.dispose()
+            await replica.dispose()
+
+    asyncio.run(run())
+
+
+def test_replica_lag_tolerance() -> None:
+    async def run() -> None:
+        primary = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+        replica = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+        router = LaggingRouter(primary, replica, max_lag=2.0, check_interval=0.0)
+        router.lag_seconds = 5.0
+        assert await router.engine_for(make_request("GET"), Response()) is primary
+        router.lag_seconds = 1.5
+        assert await router.engine_for(make_request("GET"), Response()) is replica
+
+        # Between checks the last measurement holds
+        router.check_interval = 60.0
+        router.lag_seconds = 5.0
+        assert await router.engine_for(make_request("GET"), Response()) is replica
+
+    asyncio.run(run())
+
+
+def test_unreachable_replica_falls_back_to_primary() -> None:
+    async def run() -> None:
+        primary: AsyncEngine = create_async_engine(
+            str(settings.SQLALCHEMY_DATABASE_URI)
+        )
+        replica = create_async_engine(
+            str(settings.SQLALCHEMY_DATABASE_URI).replace(
+                f":{settings.POSTGRES_PORT}/", ":1/"
+            ),
+            connect_args={"connect_timeout": 1},
+        )
+        router = ReplicaRouter(primary, replica, max_lag=2.0, check_interval=60.0)
+        try:
+            assert await router.engine_for(make_request("GET"), Response()) is primary
+            assert router.lag is None
+        finally:
+            await replica.dispose()
+
+    asyncio.run(run())
+
+
+def test_no_replica_configured() -> None:
+    async def run() -> None:
+        primary = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+        router = ReplicaRouter(primary, None, max_lag=2.0, check_interval=1.0)
+        response = Response()
+        assert await router.engine_for(make_request("POST"), response) is primary
+        assert "set-cookie" not in response.headers
+        assert await router.engine_for(make_request("GET"), Response()) is primary
+
+    asyncio.run(run())
+
+
+def test_unresponsive_replica_check_is_bounded() -> None:
+    async def run() -> None:
+        # Accepts connections but never answers the startup packet
+        server = await asyncio.start_server(
+            lambda r, w: asyncio.sleep(60), "127.0.0.1", 0
+        )
+        port = server.sockets[0].getsockname()[1]
+        primary = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+        replica = create_async_engine(
+            f"postgresql+psycopg://{settings.POSTGRES_USER}@127.0.0.1:{port}/db"
+        )
+        router = ReplicaRouter(primary, replica, max_lag=2.0, check_interval=0.2)
+        try:
+            started = time.monotonic()
+            assert await router.engine_for(make_request("GET"), Response()) is primary
+            assert time.monotonic() - started < 5
+        finally:
+            server.close()
+            await replica.dispose()
+
+    asyncio.run(run())
+
+
+def test_stalled_lag_probe_falls_back_to_primary() -> None:
+    async def run() -> None:
+        primary = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+        replica = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+        router = StalledRouter(primary, replica, max_lag=2.0, check_interval=0.1)
+        try:
+            started = time.monotonic()
+            assert await router.measure_lag() is None
+            assert await router.engine_for(make_request("GET"), Response()) is primary
+            assert router.lag is None
+            assert time.monotonic() - started < 5
+        finally:
+            await replica.dispose()
+            await primary.dispose()
+
+    asyncio.run(run())
@@ -0,0 +1,102 @@
+import uuid
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.core.soft_delete import soft_delete
+from app.models import Attachment, ObjectTemplate, Project
+
+
+def make_project(db: Session, deleted: bool = False) -> Project:
+    now = datetime.now(timezone.utc)
+    project = Project(
+        name="p",
+        client="c",
+        status="s",
+        type="t",
+        startDate=now,
+        expectedDeliveryDate=now,
+        version=1,
+        isLastVersion=True,
+        is_deleted=False,
+        createdAt=now,
+        createdBy=uuid.uuid4(),
+        updatedAt=now,
+        updatedBy=uuid.uuid4(),
+    )
+    if deleted:
+        soft_delete(project)
+    db.add(project)
+    db.commit()
+    db.refresh(project)
+    db.expunge(project)
+    return project
+
+
+def test_queries_hide_deleted_rows(db: Session) -> None:
+    live, deleted = make_project(db), make_project(db, deleted=True)
+    ids = [live.id, deleted.id]
+
+    assert db.exec(select(Project.id).where(col(Project.id).in_(ids))).all() == [
+        live.id
+    ]
+    assert db.get(Project, deleted.id) is None
+    assert db.get(Project, live.id) is not None
+    everything = (
+        select(Project.id)
+        .where(col(Project.id).in_(ids))
+        .execution_options(include_deleted=True)
+    )
+    assert set(db.exec(everything).all()) == set(ids)
+
+
+def test_relationships_hide_deleted_rows(db: Session) -> None:
+    now = datetime.now(timezone.utc)
+    template = ObjectTemplate(
+        name="o",
+        description="",
+        type="t",
+        fabricant="f",
+        fournisseur="f",
+        version=1,
+        isLastVersion=True,
+        createdAt=now,
+        updatedAt=now,
+    )
+    template.attachments = [
+        Attachment(
+            file_name=name,
+            file_type="pdf",
+            size_bytes=1,
+            uploaded_at=now,
+            reference_count=1,
+        )
+        for name in ("kept", "dropped")
+    ]
+    soft_delete(template.attachments[1])
+    template_id = template.id
+    db.add(template)
+    db.commit()
+    db.expunge(template)
+
+    loaded = db.exec(
+        select(ObjectTemplate)
+        .where(ObjectTemplate.id == template_id)
+        .options(selectinload(ObjectTemplate.attachments))  # type: ignore[arg-type]
+    ).one()
+    assert [a.file_name for a in loaded.attachments] == ["kept"]
+
+
+def test_deleted_project_is_not_found(client: TestClient, db: Session) -> None:
+    project = make_project(db)
+    url = f"{settings.API_V1_STR}/projects/{project.id}"
+    assert client.get(url).status_code == 200
+    assert client.delete(url).status_code == 200
+    assert client.get(url).status_code == 404
+    assert client.put(url, json={"name": "renamed"}).status_code == 404
+    assert str(project.id) not in {
+        p["id"] for p in client.get(f"{settings.API_V1_STR}/projects/").json()
+    }
@@ -0,0 +1,86 @@
+import uuid
+
+import numpy as np
+import pytest
+
+from app.units.affine import Affine, compose, detect_affine, detect_unit_affine
+from app.units.conversion import convert_array
+from app.units.formulas import CompiledFunctionalUnit
+from app.units.registry import RegisteredUnit
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        ("x", Affine(1.0, 0.0)),
+        ("x + 273.15", Affine(1.0, 273.15)),
+        ("(x - 32) * 5 / 9", Affine(5 / 9, -160 / 9)),
+        ("x * 9 / 5 + 32", Affine(1.8, 32.0)),
+        ("-(2 * x) + 10 ^ 2", Affine(-2.0, 100.0)),
+        ("x / (2 * pi)", Affine(1 / (2 * np.pi), 0.0)),
+        ("sqrt(4) * x", Affine(2.0, 0.0)),
+        ("x ^ 1 - 1", Affine(1.0, -1.0)),
+    ],
+)
+def test_detect_affine(source: str, expected: Affine) -> None:
+    affine = detect_affine(source)
+    assert affine is not None
+    assert affine.is_close(expected)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "x ^ 2",
+        "x * x",
+        "1 / x",
+        "log10(x)",
+        "10 ^ (x / 10)",
+        "5",
+        "x * 0",
+        "(-8) ^ (1 / 3) * x",
+    ],
+)
+def test_detect_affine_rejects_non_linear(source: str) -> None:
+    assert detect_affine(source) is None
+
+
+def test_detect_unit_affine_requires_consistent_inverse() -> None:
+    assert detect_unit_affine("x + 273.15", "x - 273.15") == Affine(1.0, 273.15)
+    assert detect_unit_affine("x + 273.15", "x - 273") is None
+    assert detect_unit_affine("x ^ 2", "sqrt(x)") is None
+
+
+def test_compose_chain() -> None:
+    celsius_to_kelvin = Affine(1.0, 273.15)
+    kelvin_to_fahrenheit = Affine(1.8, -459.67)
+    chain = compose(celsius_to_kelvin, kelvin_to_fahrenheit)
+    assert chain(100) == pytest.approx(212)
+    assert compose(chain, chain.inverse())(37.5) == pytest.approx(37.5)
+
+
+def test_convert_array_folds_affine_functional_units() -> None:
+    def functional(to_base: str, from_base: str) -> RegisteredUnit:
+        return RegisteredUnit(
+            id=uuid.uuid4(),
+            name=to_base,
+            value=to_base,
+            base="K",
+            index=0,
+            quantity_ids=(),
+            toBase=to_base,
+            fromBase=from_base,
+            compiled=CompiledFunctionalUnit.from_formulas(to_base, from_base),
+            folded_affine=detect_unit_affine(to_base, from_base),
+        )
+
+    celsius = functional("x + 273.15", "x - 273.15")
+    fahrenheit = functional("(x - 32) * 5 / 9 + 273.15", "(x - 273.15) * 9 / 5 + 32")
+    decibel = functional("10 ^ (x / 10)", "10 * log10(x)")
+    assert celsius.affine is not None and decibel.affine is None
+
+    values = np.array([-40.0, 0.0, 100.0])
+    assert convert_array(values, celsius, fahrenheit) == pytest.approx([-40, 32, 212])
+    assert convert_array(np.array([20.0]), decibel, celsius) == pytest.approx(
+        [100 - 273.15]
+    )
@@ -0,0 +1,56 @@
+from sqlmodel import Session
+
+from app.models import LinearUnit
+from app.tests.utils.unitsystem import (
+    create_random_linear_unit,
+    create_random_physical_quantity,
+)
+from app.units.catalog_hash import catalog_hashes_read, diff_catalog, unit_hash
+from app.units.registry import UnitRegistryCache
+
+
+def test_unit_hash_ignores_ids_and_alias_order() -> None:
+    spec = LinearUnit.Create(
+        name="foot", value="ft", base="m", factorToBase=0.3048, aliases=["a", "b"]
+    )
+    same = LinearUnit.Create(
+        name="foot", value="ft", base="m", factorToBase=0.3048, aliases=["b", "a"]
+    )
+    other = LinearUnit.Create(name="foot", value="ft", base="m", factorToBase=0.304)
+    assert unit_hash("linear", spec) == unit_hash("linear", same)
+    assert unit_hash("linear", spec) != unit_hash("linear", other)
+    assert unit_hash("linear", spec) != unit_hash("functional", spec)
+
+
+def test_diff_descends_to_changed_units(db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, pq, factor=1.0)
+    foot = create_random_linear_unit(db, pq, factor=0.3048)
+    hashes = UnitRegistryCache().get(db).catalog_hashes
+    name = pq.quantity
+    assert diff_catalog(hashes, catalog_hashes_read(hashes)).identical
+
+    # The other side has an older foot and lacks this quantity's hash tree otherwise
+    remote = catalog_hashes_read(hashes, [name])
+    remote.root = "other"
+    remote.quantities[name] = "older"
+    remote.units[name][f"linear:{foot.value}"] = "older"
+    remote.units[name]["linear:gone"] = "x"
+    remote.quantities["only there"] = "x"
+
+    diff = diff_catalog(hashes, remote)
+    assert not diff.identical
+    assert diff.changed_quantities == [name]
+    assert diff.removed_quantities == ["only there"]
+    assert diff.removed_units == [f"{name}/linear:gone"]
+    [entry] = [q for q in diff.catalog.physicalQuantities if q.name == name]
+    assert [u.value for u in entry.linearUnits] == [foot.value]
+    assert metre.value not in {
+        u.value for q in diff.catalog.physicalQuantities for u in q.linearUnits
+    }
+
+    # Without unit hashes the quantity is only flagged, to be asked about again
+    remote.units = {}
+    diff = diff_catalog(hashes, remote)
+    assert diff.pending_quantities == [name]
+    assert name not in {q.name for q in diff.catalog.physicalQuantities}
@@ -0,0 +1,117 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlmodel import Session
+
+from app.models import UnitCatalog
+from app.tests.units.test_registry import count_queries
+from app.tests.utils.utils import random_lower_string
+from app.units.catalog_import import (
+    CatalogImportError,
+    ImportPlan,
+    apply_import,
+    plan_import,
+)
+from app.units.registry import UnitRegistryCache, bump_catalog_version
+
+
+def make_catalog(quantity: str, unit_count: int, factor: float = 1.0) -> UnitCatalog:
+    return UnitCatalog.model_validate(
+        {
+            "physicalQuantities": [
+                {
+                    "name": quantity,
+                    "linearUnits": [
+                        {
+                            "name": f"unit {i}",
+                            "value": f"{quantity}-u{i}",
+                            "base": "b",
+                            "factorToBase": factor * (i + 1),
+                        }
+                        for i in range(unit_count)
+                    ],
+                    "functionalUnits": [
+                        {
+                            "name": "shifted",
+                            "value": f"{quantity}-f",
+                            "base": "b",
+                            "toBase": "x + 1",
+                            "fromBase": "x - 1",
+                        }
+                    ],
+                }
+            ]
+        }
+    )
+
+
+def run_import(db: Session, catalog: UnitCatalog) -> ImportPlan:
+    plan = plan_import(db, catalog, datetime.now(timezone.utc))
+    apply_import(db, plan)
+    bump_catalog_version(db)
+    db.commit()
+    return plan
+
+
+def test_import_creates_then_is_idempotent(db: Session) -> None:
+    quantity = random_lower_string()
+    plan = run_import(db, make_catalog(quantity, 3))
+    assert plan.created_quantities == [quantity]
+    assert len(plan.created_units) == 4
+
+    registry = UnitRegistryCache().get(db)
+    unit = registry.resolve(f"{quantity}-u2")
+    assert unit is not None and unit.factorToBase == 3.0
+    assert len(registry.quantities_by_name[quantity].unit_ids) == 4
+
+    again = plan_import(db, make_catalog(quantity, 3), datetime.now(timezone.utc))
+    assert again.is_empty
+    assert again.unchanged_units == 4
+
+
+def test_import_updates_changed_units(db: Session) -> None:
+    quantity = random_lower_string()
+    run_import(db, make_catalog(quantity, 2))
+    plan = run_import(db, make_catalog(quantity, 3, factor=10.0))
+    assert plan.created_quantities == []
+    assert plan.created_units == [f"{quantity}/{quantity}-u2"]
+    assert sorted(plan.updated_units) == [
+        f"{quantity}/{quantity}-u0",
+        f"{quantity}/{quantity}-u1",
+    ]
+
+    registry = UnitRegistryCache().get(db)
+    assert registry.resolve(f"{quantity}-u0").factorToBase == 10.0  # type: ignore[union-attr]
+
+
+def test_import_uses_a_fixed_number_of_statements(db: Session) -> None:
+    catalog = make_catalog(random_lower_string(), 1500)
+    with count_queries() as statements:
+        apply_import(db, plan_import(db, catalog, datetime.now(timezone.utc)))
+    db.rollback()
+    writes = [s for s in statements if s.startswith("INSERT")]
+    # Rows go out in multi-row batches of 1000: quantities, 2 + 1 unit batches, 2 + 1 link batches
+    assert len(writes) <= 7
+
+
+def test_import_rejects_invalid_catalog(db: Session) -> None:
+    catalog = UnitCatalog.model_validate(
+        {
+            "physicalQuantities": [
+                {
+                    "name": random_lower_string(),
+                    "functionalUnits": [
+                        {
+                            "name": "bad",
+                            "value": "bad",
+                            "base": "b",
+                            "toBase": "__import__('os')",
+                            "fromBase": "x",
+                        }
+                    ],
+                }
+            ]
+        }
+    )
+    with pytest.raises(CatalogImportError):
+        plan_import(db, catalog, datetime.now(timezone.utc))
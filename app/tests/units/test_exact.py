@@ -0,0 +1,83 @@
+from fractions import Fraction
+
+import pytest
+from sqlmodel import Session
+
+from app.tests.utils.unitsystem import (
+    create_random_functional_unit,
+    create_random_linear_unit,
+    create_random_physical_quantity,
+    create_random_tabulated_unit,
+)
+from app.units.affine import detect_exact_affine
+from app.units.conversion import ConversionError
+from app.units.exact import convert_exact, parse_exact
+from app.units.registry import UnitRegistryCache
+
+
+def test_parse_exact() -> None:
+    assert parse_exact(0.1) == Fraction(1, 10)
+    assert parse_exact(3) == 3
+    assert parse_exact("1/3") == Fraction(1, 3)
+    assert parse_exact(" 2.5e-3 ") == Fraction(1, 400)
+    assert parse_exact("1e1000") == 10**1000
+    for value in ("abc", "1/0", float("nan"), "1e200000000", "9" * 101, 10**100):
+        with pytest.raises(ConversionError):
+            parse_exact(value)
+
+
+def test_detect_exact_affine() -> None:
+    assert detect_exact_affine("(x - 32) * 5 / 9 + 273.15") == (
+        Fraction(5, 9),
+        Fraction(27315, 100) - Fraction(160, 9),
+    )
+    assert detect_exact_affine("x * 2 ^ 10") == (1024, 0)
+    assert detect_exact_affine("x * sqrt(2)") is None
+    assert detect_exact_affine("x * pi") is None
+    assert detect_exact_affine("x * 4 ^ 0.5") is None
+
+
+def test_convert_exact_chains(db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, pq, factor=1.0)
+    foot = create_random_linear_unit(db, pq, factor=0.3048)
+    inch = create_random_linear_unit(db, pq, factor=0.0254)
+    registry = UnitRegistryCache().get(db)
+
+    # 0.1 + 0.2 feet in inches: exactly 3.6, where floats give 3.6000000000000005
+    values = [Fraction(1, 10), Fraction(2, 10)]
+    assert sum(convert_exact(registry, values, foot.value, inch.value)) == Fraction(
+        18, 5
+    )
+    assert convert_exact(registry, [Fraction(1)], f"k{metre.value}", foot.value) == [
+        Fraction(1250000, 381)
+    ]
+    assert convert_exact(
+        registry, [Fraction(1)], f"{metre.value}/{foot.value}", "1"
+    ) == [Fraction(1250, 381)]
+    assert len(registry.exact_chains) == 3
+    convert_exact(registry, [Fraction(5)], foot.value, inch.value)
+    assert len(registry.exact_chains) == 3
+
+
+def test_convert_exact_affine_and_inexact_units(db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    kelvin = create_random_linear_unit(db, pq, factor=1.0)
+    fahrenheit = create_random_functional_unit(
+        db,
+        pq,
+        to_base="(x - 32) * 5 / 9 + 273.15",
+        from_base="(x - 273.15) * 9 / 5 + 32",
+    )
+    decibel = create_random_functional_unit(
+        db, pq, to_base="10 ^ (x / 10)", from_base="10 * log10(x)"
+    )
+    curve = create_random_tabulated_unit(db, pq, unit_points=[0, 1], base_points=[0, 2])
+    registry = UnitRegistryCache().get(db)
+
+    assert convert_exact(registry, [Fraction(212)], fahrenheit.value, kelvin.value) == [
+        Fraction(37315, 100)
+    ]
+    for unit in (decibel, curve):
+        with pytest.raises(ConversionError, match="no exact conversion"):
+            convert_exact(registry, [Fraction(1)], unit.value, kelvin.value)
@@ -0,0 +1,102 @@
+import pytest
+from sqlmodel import Session
+
+from app.tests.utils.unitsystem import (
+    create_random_functional_unit,
+    create_random_linear_unit,
+    create_random_physical_quantity,
+)
+from app.units.expressions import (
+    ExpressionError,
+    UnknownUnitError,
+    parse_expression,
+    resolve_expression,
+)
+from app.units.registry import UnitRegistryCache
+
+
+@pytest.mark.parametrize(
+    "expression, symbols",
+    [
+        ("kg*m/s^2", (("kg", 1), ("m", 1), ("s", -2))),
+        ("kg·m·s⁻²", (("kg", 1), ("m", 1), ("s", -2))),
+        ("kW·h", (("h", 1), ("kW", 1))),
+        ("kW h", (("h", 1), ("kW", 1))),
+        ("mm²", (("mm", 2),)),
+        ("m**3", (("m", 3),)),
+        ("J/(mol*K)", (("J", 1), ("K", -1), ("mol", -1))),
+        ("(m/s)^2", (("m", 2), ("s", -2))),
+        ("m/m", ()),
+    ],
+)
+def test_parse_expression(
+    expression: str, symbols: tuple[tuple[str, int], ...]
+) -> None:
+    assert parse_expression(expression).symbols == symbols
+
+
+def test_parse_expression_numeric_factor() -> None:
+    assert parse_expression("1000*m").factor == 1000
+    assert parse_expression("m/100").factor == pytest.approx(0.01)
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "",
+        "m/",
+        "(m*s",
+        "m^x",
+        "*m",
+        "m)",
+        "m/0",
+        "0*m",
+        "inf*m",
+        "m^65",
+        "((m^8)^8)^2",
+        "2^5000*m",
+        "1e300*1e300*m",
+    ],
+)
+def test_parse_expression_errors(expression: str) -> None:
+    with pytest.raises(ExpressionError):
+        parse_expression(expression)
+
+
+def test_resolve_expression(db: Session) -> None:
+    length = create_random_physical_quantity(db)
+    time = create_random_physical_quantity(db)
+    km = create_random_linear_unit(db, length, factor=1000.0, base="m")
+    h = create_random_linear_unit(db, time, factor=3600.0, base="s")
+    registry = UnitRegistryCache().get(db)
+
+    speed = resolve_expression(registry, f"{km.value}/{h.value}")
+    assert speed.dimension == (("m", 1), ("s", -1))
+    assert speed.scale == pytest.approx(1000 / 3600)
+    assert resolve_expression(registry, f"{km.value}/{h.value}") is speed
+
+    area = resolve_expression(registry, f"{km.value}²")
+    assert area.dimension == (("m", 2),)
+    assert area.scale == pytest.approx(1e6)
+
+
+def test_resolve_expression_rejects_offset_units(db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    celsius = create_random_functional_unit(
+        db, pq, to_base="x + 273.15", from_base="x - 273.15", base="K"
+    )
+    registry = UnitRegistryCache().get(db)
+    with pytest.raises(ExpressionError):
+        resolve_expression(registry, f"{celsius.value}/s")
+    with pytest.raises(UnknownUnitError):
+        resolve_expression(registry, "nosuchunit/s")
+
+
+def test_resolve_expression_rejects_out_of_range_scale(db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    unit = create_random_linear_unit(db, pq, factor=1e10, base="m")
+    registry = UnitRegistryCache().get(db)
+    with pytest.raises(ExpressionError):
+        resolve_expression(registry, f"{unit.value}^40")
+    with pytest.raises(ExpressionError):
+        resolve_expression(registry, f"{unit.value}^-40")
@@ -0,0 +1,100 @@
+import ast
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models import FunctionalUnit
+from app.units.formulas import (
+    FormulaCache,
+    FormulaError,
+    compile_formula,
+    parse_formula,
+)
+
+
+def test_compile_formula_arithmetic() -> None:
+    to_kelvin = compile_formula("x + 273.15")
+    assert to_kelvin(0) == pytest.approx(273.15)
+    fahrenheit = compile_formula("(x - 32) * 5 / 9")
+    assert fahrenheit(212) == pytest.approx(100)
+
+
+def test_compile_formula_caret_is_power() -> None:
+    assert compile_formula("x^2")(3) == 9
+    assert compile_formula("x^2 + 1")(3) == 10
+    assert compile_formula("2 * x^3")(3) == 54
+    assert compile_formula("-x^2")(3) == -9
+    assert compile_formula("2^3^2 + x")(0) == 512
+
+
+def test_compile_formula_bounds_powers() -> None:
+    assert isinstance(compile_formula("10 ^ x")(2), float)
+    assert compile_formula("x ^ -2")(2) == pytest.approx(0.25)
+
+
+@pytest.mark.parametrize(
+    "source",
+    ["x + 9**9**9", "x ^ x", "x^65", "(x + 1) ^ (x / 2)", "x * 10^400", "x / 0"],
+)
+def test_compile_formula_rejects_unbounded_powers(source: str) -> None:
+    with pytest.raises(FormulaError):
+        compile_formula(source)
+
+
+def test_parse_formula_folds_integer_constants() -> None:
+    body = parse_formula("x * 2^10").body
+    assert isinstance(body, ast.BinOp) and isinstance(body.right, ast.Constant)
+    assert body.right.value == 1024
+    # Divisions and floats are left for exact conversions to read as written
+    assert not isinstance(parse_formula("1 / 3").body, ast.Constant)
+
+
+def test_compile_formula_functions_and_constants() -> None:
+    assert compile_formula("10 ^ (x / 10)")(20) == pytest.approx(100)
+    assert compile_formula("log10(x)")(1000) == pytest.approx(3)
+    assert compile_formula("x * pi")(1) == pytest.approx(3.141592653589793)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "__import__('os').system('true')",
+        "x.__class__",
+        "y + 1",
+        "open('/etc/passwd')",
+        "[x for x in ()]",
+        "lambda: 1",
+        "x if x else 1",
+        "'a'",
+        "x +",
+    ],
+)
+def test_compile_formula_rejects_unsafe_input(source: str) -> None:
+    with pytest.raises(FormulaError):
+        compile_formula(source)
+
+
+def test_formula_cache_is_keyed_by_updated_at() -> None:
+    cache = FormulaCache()
+    unit = FunctionalUnit(
+        id=uuid.uuid4(),
+        name="celsius",
+        value="°C",
+        base="K",
+        toBase="x + 273.15",
+        fromBase="x - 273.15",
+        updatedAt=datetime(2025, 1, 1, tzinfo=timezone.utc),
+    )
+    compiled = cache.get(unit)
+    assert cache.get(unit) is compiled
+    assert compiled.from_base(compiled.to_base(21.5)) == pytest.approx(21.5)
+
+    unit.toBase = "x + 273"
+    unit.updatedAt = datetime(2025, 1, 2, tzinfo=timezone.utc)
+    recompiled = cache.get(unit)
+    assert recompiled is not compiled
+    assert recompiled.to_base(0) == 273
+
+    cache.invalidate(unit.id)
+    assert len(cache) == 0
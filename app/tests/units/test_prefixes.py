@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from sqlmodel import Session
+
+from app.models import LinearUnit
+from app.tests.utils.unitsystem import (
+    create_random_functional_unit,
+    create_random_linear_unit,
+    create_random_physical_quantity,
+)
+from app.units.conversion import convert
+from app.units.registry import UnitRegistryCache, bump_catalog_version
+
+
+def test_prefixed_units_resolve_lazily(db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, pq, factor=1.0)
+    registry = UnitRegistryCache().get(db)
+    assert len(registry.prefixed) == 0
+
+    kilometre = registry.resolve(f"k{metre.value}")
+    assert kilometre is not None
+    assert kilometre.factorToBase == 1000.0
+    assert kilometre.quantity_ids == (pq.id,)
+    assert registry.resolve(f"kilo{metre.name}") == kilometre
+    assert registry.resolve(f"k{metre.value}") is kilometre
+    assert registry.resolve(f"u{metre.value}") == registry.resolve(f"µ{metre.value}")
+    assert registry.resolve(f"da{metre.value}").factorToBase == 10.0  # type: ignore[union-attr]
+    # Nothing is added to the catalog itself
+    assert metre.id in registry.units_by_id and len(registry.units_by_id) == len(
+        registry.units
+    )
+
+
+def test_prefixed_units_convert(db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, pq, factor=1.0)
+    registry = UnitRegistryCache().get(db)
+    result = convert(
+        registry, np.array([1.5, 2.0]), f"k{metre.value}", f"m{metre.value}"
+    )
+    assert result.tolist() == pytest.approx([1.5e6, 2e6])
+
+
+def test_offset_units_are_not_prefixed(db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    celsius = create_random_functional_unit(
+        db, pq, to_base="x + 273.15", from_base="x - 273.15"
+    )
+    registry = UnitRegistryCache().get(db)
+    assert registry.resolve(f"k{celsius.value}") is None
+
+
+def test_prefixes_do_not_stack(db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, pq, factor=1.0)
+    kilometre = LinearUnit(
+        name=f"kilo{metre.name}",
+        value=f"k{metre.value}",
+        base=metre.base,
+        factorToBase=1000.0,
+    )
+    pq.linear_units.append(kilometre)
+    db.add(pq)
+    bump_catalog_version(db)
+    db.commit()
+    registry = UnitRegistryCache().get(db)
+    assert registry.resolve(f"k{metre.value}") is not None
+    assert registry.resolve(f"kk{metre.value}") is None
+    assert registry.resolve(f"kilokilo{metre.name}") is None
+    assert registry.resolve(f"M{metre.value}") is not None
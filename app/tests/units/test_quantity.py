@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from sqlmodel import Session
+
+from app.tests.utils.unitsystem import (
+    create_random_functional_unit,
+    create_random_linear_unit,
+    create_random_physical_quantity,
+)
+from app.units.conversion import ConversionError, UnitNotFoundError
+from app.units.quantity import Quantity, QuantityArray
+from app.units.registry import UnitRegistryCache
+
+
+def test_quantity_conversion_and_arithmetic(db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, pq, factor=1.0)
+    foot = create_random_linear_unit(db, pq, factor=0.3048)
+    registry = UnitRegistryCache().get(db)
+
+    length = Quantity(10, foot.value, registry)
+    assert length.to(metre.value).magnitude == pytest.approx(3.048)
+    assert length.to(f"k{metre.value}").unit.factorToBase == 1000.0
+    total = Quantity(1, metre.value, registry) + length
+    assert total.unit.id == metre.id and total.magnitude == pytest.approx(4.048)
+    assert (2 * length).magnitude == 20 and (length / 4).magnitude == 2.5
+    assert Quantity(1, metre.value, registry) > Quantity(3, foot.value, registry)
+    assert Quantity(0.3048, metre.value, registry) == Quantity(1, foot.value, registry)
+    with pytest.raises(TypeError):
+        length * length
+    with pytest.raises(UnitNotFoundError):
+        Quantity(1, "not-a-unit", registry)
+    with pytest.raises(AttributeError):
+        length.extra = 1  # type: ignore[attr-defined]
+
+
+def test_quantity_array_is_vectorized(db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, pq, factor=1.0)
+    foot = create_random_linear_unit(db, pq, factor=0.3048)
+    registry = UnitRegistryCache().get(db)
+
+    feet = QuantityArray([1.0, 10.0, 100.0], foot.value, registry)
+    metres = feet.to(metre.value)
+    assert isinstance(metres, QuantityArray)
+    assert metres.magnitude.tolist() == pytest.approx([0.3048, 3.048, 30.48])
+    assert (feet > Quantity(1, metre.value, registry)).tolist() == [False, True, True]
+    assert (metres == feet).all()
+    assert (np.array([1.0, 2.0, 3.0]) * feet).magnitude.tolist() == [1.0, 20.0, 300.0]
+    assert (metres + feet).magnitude.tolist() == pytest.approx([0.6096, 6.096, 60.96])
+    assert feet[1] == Quantity(10, foot.value, registry)
+    assert len(feet[feet.magnitude > 5]) == 2  # type: ignore[arg-type]
+    assert feet.sum().to(metre.value).magnitude == pytest.approx(33.8328)
+
+
+def test_offset_units_are_not_added_across_units(db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    kelvin = create_random_linear_unit(db, pq, factor=1.0)
+    celsius = create_random_functional_unit(
+        db, pq, to_base="x + 273.15", from_base="x - 273.15"
+    )
+    registry = UnitRegistryCache().get(db)
+
+    readings = QuantityArray([20.0, 25.0], celsius.value, registry)
+    assert (readings + Quantity(5, celsius.value, registry)).magnitude.tolist() == [
+        25.0,
+        30.0,
+    ]
+    assert readings.to(kelvin.value).magnitude.tolist() == pytest.approx(
+        [293.15, 298.15]
+    )
+    assert (readings < Quantity(295, kelvin.value, registry)).tolist() == [True, False]
+    with pytest.raises(ConversionError):
+        readings + Quantity(5, kelvin.value, registry)
+    # Summing follows the same rule as adding
+    assert readings.sum() == readings[0] + readings[1]
+    assert readings.sum().magnitude == 45.0
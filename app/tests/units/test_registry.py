@@ -0,0 +1,179 @@
+import os
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine
+from app.tests.utils.unitsystem import (
+    create_random_functional_unit,
+    create_random_linear_unit,
+    create_random_physical_quantity,
+)
+from app.units.registry import (
+    UnitRegistryCache,
+    build_registry,
+    bump_catalog_version,
+    get_catalog_version,
+    unit_registry,
+)
+
+
+@contextmanager
+def count_queries() -> Generator[list[str], None, None]:
+    statements: list[str] = []
+
+    def before_cursor_execute(*args: object) -> None:
+        statements.append(str(args[2]))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def memmap_of(array: np.ndarray | None) -> np.memmap:
+    while not isinstance(array, np.memmap):
+        assert array is not None
+        array = array.base
+    return array
+
+
+def test_registry_indexes_units(db: Session) -> None:
+    pq = create_random_physical_quantity(db)
+    metre = create_random_linear_unit(db, pq, factor=1.0)
+    celsius = create_random_functional_unit(
+        db, pq, to_base="x + 273.15", from_base="x - 273.15"
+    )
+
+    registry = UnitRegistryCache().get(db)
+
+    unit = registry.resolve(str(metre.id))
+    assert unit is not None
+    assert registry.resolve(metre.value) is unit
+    assert registry.resolve(metre.name) is unit
+    assert unit.quantity_ids == (pq.id,)
+    assert registry.factors[unit.index] == 1.0
+
+    functional = registry.resolve(celsius.value)
+    assert functional is not None and not functional.is_linear
+    assert functional.compiled is not None
+    assert functional.compiled.to_base(0) == pytest.approx(273.15)
+
+    quantity = registry.quantities_by_id[pq.id]
+    assert set(quantity.unit_ids) == {metre.id, celsius.id}
+    with pytest.raises(TypeError):
+        registry.units_by_value["new"] = unit  # type: ignore[index]
+
+
+def test_registry_is_swapped_when_version_changes(db: Session) -> None:
+    cache = UnitRegistryCache()
+    registry = cache.get(db)
+    assert cache.get(db) is registry
+
+    pq = create_random_physical_quantity(db)
+    unit = create_random_linear_unit(db, pq, factor=2.0)
+    cache.invalidate()
+
+    swapped = cache.get(db)
+    assert swapped is not registry
+    assert swapped.version > registry.version
+    assert swapped.resolve(unit.value) is not None
+
+
+def test_bump_catalog_version_is_monotonic(db: Session) -> None:
+    first = bump_catalog_version(db)
+    second = bump_catalog_version(db)
+    db.commit()
+    assert second == first + 1
+
+
+def test_physical_quantities_read_without_queries(
+    client: TestClient, db: Session
+) -> None:
+    pq = create_random_physical_quantity(db)
+    create_random_linear_unit(db, pq, factor=1.0)
+    url = f"{settings.API_V1_STR}/unitsystems/physicalquantities"
+    r = client.get(url)
+    assert r.status_code == 200
+    assert str(pq.id) in {q["id"] for q in r.json()}
+
+    with count_queries() as statements:
+        r = client.get(url)
+    assert r.status_code == 200
+    assert statements == []
+
+
+def grow_catalog(db: Session, quantities: int) -> None:
+    for _ in range(quantities):
+        pq = create_random_physical_quantity(db)
+        create_random_linear_unit(db, pq, factor=1.0)
+        create_random_functional_unit(db, pq, to_base="x + 1", from_base="x - 1")
+
+
+def test_registry_build_query_count_is_constant(db: Session) -> None:
+    grow_catalog(db, 2)
+    db.expire_all()
+    with count_queries() as small:
+        build_registry(db, get_catalog_version(db))
+
+    grow_catalog(db, 10)
+    db.expire_all()
+    with count_queries() as large:
+        build_registry(db, get_catalog_version(db))
+    assert len(large) == len(small)
+
+
+def test_unit_system_reads_have_a_fixed_query_budget(
+    client: TestClient, db: Session
+) -> None:
+    r = client.post(f"{settings.API_V1_STR}/unitsystems/", json={"name": "SI"})
+    assert r.status_code == 200
+    unitsystem_id = r.json()["id"]
+    urls = [
+        f"{settings.API_V1_STR}/unitsystems/{unitsystem_id}",
+        f"{settings.API_V1_STR}/unitsystems/physicalquantities",
+    ]
+
+    def queries_per_url() -> list[int]:
+        counts = []
+        for url in urls:
+            # Force a registry rebuild so the catalog is read from the database
+            unit_registry.invalidate()
+            bump_catalog_version(db)
+            db.commit()
+            with count_queries() as statements:
+                assert client.get(url).status_code == 200
+            counts.append(len(statements))
+        return counts
+
+    before = queries_per_url()
+    grow_catalog(db, 10)
+    assert queries_per_url() == before
+
+
+def test_workers_share_mapped_tables(
+    db: Session, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "UNIT_SNAPSHOT_DIR", str(tmp_path))
+    pq = create_random_physical_quantity(db)
+    create_random_linear_unit(db, pq, factor=1.0)
+    create_random_linear_unit(db, pq, factor=1000.0)
+
+    first = UnitRegistryCache().get(db)
+    generations = list(tmp_path.glob("*.npy"))
+    assert len(generations) == 1
+    second = UnitRegistryCache().get(db)
+    # The second worker maps the published generation instead of writing its own
+    assert list(tmp_path.glob("*.npy")) == generations
+    for registry in (first, second):
+        table = registry.tables[pq.id]
+        assert table.pairs is None
+        assert os.path.samefile(str(memmap_of(table.scale).filename), generations[0])
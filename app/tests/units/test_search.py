@@ -0,0 +1,60 @@
+import uuid
+
+from app.units.registry import RegisteredUnit
+from app.units.search import UnitSearchIndex
+
+
+def make_unit(name: str, value: str, aliases: tuple[str, ...] = ()) -> RegisteredUnit:
+    return RegisteredUnit(
+        id=uuid.uuid4(),
+        name=name,
+        value=value,
+        base="m",
+        index=0,
+        quantity_ids=(),
+        aliases=aliases,
+        factorToBase=1.0,
+    )
+
+
+UNITS = [
+    make_unit("metre", "m", ("meter",)),
+    make_unit("millimetre", "mm", ("millimeter",)),
+    make_unit("megametre", "Mm"),
+    make_unit("mile", "mi"),
+    make_unit("kilogram", "kg"),
+]
+
+
+def search(query: str, limit: int = 10) -> list[str]:
+    return [
+        match.entry.unit.name
+        for match in UnitSearchIndex(UNITS, keep=50).search(query, limit)
+    ]
+
+
+def test_search_prefix_ranks_short_terms_first() -> None:
+    results = search("m")
+    assert results[0] == "metre"
+    assert set(results) == {"metre", "millimetre", "megametre", "mile"}
+
+
+def test_search_exact_case_wins() -> None:
+    assert search("Mm")[0] == "megametre"
+    assert search("mm")[0] == "millimetre"
+
+
+def test_search_aliases_and_limit() -> None:
+    assert search("meter") == ["metre"]
+    assert search("mil", limit=1) == ["mile"]
+
+
+def test_search_fuzzy() -> None:
+    assert search("kilogam") == ["kilogram"]
+    assert search("metr")[0] == "metre"
+    assert search("xyz") == []
+
+
+def test_search_one_result_per_unit() -> None:
+    results = search("millim")
+    assert results == ["millimetre"]
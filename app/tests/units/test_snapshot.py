@@ -0,0 +1,62 @@
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.tests.units.test_tables import make_unit
+from app.units.snapshot import CURRENT, KEEP_GENERATIONS, load_tables, publish_tables
+from app.units.tables import build_tables
+
+
+def test_publish_and_map_tables(tmp_path: Path) -> None:
+    assert load_tables(tmp_path) is None
+    length, mass = uuid.uuid4(), uuid.uuid4()
+    units = {
+        length: [make_unit(length, f) for f in (1.0, 1000.0, 0.001)],
+        mass: [make_unit(mass, f) for f in (1.0, 0.001)],
+    }
+    tables = build_tables(units)
+    generation = publish_tables(tmp_path, 7, tables)
+    assert (tmp_path / CURRENT).read_text() == generation
+
+    shared = load_tables(tmp_path)
+    assert shared is not None and shared.keys() == tables.keys()
+    table = shared[length]
+    assert isinstance(table.scale, np.memmap) or isinstance(table.scale.base, np.memmap)
+    assert not table.scale.flags.writeable
+    np.testing.assert_array_equal(table.scale, tables[length].scale)
+    np.testing.assert_array_equal(shared[mass].offset, tables[mass].offset)
+    kilometre, millimetre = units[length][1], units[length][2]
+    assert table.lookup(kilometre.id, millimetre.id) == pytest.approx((1e6, 0.0))
+
+    # Unchanged quantities are reused from the mapping
+    assert build_tables(units, shared)[length] is table
+
+
+def test_old_generations_are_removed(tmp_path: Path) -> None:
+    quantity = uuid.uuid4()
+    tables = build_tables(
+        {quantity: [make_unit(quantity, 1.0), make_unit(quantity, 2.0)]}
+    )
+    for version in range(5):
+        current = publish_tables(tmp_path, version, tables)
+    manifests = sorted(p.stem for p in tmp_path.glob("*.json"))
+    assert len(manifests) == KEEP_GENERATIONS + 1
+    assert manifests[-1] == current
+    assert load_tables(tmp_path) is not None
+
+
+def test_untrusted_directory_is_not_used(tmp_path: Path) -> None:
+    quantity = uuid.uuid4()
+    tables = build_tables(
+        {quantity: [make_unit(quantity, 1.0), make_unit(quantity, 2.0)]}
+    )
+    directory = tmp_path / "snapshots"
+    publish_tables(directory, 1, tables)
+    assert directory.stat().st_mode & 0o777 == 0o700
+
+    directory.chmod(0o777)
+    assert load_tables(directory) is None
+    with pytest.raises(PermissionError):
+        publish_tables(directory, 2, tables)
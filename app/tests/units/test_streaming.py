@@ -0,0 +1,93 @@
+import asyncio
+from collections.abc import AsyncIterator, Callable
+
+import numpy as np
+import pytest
+
+from app.units.streaming import (
+    StreamFormatError,
+    convert_csv,
+    convert_ndjson,
+    iter_line_batches,
+)
+
+
+async def chunks_of(data: bytes, size: int) -> AsyncIterator[bytes]:
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def run(
+    converter: Callable[..., AsyncIterator[bytes]],
+    data: bytes,
+    column: str,
+    rows: int = 2,
+) -> bytes:
+    async def collect() -> bytes:
+        batches = iter_line_batches(chunks_of(data, 5), rows, 100)
+        return b"".join(
+            [c async for c in converter(batches, column, lambda v: v * 1000)]
+        )
+
+    return asyncio.run(collect())
+
+
+def test_iter_line_batches() -> None:
+    async def collect() -> list[list[bytes]]:
+        return [
+            b async for b in iter_line_batches(chunks_of(b"a\nbb\nccc\nd", 3), 2, 3)
+        ]
+
+    assert asyncio.run(collect()) == [[b"a", b"bb"], [b"ccc", b"d"]]
+
+
+def test_iter_line_batches_limits_line_length() -> None:
+    async def collect(data: bytes) -> list[list[bytes]]:
+        return [b async for b in iter_line_batches(chunks_of(data, 3), 2, 4)]
+
+    with pytest.raises(StreamFormatError):
+        asyncio.run(collect(b"a\nbbbbb\n"))
+    # A line without a line break is caught before it is complete
+    with pytest.raises(StreamFormatError):
+        asyncio.run(collect(b"a" * 100))
+
+
+def test_convert_csv() -> None:
+    data = b'id,length,note\r\n1,1.5,a\n2,,b\n3,2,"x, y"\n4,nan,c\n'
+    assert run(convert_csv, data, "length") == (
+        b'id,length,note\n1,1500.0,a\n2,,b\n3,2000.0,"x, y"\n4,nan,c\n'
+    )
+
+
+def test_convert_csv_errors() -> None:
+    with pytest.raises(StreamFormatError):
+        run(convert_csv, b"id,width\n1,2\n", "length")
+    with pytest.raises(StreamFormatError):
+        run(convert_csv, b"length\n1\nabc\n", "length")
+
+
+def test_convert_ndjson() -> None:
+    data = b'{"t": 1, "length": 2}\n\n{"t": 2, "length": null}\n{"t": 3}\n'
+    assert run(convert_ndjson, data, "length") == (
+        b'{"t":1,"length":2000.0}\n{"t":2,"length":null}\n{"t":3}\n'
+    )
+    with pytest.raises(StreamFormatError):
+        run(convert_ndjson, b"[1, 2]\n", "length")
+
+
+def test_batches_hold_at_most_the_chunk_size() -> None:
+    seen: list[int] = []
+
+    def convert(values: np.ndarray) -> np.ndarray:
+        seen.append(len(values))
+        return values
+
+    async def collect() -> None:
+        data = b"v\n" + b"1\n" * 10
+        async for _ in convert_csv(
+            iter_line_batches(chunks_of(data, 4), 4, 10), "v", convert
+        ):
+            pass
+
+    asyncio.run(collect())
+    assert max(seen) <= 4 and sum(seen) == 10
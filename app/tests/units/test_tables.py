@@ -0,0 +1,59 @@
+import uuid
+
+import pytest
+
+from app.units.registry import RegisteredUnit
+from app.units.tables import build_table, build_tables, table_signature
+
+
+def make_unit(quantity_id: uuid.UUID, factor: float) -> RegisteredUnit:
+    return RegisteredUnit(
+        id=uuid.uuid4(),
+        name=f"unit{factor}",
+        value=f"u{factor}",
+        base="u1",
+        index=0,
+        quantity_ids=(quantity_id,),
+        factorToBase=factor,
+    )
+
+
+def test_build_table_all_pairs() -> None:
+    quantity_id = uuid.uuid4()
+    metre, kilometre, millimetre = (
+        make_unit(quantity_id, f) for f in (1.0, 1000.0, 0.001)
+    )
+    table = build_table(quantity_id, table_signature([metre, kilometre, millimetre]))
+
+    assert len(table) == 3
+    assert table.lookup(kilometre.id, millimetre.id) == pytest.approx((1e6, 0.0))
+    assert table.lookup(millimetre.id, metre.id) == pytest.approx((0.001, 0.0))
+    assert table.lookup(metre.id, metre.id) == (1.0, 0.0)
+    assert table.lookup(metre.id, uuid.uuid4()) is None
+    assert table.scale[1, 2] == pytest.approx(1e6)
+
+
+def test_build_tables_only_rebuilds_changed_quantities() -> None:
+    length, mass = uuid.uuid4(), uuid.uuid4()
+    length_units = [make_unit(length, 1.0), make_unit(length, 1000.0)]
+    mass_units = [make_unit(mass, 1.0), make_unit(mass, 0.001)]
+    tables = build_tables({length: length_units, mass: mass_units})
+
+    length_units.append(make_unit(length, 0.01))
+    rebuilt = build_tables({length: length_units, mass: mass_units}, tables)
+
+    assert rebuilt[mass] is tables[mass]
+    assert rebuilt[length] is not tables[length]
+    assert len(rebuilt[length]) == 3
+
+
+def test_build_tables_skips_large_quantities() -> None:
+    small, large = uuid.uuid4(), uuid.uuid4()
+    tables = build_tables(
+        {
+            small: [make_unit(small, f) for f in (1.0, 2.0, 3.0)],
+            large: [make_unit(large, f) for f in (1.0, 2.0, 3.0, 4.0, 5.0)],
+        },
+        max_units=4,
+    )
+    assert list(tables) == [small]
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from app.units.tabulated import TableError, TabulatedCurve, validate_table
+
+# Type K thermocouple, mV -> °C (coarse)
+MILLIVOLTS = [0.0, 4.096, 8.138, 12.209, 16.397]
+CELSIUS = [0.0, 100.0, 200.0, 300.0, 400.0]
+
+
+def test_interpolates_both_ways() -> None:
+    curve = TabulatedCurve.from_points(MILLIVOLTS, CELSIUS)
+    assert curve.to_base(np.array([0.0, 2.048, 16.397])).tolist() == pytest.approx(
+        [0, 50, 400]
+    )
+    assert curve.from_base(np.array([50.0, 300.0])).tolist() == pytest.approx(
+        [2.048, 12.209]
+    )
+
+
+def test_decreasing_base_points() -> None:
+    curve = TabulatedCurve.from_points([0.0, 1.0, 2.0], [10.0, 5.0, 0.0])
+    assert curve.to_base(np.array([0.5])).tolist() == [7.5]
+    assert curve.from_base(np.array([7.5, 0.0])).tolist() == [0.5, 2.0]
+
+
+def test_out_of_range_values_are_rejected() -> None:
+    curve = TabulatedCurve.from_points(MILLIVOLTS, CELSIUS)
+    with pytest.raises(TableError):
+        curve.to_base(np.array([1.0, 20.0]))
+
+
+@pytest.mark.parametrize(
+    "unit_points, base_points",
+    [
+        ([0.0], [1.0]),
+        ([0.0, 1.0], [1.0]),
+        ([1.0, 0.0], [0.0, 1.0]),
+        ([0.0, 1.0, 2.0], [0.0, 1.0, 0.5]),
+        ([0.0, float("nan")], [0.0, 1.0]),
+    ],
+)
+def test_validate_table(unit_points: list[float], base_points: list[float]) -> None:
+    with pytest.raises(TableError):
+        validate_table(unit_points, base_points)
@@ -0,0 +1,86 @@
+from sqlmodel import Session
+
+from app.models import FunctionalUnit, LinearUnit, PhysicalQuantity, TabulatedUnit
+from app.tests.utils.utils import random_lower_string
+from app.units.registry import bump_catalog_version
+
+
+def create_random_physical_quantity(db: Session) -> PhysicalQuantity:
+    pq = PhysicalQuantity(quantity=random_lower_string())
+    db.add(pq)
+    bump_catalog_version(db)
+    db.commit()
+    db.refresh(pq)
+    return pq
+
+
+def create_random_linear_unit(
+    db: Session,
+    pq: PhysicalQuantity,
+    *,
+    factor: float,
+    base: str = "base",
+    aliases: list[str] | None = None,
+) -> LinearUnit:
+    unit = LinearUnit(
+        name=random_lower_string(),
+        value=random_lower_string(),
+        base=base,
+        factorToBase=factor,
+        aliases=aliases or [],
+    )
+    db.add(unit)
+    pq.linear_units.append(unit)
+    db.add(pq)
+    bump_catalog_version(db)
+    db.commit()
+    db.refresh(unit)
+    return unit
+
+
+def create_random_functional_unit(
+    db: Session,
+    pq: PhysicalQuantity,
+    *,
+    to_base: str,
+    from_base: str,
+    base: str = "base",
+) -> FunctionalUnit:
+    unit = FunctionalUnit(
+        name=random_lower_string(),
+        value=random_lower_string(),
+        base=base,
+        toBase=to_base,
+        fromBase=from_base,
+    )
+    db.add(unit)
+    pq.functional_units.append(unit)
+    db.add(pq)
+    bump_catalog_version(db)
+    db.commit()
+    db.refresh(unit)
+    return unit
+
+
+def create_random_tabulated_unit(
+    db: Session,
+    pq: PhysicalQuantity,
+    *,
+    unit_points: list[float],
+    base_points: list[float],
+    base: str = "base",
+) -> TabulatedUnit:
+    unit = TabulatedUnit(
+        name=random_lower_string(),
+        value=random_lower_string(),
+        base=base,
+        unitPoints=unit_points,
+        basePoints=base_points,
+    )
+    db.add(unit)
+    pq.tabulated_units.append(unit)
+    db.add(pq)
+    bump_catalog_version(db)
+    db.commit()
+    db.refresh(unit)
+    return unit
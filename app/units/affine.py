@@ -0,0 +1,168 @@
+"""
+Affine folding of unit formulas.
+
+Most functional units (Celsius, Fahrenheit, gauge pressure, ...) are really
+`scale * x + offset`. Detecting that once per formula, from its AST, lets
+those units join the linear ones on the multiply-add fast path, and lets a
+chain of conversions collapse into a single map.
+"""
+
+import ast
+import math
+from fractions import Fraction
+from functools import lru_cache
+from typing import NamedTuple
+
+from app.units.formulas import FORMULA_VARIABLE, MATH_FUNCTIONS, parse_formula
+
+# Relative tolerance when checking that fromBase undoes toBase
+INVERSE_TOLERANCE = 1e-9
+
+
+class Affine(NamedTuple):
+    """The map `x -> scale * x + offset`, with float or (exact) Fraction coefficients."""
+
+    scale: float | Fraction
+    offset: float | Fraction
+
+    def __call__(self, x: float) -> float | Fraction:
+        return self.scale * x + self.offset
+
+    def then(self, other: "Affine") -> "Affine":
+        """The map applying `self` first, then `other`."""
+        return Affine(
+            other.scale * self.scale, other.scale * self.offset + other.offset
+        )
+
+    def inverse(self) -> "Affine":
+        return Affine(1 / self.scale, -self.offset / self.scale)
+
+    def is_close(self, other: "Affine") -> bool:
+        return math.isclose(
+            self.scale, other.scale, rel_tol=INVERSE_TOLERANCE
+        ) and math.isclose(
+            self.offset,
+            other.offset,
+            rel_tol=INVERSE_TOLERANCE,
+            abs_tol=INVERSE_TOLERANCE,
+        )
+
+
+IDENTITY = Affine(1.0, 0.0)
+
+
+def compose(*maps: Affine) -> Affine:
+    """Fold a chain of affine maps, applied left to right, into one."""
+    result = IDENTITY
+    for step in maps:
+        result = result.then(step)
+    return result
+
+
+class _NotAffine(Exception):
+    pass
+
+
+def _number(value: float, exact: bool) -> float | Fraction:
+    if not exact:
+        return float(value)
+    # pi and e were substituted as floats by the validator and have no exact value
+    if value in (math.pi, math.e):
+        raise _NotAffine
+    # The decimal the constant was written as, not its nearest binary double
+    return Fraction(repr(value))
+
+
+def _fold(node: ast.AST, exact: bool = False) -> Affine:
+    """
+    Reduce a validated formula node to `scale * x + offset`, where scale may be 0.
+    With `exact`, coefficients are Fractions and anything inexact is rejected.
+    """
+    zero, one = _number(0, exact), _number(1, exact)
+    if isinstance(node, ast.Constant) and isinstance(node.value, int | float):
+        return Affine(zero, _number(node.value, exact))
+    if isinstance(node, ast.Name) and node.id == FORMULA_VARIABLE:
+        return Affine(one, zero)
+    if isinstance(node, ast.UnaryOp):
+        operand = _fold(node.operand, exact)
+        return (
+            Affine(-operand.scale, -operand.offset)
+            if isinstance(node.op, ast.USub)
+            else operand
+        )
+    if isinstance(node, ast.Call):
+        argument = _fold(node.args[0], exact)
+        if argument.scale != 0 or exact:
+            raise _NotAffine
+        return Affine(0.0, float(MATH_FUNCTIONS[node.func.id](argument.offset)))  # type: ignore[attr-defined]
+    if not isinstance(node, ast.BinOp):
+        raise _NotAffine
+
+    left, right = _fold(node.left, exact), _fold(node.right, exact)
+    if isinstance(node.op, ast.Add):
+        return Affine(left.scale + right.scale, left.offset + right.offset)
+    if isinstance(node.op, ast.Sub):
+        return Affine(left.scale - right.scale, left.offset - right.offset)
+    if isinstance(node.op, ast.Mult):
+        if left.scale == 0:
+            return Affine(left.offset * right.scale, left.offset * right.offset)
+        if right.scale == 0:
+            return Affine(right.offset * left.scale, right.offset * left.offset)
+        raise _NotAffine
+    if isinstance(node.op, ast.Div):
+        if right.scale != 0 or right.offset == 0:
+            raise _NotAffine
+        return Affine(left.scale / right.offset, left.offset / right.offset)
+    if isinstance(node.op, ast.Pow) and right.scale == 0:
+        if left.scale == 0:
+            power = left.offset**right.offset
+            # Fractional powers of Fractions come back as floats (or complex)
+            if isinstance(power, complex) or (
+                exact and not isinstance(power, Fraction)
+            ):
+                raise _NotAffine
+            return Affine(zero, power)
+        if right.offset == 1:
+            return left
+        if right.offset == 0:
+            return Affine(zero, one)
+    if isinstance(node.op, ast.Mod) and left.scale == 0 and right.scale == 0:
+        return Affine(zero, left.offset % right.offset)
+    raise _NotAffine
+
+
+def detect_affine(source: str) -> Affine | None:
+    """
+    Return the affine map a formula computes, or None if it is not affine in `x`
+    (including constant formulas, which cannot be inverted).
+    """
+    try:
+        affine = _fold(parse_formula(source).body)
+    except (_NotAffine, ArithmeticError, ValueError):
+        return None
+    if affine.scale == 0 or not all(map(math.isfinite, affine)):
+        return None
+    return affine
+
+
+@lru_cache(maxsize=4096)
+def detect_unit_affine(to_base: str, from_base: str) -> Affine | None:
+    """
+    The to-base map of a functional unit, if both its formulas are affine and
+    `fromBase` undoes `toBase`; otherwise the unit has to use its formulas.
+    """
+    forward = detect_affine(to_base)
+    backward = detect_affine(from_base)
+    if forward is None or backward is None or not forward.inverse().is_close(backward):
+        return None
+    return forward
+
+
+@lru_cache(maxsize=4096)
+def detect_exact_affine(source: str) -> Affine | None:
+    """Like `detect_affine`, with Fraction coefficients, for formulas that are exact."""
+    try:
+        affine = _fold(parse_formula(source).body, exact=True)
+    except (_NotAffine, ArithmeticError, ValueError):
+        return None
+    return affine if affine.scale != 0 else None
@@ -0,0 +1,101 @@
+"""
+Compact export of a unit system for client-side conversion.
+
+A bundle holds everything a client needs to convert between the units of a
+unit system's physical quantities without calling the API: units are
+positional rows `[id, value, name, base, kind, a, b]` where `kind` is
+
+- `"affine"`: `base = a * x + b` (linear units, and functional units whose
+  formulas fold to a multiply-add),
+- `"formula"`: `a` and `b` are the toBase and fromBase formulas, arithmetic on
+  `x` using only the listed `functions` and `constants`,
+- `"table"`: `a` and `b` are the unitPoints and basePoints breakpoints,
+  interpolated linearly and not extrapolated,
+
+and quantities are rows `[id, name, preferred unit index or null, [unit
+indexes]]`. The body is minified JSON and depends only on the bundled units
+and the unit system's members, so its hash is a strong ETag that catalog
+changes elsewhere leave alone. It carries no catalog version for that reason.
+"""
+
+import hashlib
+from collections.abc import Mapping
+from typing import Any
+from uuid import UUID
+
+from pydantic_core import to_json
+
+from app.models import UnitSystem
+from app.units.formulas import CONSTANTS, FORMULA_VARIABLE, MATH_FUNCTIONS
+from app.units.registry import RegisteredUnit, UnitRegistry
+
+# Bumped whenever the layout above changes (2: no catalogVersion)
+BUNDLE_FORMAT = 2
+
+
+def _unit_row(unit: RegisteredUnit) -> list[Any]:
+    row: list[Any] = [str(unit.id), unit.value, unit.name, unit.base]
+    affine = unit.affine
+    if affine is not None:
+        return [*row, "affine", affine.scale, affine.offset]
+    if unit.tabulated is not None:
+        return [
+            *row,
+            "table",
+            unit.tabulated.unit_points.tolist(),
+            unit.tabulated.base_points.tolist(),
+        ]
+    return [*row, "formula", unit.toBase, unit.fromBase]
+
+
+def build_bundle(
+    registry: UnitRegistry, unit_system: UnitSystem, members: Mapping[UUID, UUID | None]
+) -> dict[str, Any]:
+    quantities = sorted(
+        (
+            registry.quantities_by_id[q]
+            for q in members
+            if q in registry.quantities_by_id
+        ),
+        key=lambda q: (q.quantity, str(q.id)),
+    )
+    unit_ids = {u for q in quantities for u in q.unit_ids}
+    # Registry order keeps the unit list stable between requests
+    units = [u for u in registry.units if u.id in unit_ids]
+    positions = {u.id: i for i, u in enumerate(units)}
+
+    quantity_rows = []
+    for quantity in quantities:
+        preferred = members[quantity.id]
+        quantity_rows.append(
+            [
+                str(quantity.id),
+                quantity.quantity,
+                positions.get(preferred) if preferred is not None else None,
+                [positions[u] for u in quantity.unit_ids if u in positions],
+            ]
+        )
+    return {
+        "format": BUNDLE_FORMAT,
+        "id": str(unit_system.id),
+        "name": unit_system.name,
+        "variable": FORMULA_VARIABLE,
+        "functions": sorted(MATH_FUNCTIONS),
+        "constants": CONSTANTS,
+        "quantities": quantity_rows,
+        "units": [_unit_row(u) for u in units],
+    }
+
+
+def encode_bundle(bundle: Mapping[str, Any]) -> tuple[bytes, str]:
+    """The minified body and its strong ETag."""
+    body = to_json(bundle)
+    return body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
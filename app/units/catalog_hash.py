@@ -0,0 +1,158 @@
+"""
+Content hashes of the unit catalog, for comparing catalogs across environments.
+
+The hashes form a three-level tree, like a Merkle tree:
+
+- each unit hashes its canonical content (kind, symbol, name, base, aliases
+  and conversion), never its id, so equal units hash equally everywhere;
+- each physical quantity hashes the sorted (key, hash) pairs of its units,
+  where a unit's key is `kind:value`, the same identity the catalog import
+  matches units on;
+- the root hashes the sorted (name, hash) pairs of the quantities.
+
+Two sides with equal roots hold the same catalog. Otherwise comparing the
+quantity hashes finds the quantities that differ, and only for those do the
+unit hashes, and then the changed units themselves, need to be exchanged.
+"""
+
+import hashlib
+import json
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from sqlmodel import SQLModel
+
+from app.models import (
+    FunctionalUnit,
+    LinearUnit,
+    PhysicalQuantity,
+    TabulatedUnit,
+    UnitCatalog,
+    UnitCatalogDiff,
+    UnitCatalogHashes,
+    UnitCatalogQuantity,
+)
+
+if TYPE_CHECKING:
+    from app.units.registry import UnitRegistry
+
+# Unit kind -> (attribute of PhysicalQuantity.Read, spec model, attribute of UnitCatalogQuantity)
+_KINDS: dict[str, tuple[str, type[SQLModel], str]] = {
+    "linear": ("linear_units", LinearUnit.Create, "linearUnits"),
+    "functional": ("functional_units", FunctionalUnit.Create, "functionalUnits"),
+    "tabulated": ("tabulated_units", TabulatedUnit.Create, "tabulatedUnits"),
+}
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:32]
+
+
+def _tree_hash(children: Mapping[str, str]) -> str:
+    return _digest(json.dumps(sorted(children.items()), separators=(",", ":")))
+
+
+def unit_hash(kind: str, spec: SQLModel) -> str:
+    content: dict[str, Any] = {"kind": kind, **spec.model_dump()}
+    content["aliases"] = sorted(content.get("aliases") or [])
+    # Floats serialize through repr, so equal values always give equal text
+    return _digest(json.dumps(content, sort_keys=True, separators=(",", ":")))
+
+
+@dataclass(frozen=True)
+class QuantityHashes:
+    hash: str
+    units: Mapping[str, str]
+    specs: Mapping[str, tuple[str, SQLModel]]
+
+
+@dataclass(frozen=True)
+class CatalogHashes:
+    root: str
+    quantities: Mapping[str, QuantityHashes]
+
+    def export(self, quantity: str, keys: Iterable[str]) -> UnitCatalogQuantity:
+        """The catalog entry of `quantity`, limited to the units with these keys."""
+        entry = UnitCatalogQuantity(name=quantity)
+        specs = self.quantities[quantity].specs
+        for key in sorted(keys):
+            kind, spec = specs[key]
+            getattr(entry, _KINDS[kind][2]).append(spec)
+        return entry
+
+
+def _quantity_hashes(read: PhysicalQuantity.Read) -> QuantityHashes:
+    units: dict[str, str] = {}
+    specs: dict[str, tuple[str, SQLModel]] = {}
+    for kind, (attribute, model, _) in _KINDS.items():
+        for unit in getattr(read, attribute) or []:
+            spec = model.model_validate(unit.model_dump())
+            key = f"{kind}:{unit.value}"
+            units[key] = unit_hash(kind, spec)
+            specs[key] = (kind, spec)
+    return QuantityHashes(_tree_hash(units), units, specs)
+
+
+def build_catalog_hashes(registry: "UnitRegistry") -> CatalogHashes:
+    quantities: dict[str, QuantityHashes] = {}
+    for quantity in registry.quantities:
+        # Quantities are matched by name, as in the catalog import; the first one wins
+        if quantity.quantity not in quantities:
+            quantities[quantity.quantity] = _quantity_hashes(quantity.read)
+    return CatalogHashes(
+        root=_tree_hash({name: q.hash for name, q in quantities.items()}),
+        quantities=quantities,
+    )
+
+
+def catalog_hashes_read(
+    hashes: CatalogHashes, unit_quantities: Iterable[str] = ()
+) -> UnitCatalogHashes:
+    """Root and quantity hashes, plus the unit hashes of `unit_quantities`."""
+    return UnitCatalogHashes(
+        root=hashes.root,
+        quantities={name: q.hash for name, q in hashes.quantities.items()},
+        units={
+            name: dict(hashes.quantities[name].units)
+            for name in unit_quantities
+            if name in hashes.quantities
+        },
+    )
+
+
+def diff_catalog(local: CatalogHashes, remote: UnitCatalogHashes) -> UnitCatalogDiff:
+    """
+    Compare this catalog with the hashes of another one, and export what the
+    other side lacks or holds differently: added quantities in full, and the
+    changed units of changed quantities whose unit hashes were sent. Changed
+    quantities sent without unit hashes are listed as pending, to be asked
+    about again with them.
+    """
+    diff = UnitCatalogDiff(root=local.root, identical=local.root == remote.root)
+    if diff.identical:
+        return diff
+    catalog = UnitCatalog()
+    for name in sorted(local.quantities.keys() - remote.quantities.keys()):
+        diff.added_quantities.append(name)
+        catalog.physicalQuantities.append(
+            local.export(name, local.quantities[name].units)
+        )
+    diff.removed_quantities = sorted(remote.quantities.keys() - local.quantities.keys())
+    for name in sorted(local.quantities.keys() & remote.quantities.keys()):
+        quantity = local.quantities[name]
+        if quantity.hash == remote.quantities[name]:
+            continue
+        diff.changed_quantities.append(name)
+        remote_units = remote.units.get(name)
+        if remote_units is None:
+            diff.pending_quantities.append(name)
+            continue
+        changed = [k for k, h in quantity.units.items() if remote_units.get(k) != h]
+        diff.removed_units.extend(
+            f"{name}/{k}" for k in sorted(remote_units.keys() - quantity.units.keys())
+        )
+        if changed:
+            catalog.physicalQuantities.append(local.export(name, changed))
+    diff.catalog = catalog
+    return diff
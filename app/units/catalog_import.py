@@ -0,0 +1,259 @@
+"""
+Bulk import of the unit catalog from `config/units.yaml`.
+
+The file lists physical quantities with their linear, functional and
+tabulated units. Importing diffs it against the database, matching
+quantities by name and units by kind and `value` within their quantity,
+then writes every change with a few multi-row statements in the caller's
+transaction: new quantities are inserted, units are upserted with
+`INSERT ... ON CONFLICT (id) DO UPDATE`, and links with `ON CONFLICT DO
+NOTHING`. Nothing is deleted; importing the same file twice is a no-op.
+"""
+
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Table, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, SQLModel, select
+
+from app.models import (
+    FunctionalUnit,
+    LinearUnit,
+    PhysicalQuantity,
+    TabulatedUnit,
+    UnitCatalog,
+    UnitCatalogImportReport,
+    physicalquantity_functionalunit_link,
+    physicalquantity_linearunit_link,
+    physicalquantity_tabulatedunit_link,
+)
+from app.units.formulas import FormulaError, compile_formula
+from app.units.tabulated import TableError, validate_table
+
+
+class CatalogImportError(ValueError):
+    def __init__(self, errors: list[str]) -> None:
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+@dataclass(frozen=True)
+class _UnitKind:
+    model: type[SQLModel]
+    link: Table
+    link_column: str
+    # Attribute of UnitCatalogQuantity and relationship of PhysicalQuantity
+    spec_attribute: str
+    relationship: str
+    # Kind-specific columns, compared when diffing and written on upsert
+    fields: tuple[str, ...]
+
+
+UNIT_KINDS = (
+    _UnitKind(
+        LinearUnit,
+        physicalquantity_linearunit_link,
+        "linearunit_id",
+        "linearUnits",
+        "linear_units",
+        ("factorToBase",),
+    ),
+    _UnitKind(
+        FunctionalUnit,
+        physicalquantity_functionalunit_link,
+        "functionalunit_id",
+        "functionalUnits",
+        "functional_units",
+        ("toBase", "fromBase"),
+    ),
+    _UnitKind(
+        TabulatedUnit,
+        physicalquantity_tabulatedunit_link,
+        "tabulatedunit_id",
+        "tabulatedUnits",
+        "tabulated_units",
+        ("unitPoints", "basePoints"),
+    ),
+)
+_COMMON_FIELDS = ("name", "base", "aliases")
+
+
+@dataclass
+class ImportPlan:
+    quantities: list[dict[str, Any]] = field(default_factory=list)
+    # Per unit kind: rows to upsert and links to insert
+    units: dict[type[SQLModel], list[dict[str, Any]]] = field(default_factory=dict)
+    links: dict[type[SQLModel], list[dict[str, Any]]] = field(default_factory=dict)
+    created_quantities: list[str] = field(default_factory=list)
+    created_units: list[str] = field(default_factory=list)
+    updated_units: list[str] = field(default_factory=list)
+    unchanged_units: int = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.quantities or self.created_units or self.updated_units)
+
+    def report(self, dry_run: bool) -> UnitCatalogImportReport:
+        verb = "would be" if dry_run else "were"
+        return UnitCatalogImportReport(
+            message=(
+                f"{len(self.created_quantities)} physical quantities and "
+                f"{len(self.created_units)} units {verb} added, "
+                f"{len(self.updated_units)} units {verb} updated"
+            ),
+            dry_run=dry_run,
+            created_quantities=self.created_quantities,
+            created_units=self.created_units,
+            updated_units=self.updated_units,
+            unchanged_units=self.unchanged_units,
+        )
+
+
+def validate_catalog(catalog: UnitCatalog) -> None:
+    errors = []
+    names = set()
+    for quantity in catalog.physicalQuantities:
+        if quantity.name in names:
+            errors.append(f"Physical quantity '{quantity.name}' is listed twice")
+        names.add(quantity.name)
+        for kind in UNIT_KINDS:
+            values = set()
+            for spec in getattr(quantity, kind.spec_attribute):
+                where = f"{quantity.name}/{spec.value}"
+                if spec.value in values:
+                    errors.append(f"{where}: listed twice in {kind.spec_attribute}")
+                values.add(spec.value)
+                try:
+                    if kind.model is FunctionalUnit:
+                        compile_formula(spec.toBase)
+                        compile_formula(spec.fromBase)
+                    elif kind.model is TabulatedUnit:
+                        validate_table(spec.unitPoints, spec.basePoints)
+                except (FormulaError, TableError) as e:
+                    errors.append(f"{where}: {e}")
+    if errors:
+        raise CatalogImportError(errors)
+
+
+def lock_catalog(session: Session) -> None:
+    """Serialize imports until the end of the transaction."""
+    session.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext('unit-catalog-import'))")
+    )
+
+
+def _current(unit: Any, column: str) -> Any:
+    value = getattr(unit, column)
+    # Rows from before the aliases column hold NULL
+    return (value or []) if column == "aliases" else value
+
+
+def plan_import(session: Session, catalog: UnitCatalog, now: datetime) -> ImportPlan:
+    validate_catalog(catalog)
+    # Only the quantities the catalog names are loaded, so merging a few
+    # changed units costs the same however large the catalog is
+    names = [quantity.name for quantity in catalog.physicalQuantities]
+    existing = session.exec(
+        select(PhysicalQuantity)
+        .where(PhysicalQuantity.quantity.in_(names))  # type: ignore[attr-defined]
+        .options(
+            *(
+                selectinload(getattr(PhysicalQuantity, k.relationship))
+                for k in UNIT_KINDS
+            )
+        )
+        # Soft-deleted units too, to revive them rather than add duplicates
+        .execution_options(include_deleted=True)
+    ).all()
+    by_name: dict[str, PhysicalQuantity] = {}
+    for known in existing:
+        by_name.setdefault(known.quantity, known)
+
+    plan = ImportPlan(
+        units={k.model: [] for k in UNIT_KINDS}, links={k.model: [] for k in UNIT_KINDS}
+    )
+    for quantity in catalog.physicalQuantities:
+        pq = by_name.get(quantity.name)
+        if pq is None:
+            quantity_id = uuid.uuid4()
+            plan.quantities.append({"id": quantity_id, "quantity": quantity.name})
+            plan.created_quantities.append(quantity.name)
+        else:
+            quantity_id = pq.id
+
+        for kind in UNIT_KINDS:
+            current: dict[str, Any] = {}
+            linked = getattr(pq, kind.relationship) if pq is not None else []
+            # Live units win over soft-deleted ones with the same value
+            for unit in sorted(linked, key=lambda u: not u.is_deleted):
+                current[unit.value] = unit
+            for spec in getattr(quantity, kind.spec_attribute):
+                where = f"{quantity.name}/{spec.value}"
+                values = {f: getattr(spec, f) for f in (*_COMMON_FIELDS, *kind.fields)}
+                unit = current.get(spec.value)
+                if unit is None:
+                    unit_id = uuid.uuid4()
+                    row = {
+                        "id": unit_id,
+                        "value": spec.value,
+                        "createdAt": now,
+                        **values,
+                    }
+                    plan.links[kind.model].append(
+                        {"physicalquantity_id": quantity_id, kind.link_column: unit_id}
+                    )
+                    plan.created_units.append(where)
+                elif unit.is_deleted or any(
+                    _current(unit, f) != v for f, v in values.items()
+                ):
+                    row = {
+                        "id": unit.id,
+                        "value": unit.value,
+                        "createdAt": unit.createdAt,
+                        **values,
+                    }
+                    plan.updated_units.append(where)
+                else:
+                    plan.unchanged_units += 1
+                    continue
+                row.update(
+                    updatedAt=now, is_deleted=False, deleted_at=None, deleted_by=None
+                )
+                plan.units[kind.model].append(row)
+    return plan
+
+
+def apply_import(session: Session, plan: ImportPlan) -> None:
+    """
+    Write the plan in the caller's transaction; the caller bumps the catalog
+    version and commits. Each statement is executed with the whole list of
+    rows, which SQLAlchemy sends as multi-row VALUES batches.
+    """
+    if plan.quantities:
+        session.execute(insert(PhysicalQuantity), plan.quantities)
+    for kind in UNIT_KINDS:
+        rows = plan.units[kind.model]
+        if rows:
+            statement = insert(kind.model)
+            updated = (
+                *_COMMON_FIELDS,
+                *kind.fields,
+                "updatedAt",
+                "is_deleted",
+                "deleted_at",
+                "deleted_by",
+            )
+            session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["id"],
+                    set_={column: statement.excluded[column] for column in updated},
+                ),
+                rows,
+            )
+        links = plan.links[kind.model]
+        if links:
+            session.execute(insert(kind.link).on_conflict_do_nothing(), links)
@@ -0,0 +1,130 @@
+"""
+Exact conversion with rational arithmetic, for results that must not carry
+floating-point error (certification reports, audits).
+
+Catalog factors and formula constants are taken as the decimals they are
+written as, so `0.3048` is 381/1250 rather than the nearest double, and input
+values are parsed the same way. A conversion source -> base -> target is
+composed into one exact map `target = a * source + b` and memoized per
+(source, target) pair on the registry snapshot, so repeated conversions only
+pay for the multiply-adds on Fractions. Linear units, SI-prefixed units,
+functional units whose formulas are exactly affine and compound expressions
+of them convert exactly; anything else is rejected rather than approximated.
+"""
+
+import math
+import re
+from collections.abc import Iterable
+from fractions import Fraction
+from functools import lru_cache
+
+from app.units.affine import Affine, detect_exact_affine
+from app.units.conversion import (
+    ConversionError,
+    check_compatible,
+    check_same_dimension,
+    resolve_compound,
+)
+from app.units.expressions import parse_expression
+from app.units.registry import RegisteredUnit, UnitRegistry
+
+_ZERO = Fraction(0)
+
+# Bounds on input values, so that parsing one cannot build a huge integer:
+# digits written, and the decimal exponent of strings like "2.5e-3"
+MAX_DIGITS = 100
+MAX_DECIMAL_EXPONENT = 1000
+_DECIMAL_EXPONENT = re.compile(r"[eE]([+-]?\d+)")
+
+
+@lru_cache(maxsize=4096)
+def exact_decimal(value: float) -> Fraction:
+    """The shortest decimal that rounds to `value`, e.g. 0.1 -> 1/10."""
+    return Fraction(repr(value))
+
+
+def parse_exact(value: int | float | str) -> Fraction:
+    """An input value: an int, a float taken as its decimal, or a string like '1/3' or '2.5e-3'."""
+    if isinstance(value, str):
+        exponent = _DECIMAL_EXPONENT.search(value)
+        if sum(c.isdigit() for c in value) > MAX_DIGITS or (
+            exponent is not None and abs(int(exponent.group(1))) > MAX_DECIMAL_EXPONENT
+        ):
+            raise ConversionError(
+                f"'{value[:20]}' has more than {MAX_DIGITS} digits or an exponent "
+                f"beyond {MAX_DECIMAL_EXPONENT}"
+            )
+        try:
+            return Fraction(value.strip())
+        except (ValueError, ZeroDivisionError):
+            raise ConversionError(f"'{value}' is not an exact number")
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise ConversionError(f"'{value}' is not an exact number")
+        # Not through exact_decimal: batch values would only churn its cache
+        return Fraction(repr(value))
+    if abs(value) >= 10**MAX_DIGITS:
+        raise ConversionError(f"Values must have at most {MAX_DIGITS} digits")
+    return Fraction(value)
+
+
+def exact_affine(unit: RegisteredUnit) -> Affine:
+    """The exact map to the base unit, `base = scale * x + offset`, with Fraction coefficients."""
+    if unit.prefix is not None and unit.unprefixed is not None:
+        return Affine(
+            exact_decimal(unit.prefix.factor) * exact_affine(unit.unprefixed).scale,
+            _ZERO,
+        )
+    if unit.factorToBase is not None:
+        return Affine(exact_decimal(unit.factorToBase), _ZERO)
+    # Only formulas that also fold in floating point have a fromBase that undoes toBase
+    if unit.folded_affine is not None and unit.toBase is not None:
+        affine = detect_exact_affine(unit.toBase)
+        if affine is not None:
+            return affine
+    raise ConversionError(
+        f"Unit '{unit.value}' has no exact conversion to its base unit"
+    )
+
+
+def _exact_scale(registry: UnitRegistry, expression: str) -> Fraction:
+    parsed = parse_expression(expression)
+    scale = exact_decimal(parsed.factor)
+    for symbol, exponent in parsed.symbols:
+        # Exponents are at most expressions.MAX_EXPONENT, so the powers stay small.
+        # Resolved and checked to be offset-free by resolve_compound already
+        unit = registry.resolve(symbol)
+        scale *= Fraction(exact_affine(unit).scale) ** exponent  # type: ignore[arg-type]
+    return scale
+
+
+def _chain(registry: UnitRegistry, source: str, target: str) -> Affine:
+    source_unit = registry.resolve(source)
+    target_unit = registry.resolve(target)
+    if source_unit is not None and target_unit is not None:
+        check_compatible(source_unit, target_unit)
+        return exact_affine(source_unit).then(exact_affine(target_unit).inverse())
+    source_compound = resolve_compound(registry, source)
+    target_compound = resolve_compound(registry, target)
+    check_same_dimension(source, source_compound, target, target_compound)
+    return Affine(
+        _exact_scale(registry, source) / _exact_scale(registry, target), _ZERO
+    )
+
+
+def exact_chain(registry: UnitRegistry, source: str, target: str) -> Affine:
+    """`(a, b)` such that `target = a * source + b` exactly, memoized per registry snapshot."""
+    return registry.exact_chains.get_or_compute(
+        (source, target), lambda: _chain(registry, source, target)
+    )
+
+
+def convert_exact(
+    registry: UnitRegistry, values: Iterable[Fraction], source: str, target: str
+) -> list[Fraction]:
+    chain = exact_chain(registry, source, target)
+    # Fractions already; Fraction() only narrows the type
+    a, b = Fraction(chain.scale), Fraction(chain.offset)
+    if b:
+        return [a * value + b for value in values]
+    return [a * value for value in values]
@@ -0,0 +1,225 @@
+"""
+Compound unit expressions such as `kg*m/s^2`, `kW·h` or `mm²`.
+
+An expression is parsed into symbols with integer exponents, then resolved
+against the registry: each symbol must be a unit whose conversion to its base
+has no offset, and contributes `factor ** exponent` to the scale and its base
+unit, raised to the exponent, to the dimension. Two expressions convert into
+each other when their dimensions are equal.
+"""
+
+import math
+from collections.abc import Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.units.registry import UnitRegistry
+
+# Base unit -> exponent, sorted by base unit so equal dimensions compare equal
+Dimension = tuple[tuple[str, int], ...]
+
+_MULTIPLY = {"*", "·", "⋅", "×"}
+_SUPERSCRIPTS = str.maketrans("⁰¹²³⁴⁵⁶⁷⁸⁹⁻⁺", "0123456789-+")
+_OPERATOR_CHARS = "*·⋅×/()^"
+
+# Largest exponent a unit may carry, written or accumulated through parentheses
+MAX_EXPONENT = 64
+
+
+class ExpressionError(ValueError):
+    pass
+
+
+class UnknownUnitError(ExpressionError):
+    def __init__(self, symbol: str, expression: str) -> None:
+        super().__init__(f"Unknown unit '{symbol}' in '{expression}'")
+        self.symbol = symbol
+
+
+@dataclass(frozen=True)
+class ParsedExpression:
+    symbols: tuple[tuple[str, int], ...]
+    # Bare numbers in the expression, e.g. the 1000 of "1000*m"
+    factor: float = 1.0
+
+
+@dataclass(frozen=True)
+class CompoundUnit:
+    expression: str
+    dimension: Dimension
+    scale: float
+
+
+def _is_superscript(char: str) -> bool:
+    return char.translate(_SUPERSCRIPTS) != char
+
+
+def _tokenize(expression: str) -> Iterator[str]:
+    text = expression.replace("**", "^")
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char.isspace():
+            i += 1
+        elif char in _OPERATOR_CHARS:
+            yield char
+            i += 1
+        elif _is_superscript(char):
+            start = i
+            while i < len(text) and _is_superscript(text[i]):
+                i += 1
+            yield "^"
+            yield text[start:i].translate(_SUPERSCRIPTS)
+        else:
+            start = i
+            while (
+                i < len(text)
+                and not text[i].isspace()
+                and text[i] not in _OPERATOR_CHARS
+                and not _is_superscript(text[i])
+            ):
+                i += 1
+            yield text[start:i]
+
+
+class _Parser:
+    """
+    expression := term (("*" | "/" | <whitespace>) term)*
+    term       := atom ("^" integer)?
+    atom       := symbol | number | "(" expression ")"
+    """
+
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+        self.tokens = list(_tokenize(expression))
+        self.position = 0
+
+    def peek(self) -> str | None:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self) -> str:
+        token = self.peek()
+        if token is None:
+            raise ExpressionError(
+                f"Unexpected end of unit expression '{self.expression}'"
+            )
+        self.position += 1
+        return token
+
+    def parse(self) -> ParsedExpression:
+        symbols, factor = self.expression_()
+        if self.peek() is not None:
+            raise ExpressionError(
+                f"Unexpected '{self.peek()}' in unit expression '{self.expression}'"
+            )
+        if factor == 0 or not math.isfinite(factor):
+            raise ExpressionError(f"The factor of '{self.expression}' is out of range")
+        merged = tuple(sorted((s, e) for s, e in symbols.items() if e != 0))
+        return ParsedExpression(symbols=merged, factor=factor)
+
+    def expression_(self) -> tuple[dict[str, int], float]:
+        symbols, factor = self.term()
+        while (token := self.peek()) is not None and token != ")":
+            sign = 1
+            if token in _MULTIPLY or token == "/":
+                self.take()
+                sign = -1 if token == "/" else 1
+            right, right_factor = self.term()
+            for symbol, exponent in right.items():
+                symbols[symbol] = symbols.get(symbol, 0) + sign * exponent
+            factor = factor * right_factor if sign == 1 else factor / right_factor
+        return symbols, factor
+
+    def term(self) -> tuple[dict[str, int], float]:
+        symbols, factor = self.atom()
+        if self.peek() == "^":
+            self.take()
+            exponent_token = self.take()
+            try:
+                exponent = int(exponent_token)
+            except ValueError:
+                raise ExpressionError(
+                    f"Invalid exponent '{exponent_token}' in '{self.expression}'"
+                )
+            symbols = {symbol: e * exponent for symbol, e in symbols.items()}
+            if (
+                any(abs(e) > MAX_EXPONENT for e in symbols.values())
+                or abs(exponent) > MAX_EXPONENT
+            ):
+                raise ExpressionError(
+                    f"Exponents in '{self.expression}' must be at most {MAX_EXPONENT}"
+                )
+            factor = factor**exponent
+        return symbols, factor
+
+    def atom(self) -> tuple[dict[str, int], float]:
+        token = self.take()
+        if token == "(":
+            result = self.expression_()
+            if self.take() != ")":
+                raise ExpressionError(f"Unbalanced parentheses in '{self.expression}'")
+            return result
+        if token in _OPERATOR_CHARS:
+            raise ExpressionError(
+                f"Unexpected '{token}' in unit expression '{self.expression}'"
+            )
+        try:
+            number = float(token)
+        except ValueError:
+            return {token: 1}, 1.0
+        if number == 0 or not math.isfinite(number):
+            raise ExpressionError(
+                f"Invalid factor '{token}' in unit expression '{self.expression}'"
+            )
+        return {}, number
+
+
+@lru_cache(maxsize=4096)
+def parse_expression(expression: str) -> ParsedExpression:
+    if not expression.strip():
+        raise ExpressionError("Empty unit expression")
+    try:
+        return _Parser(expression).parse()
+    except (OverflowError, ZeroDivisionError):
+        raise ExpressionError(f"The factor of '{expression}' is out of range")
+
+
+def _resolve(registry: "UnitRegistry", expression: str) -> CompoundUnit:
+    parsed = parse_expression(expression)
+    scale = parsed.factor
+    dimension: dict[str, int] = {}
+    for symbol, exponent in parsed.symbols:
+        unit = registry.resolve(symbol)
+        if unit is None:
+            raise UnknownUnitError(symbol, expression)
+        affine = unit.affine
+        if affine is None or affine.offset != 0:
+            raise ExpressionError(
+                f"Unit '{symbol}' has an offset or a non-linear formula and cannot be "
+                "part of a compound unit"
+            )
+        try:
+            scale *= affine.scale**exponent
+        except (OverflowError, ZeroDivisionError):
+            scale = math.inf
+        dimension[unit.base] = dimension.get(unit.base, 0) + exponent
+    if scale == 0 or not math.isfinite(scale):
+        raise ExpressionError(f"The scale of '{expression}' is out of range")
+    return CompoundUnit(
+        expression=expression,
+        dimension=tuple(sorted((b, e) for b, e in dimension.items() if e != 0)),
+        scale=scale,
+    )
+
+
+def resolve_expression(registry: "UnitRegistry", expression: str) -> CompoundUnit:
+    """Resolve `expression` against `registry`, memoized per registry snapshot."""
+    return registry.expressions.get_or_compute(
+        expression, lambda: _resolve(registry, expression)
+    )
+
+
+def format_dimension(dimension: Dimension) -> str:
+    return "·".join(base if e == 1 else f"{base}^{e}" for base, e in dimension) or "1"
@@ -0,0 +1,266 @@
+import ast
+import math
+import operator
+import sys
+import threading
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+
+from app.models import FunctionalUnit
+
+# Formulas are written in terms of a single variable, e.g. "x + 273.15"
+FORMULA_VARIABLE = "x"
+
+MATH_FUNCTIONS: dict[str, Callable[..., Any]] = {
+    "abs": abs,
+    "sqrt": math.sqrt,
+    "exp": math.exp,
+    "log": math.log,
+    "log10": math.log10,
+    "log2": math.log2,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "asin": math.asin,
+    "acos": math.acos,
+    "atan": math.atan,
+    "sinh": math.sinh,
+    "cosh": math.cosh,
+    "tanh": math.tanh,
+}
+
+# Same names bound to ufuncs, so a compiled formula runs over a whole array at once
+NUMPY_FUNCTIONS: dict[str, Callable[..., Any]] = {
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "exp": np.exp,
+    "log": np.log,
+    "log10": np.log10,
+    "log2": np.log2,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "asin": np.arcsin,
+    "acos": np.arccos,
+    "atan": np.arctan,
+    "sinh": np.sinh,
+    "cosh": np.cosh,
+    "tanh": np.tanh,
+}
+
+CONSTANTS: dict[str, float] = {"pi": math.pi, "e": math.e}
+
+_BINARY_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod)
+_UNARY_OPERATORS = (ast.UAdd, ast.USub)
+
+# Largest exponent a power may be raised to, so "x ^ 9 ^ 9 ^ 9" cannot hang a worker
+MAX_EXPONENT = 64
+# Largest integer a constant subexpression may fold to
+MAX_CONSTANT = int(sys.float_info.max)
+
+_FOLDED_OPERATORS: dict[type[ast.operator], Callable[[int, int], int]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Pow: operator.pow,
+    ast.Mod: operator.mod,
+}
+
+
+class FormulaError(ValueError):
+    pass
+
+
+def _number(node: ast.AST) -> int | float | None:
+    """The value of a (signed) numeric literal, or None for anything else."""
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, _UNARY_OPERATORS):
+        value = _number(node.operand)
+        if value is None or isinstance(node.op, ast.UAdd):
+            return value
+        return -value
+    if isinstance(node, ast.Constant) and isinstance(node.value, int | float):
+        return node.value
+    return None
+
+
+class _FormulaValidator(ast.NodeTransformer):
+    """
+    Rejects anything that is not arithmetic on `x`, numbers and whitelisted functions,
+    and folds integer subexpressions, so an oversized constant fails here rather than
+    when the formula is first run.
+    """
+
+    def visit_Expression(self, node: ast.Expression) -> ast.AST:
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        if not isinstance(node.op, _BINARY_OPERATORS):
+            raise FormulaError(f"Operator {type(node.op).__name__} is not allowed")
+        node.left = self.visit(node.left)
+        node.right = self.visit(node.right)
+        if isinstance(node.op, ast.Pow):
+            self._check_power(node)
+        return self._fold(node)
+
+    def _check_power(self, node: ast.BinOp) -> None:
+        exponent = _number(node.right)
+        if exponent is not None:
+            if abs(exponent) > MAX_EXPONENT:
+                raise FormulaError(f"Exponent {exponent} is larger than {MAX_EXPONENT}")
+            return
+        base = _number(node.left)
+        if base is None:
+            raise FormulaError("A power needs a constant base or a constant exponent")
+        # "10 ^ (x / 10)": a float base keeps the power a float, however large x is
+        node.left = ast.copy_location(ast.Constant(float(base)), node.left)
+
+    def _fold(self, node: ast.BinOp) -> ast.AST:
+        left, right = _number(node.left), _number(node.right)
+        if isinstance(node.op, ast.Div | ast.Mod) and right == 0:
+            raise FormulaError("Division by zero")
+        # Only integers: folding floats or divisions would round what exact
+        # conversions read as written (see app.units.affine)
+        if (
+            type(left) is not int
+            or type(right) is not int
+            or type(node.op) not in _FOLDED_OPERATORS
+        ):
+            return node
+        if isinstance(node.op, ast.Pow):
+            if right < 0:
+                return node
+            if left.bit_length() * right > MAX_CONSTANT.bit_length():
+                raise FormulaError(f"Constant {left}^{right} is too large")
+        value = _FOLDED_OPERATORS[type(node.op)](left, right)
+        if abs(value) > MAX_CONSTANT:
+            raise FormulaError("Constant is too large")
+        return ast.copy_location(ast.Constant(value), node)
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        if not isinstance(node.op, _UNARY_OPERATORS):
+            raise FormulaError(f"Operator {type(node.op).__name__} is not allowed")
+        node.operand = self.visit(node.operand)
+        return node
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        if isinstance(node.value, bool) or not isinstance(node.value, int | float):
+            raise FormulaError(f"Constant {node.value!r} is not allowed")
+        return node
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id == FORMULA_VARIABLE:
+            return node
+        if node.id in CONSTANTS:
+            return ast.copy_location(ast.Constant(CONSTANTS[node.id]), node)
+        raise FormulaError(f"Unknown name '{node.id}'")
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        if not isinstance(node.func, ast.Name) or node.func.id not in MATH_FUNCTIONS:
+            raise FormulaError("Only whitelisted math functions can be called")
+        if node.keywords or len(node.args) != 1:
+            raise FormulaError(f"{node.func.id}() takes exactly one argument")
+        node.args = [self.visit(node.args[0])]
+        return node
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        raise FormulaError(f"{type(node).__name__} is not allowed in a formula")
+
+
+def parse_formula(source: str) -> ast.Expression:
+    # "x^2" is the usual way to write a power in unit formulas. Rewriting it before
+    # parsing gives it the precedence of "**"; Python's "^" binds looser than "+".
+    try:
+        tree = ast.parse(source.strip().replace("^", "**"), mode="eval")
+    except SyntaxError as e:
+        raise FormulaError(f"Invalid formula '{source}': {e.msg}")
+    validated: ast.Expression = _FormulaValidator().visit(tree)
+    return validated
+
+
+def compile_formula(
+    source: str, functions: Mapping[str, Callable[..., Any]] = MATH_FUNCTIONS
+) -> Callable[[Any], Any]:
+    """
+    Compile a formula into a plain Python function of `x`.
+
+    `functions` is the namespace the whitelisted function names resolve to, so the
+    same formula can be bound to `math` for scalars or to NumPy ufuncs for arrays.
+    """
+    tree = parse_formula(source)
+    lambda_node = ast.Lambda(
+        args=ast.arguments(
+            posonlyargs=[],
+            args=[ast.arg(arg=FORMULA_VARIABLE)],
+            kwonlyargs=[],
+            kw_defaults=[],
+            defaults=[],
+        ),
+        body=tree.body,
+    )
+    module = ast.fix_missing_locations(ast.Expression(body=lambda_node))
+    code = compile(module, f"<formula {source!r}>", "eval")
+    namespace = {"__builtins__": {}, **functions}
+    function: Callable[[Any], Any] = eval(code, namespace)  # noqa: S307 - the AST has been whitelisted above
+    return function
+
+
+@dataclass(frozen=True)
+class CompiledFunctionalUnit:
+    to_base: Callable[[Any], Any]
+    from_base: Callable[[Any], Any]
+    to_base_vectorized: Callable[[np.ndarray], np.ndarray]
+    from_base_vectorized: Callable[[np.ndarray], np.ndarray]
+
+    @classmethod
+    def from_formulas(cls, to_base: str, from_base: str) -> "CompiledFunctionalUnit":
+        return cls(
+            to_base=compile_formula(to_base),
+            from_base=compile_formula(from_base),
+            to_base_vectorized=compile_formula(to_base, NUMPY_FUNCTIONS),
+            from_base_vectorized=compile_formula(from_base, NUMPY_FUNCTIONS),
+        )
+
+
+class FormulaCache:
+    """Process-wide cache of compiled formulas, keyed by unit id and `updatedAt`."""
+
+    def __init__(self) -> None:
+        self._entries: dict[UUID, tuple[datetime | None, CompiledFunctionalUnit]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, unit: FunctionalUnit) -> CompiledFunctionalUnit:
+        entry = self._entries.get(unit.id)
+        if entry is not None and entry[0] == unit.updatedAt:
+            return entry[1]
+        compiled = CompiledFunctionalUnit.from_formulas(unit.toBase, unit.fromBase)
+        with self._lock:
+            self._entries[unit.id] = (unit.updatedAt, compiled)
+        return compiled
+
+    def invalidate(self, unit_id: UUID) -> None:
+        with self._lock:
+            self._entries.pop(unit_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+formula_cache = FormulaCache()
+
+
+def to_base(unit: FunctionalUnit, value: Any) -> Any:
+    return formula_cache.get(unit).to_base(value)
+
+
+def from_base(unit: FunctionalUnit, value: Any) -> Any:
+    return formula_cache.get(unit).from_base(value)
@@ -0,0 +1,67 @@
+"""
+Physical quantities (and preferred units) that make up a unit system.
+
+Membership lives in `unitsystem_physicalquantity_link`; reading a system is
+one primary-key range scan over its own rows, and adding or removing members
+is a single statement however many there are.
+"""
+
+from collections.abc import Iterable
+from uuid import UUID
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session
+
+from app.models import UnitSystemMember
+from app.models import unitsystem_physicalquantity_link as link
+
+
+def get_members(session: Session, unitsystem_id: UUID) -> dict[UUID, UUID | None]:
+    """Physical quantity id -> preferred unit id of one unit system."""
+    rows = session.execute(
+        select(link.c.physicalquantity_id, link.c.unit_id).where(
+            link.c.unitsystem_id == unitsystem_id
+        )
+    )
+    return dict(rows.tuples().all())
+
+
+def add_members(
+    session: Session, unitsystem_id: UUID, members: Iterable[UnitSystemMember]
+) -> int:
+    """Insert or update members in one statement; the caller commits."""
+    rows = {
+        m.physicalquantity_id: {
+            "unitsystem_id": unitsystem_id,
+            "physicalquantity_id": m.physicalquantity_id,
+            "unit_id": m.unit_id,
+        }
+        for m in members
+    }
+    if not rows:
+        return 0
+    statement = insert(link).values(list(rows.values()))
+    statement = statement.on_conflict_do_update(
+        index_elements=[link.c.unitsystem_id, link.c.physicalquantity_id],
+        set_={"unit_id": statement.excluded.unit_id},
+    )
+    session.execute(statement)
+    return len(rows)
+
+
+def remove_members(
+    session: Session, unitsystem_id: UUID, quantity_ids: Iterable[UUID]
+) -> int:
+    """Delete members in one statement; the caller commits."""
+    ids = list(set(quantity_ids))
+    if not ids:
+        return 0
+    removed = session.scalars(
+        delete(link)
+        .where(
+            link.c.unitsystem_id == unitsystem_id, link.c.physicalquantity_id.in_(ids)
+        )
+        .returning(link.c.physicalquantity_id)
+    )
+    return len(removed.all())
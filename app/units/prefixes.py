@@ -0,0 +1,131 @@
+"""
+SI prefixes, applied on the fly.
+
+Prefixed variants (km, mm, µm, GW, ...) are not stored in the catalog. When a
+reference does not match a unit exactly, the registry splits off a known
+prefix and looks the rest up among the catalog units; the prefixed unit is
+derived from that unit and cached on the registry snapshot.
+"""
+
+import dataclasses
+import math
+import uuid
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from app.units.registry import RegisteredUnit, UnitRegistry
+
+
+class SIPrefix(NamedTuple):
+    symbol: str
+    name: str
+    factor: float
+
+
+SI_PREFIXES: tuple[SIPrefix, ...] = (
+    SIPrefix("Q", "quetta", 1e30),
+    SIPrefix("R", "ronna", 1e27),
+    SIPrefix("Y", "yotta", 1e24),
+    SIPrefix("Z", "zetta", 1e21),
+    SIPrefix("E", "exa", 1e18),
+    SIPrefix("P", "peta", 1e15),
+    SIPrefix("T", "tera", 1e12),
+    SIPrefix("G", "giga", 1e9),
+    SIPrefix("M", "mega", 1e6),
+    SIPrefix("k", "kilo", 1e3),
+    SIPrefix("h", "hecto", 1e2),
+    SIPrefix("da", "deca", 1e1),
+    SIPrefix("d", "deci", 1e-1),
+    SIPrefix("c", "centi", 1e-2),
+    SIPrefix("m", "milli", 1e-3),
+    SIPrefix("µ", "micro", 1e-6),
+    SIPrefix("n", "nano", 1e-9),
+    SIPrefix("p", "pico", 1e-12),
+    SIPrefix("f", "femto", 1e-15),
+    SIPrefix("a", "atto", 1e-18),
+    SIPrefix("z", "zepto", 1e-21),
+    SIPrefix("y", "yocto", 1e-24),
+    SIPrefix("r", "ronto", 1e-27),
+    SIPrefix("q", "quecto", 1e-30),
+)
+
+_BY_SYMBOL = {p.symbol: p for p in SI_PREFIXES}
+_BY_NAME = {p.name: p for p in SI_PREFIXES}
+# Alternative spellings: GREEK SMALL LETTER MU and ASCII "u" for the micro sign
+_BY_SYMBOL.update({"μ": _BY_SYMBOL["µ"], "u": _BY_SYMBOL["µ"]})
+_BY_NAME["deka"] = _BY_NAME["deca"]
+
+# Longest first, so "da" wins over "d"
+_SYMBOLS = sorted(_BY_SYMBOL, key=len, reverse=True)
+_NAMES = sorted(_BY_NAME, key=len, reverse=True)
+
+
+def _prefixed(unit: "RegisteredUnit", prefix: SIPrefix) -> "RegisteredUnit | None":
+    affine = unit.affine
+    # A prefix scales the unit, which only makes sense when zero stays zero
+    if affine is None or affine.offset != 0:
+        return None
+    return dataclasses.replace(
+        unit,
+        id=uuid.uuid5(unit.id, prefix.symbol),
+        name=prefix.name + unit.name,
+        value=prefix.symbol + unit.value,
+        # Not part of the registry arrays
+        index=-1,
+        factorToBase=prefix.factor * affine.scale,
+        toBase=None,
+        fromBase=None,
+        compiled=None,
+        folded_affine=None,
+        prefix=prefix,
+        unprefixed=unit,
+    )
+
+
+def _is_prefixed(
+    unit: "RegisteredUnit",
+    units: "Mapping[str, RegisteredUnit]",
+    table: dict[str, SIPrefix],
+    key: str,
+) -> bool:
+    """Whether a catalog unit is itself a prefixed catalog unit, like a stored "km"."""
+    for prefix, si_prefix in table.items():
+        if key.startswith(prefix) and len(key) > len(prefix):
+            unprefixed = units.get(key[len(prefix) :])
+            if (
+                unprefixed is not None
+                and unprefixed.base == unit.base
+                and unit.affine is not None
+                and unprefixed.affine is not None
+                and math.isclose(
+                    unit.affine.scale, si_prefix.factor * unprefixed.affine.scale
+                )
+            ):
+                return True
+    return False
+
+
+def _expand(registry: "UnitRegistry", reference: str) -> "RegisteredUnit | None":
+    candidates = [
+        (prefix, registry.units_by_value, _BY_SYMBOL) for prefix in _SYMBOLS
+    ] + [(prefix, registry.units_by_name, _BY_NAME) for prefix in _NAMES]
+    for prefix, units, table in candidates:
+        if reference.startswith(prefix) and len(reference) > len(prefix):
+            key = reference[len(prefix) :]
+            unit = units.get(key)
+            # SI prefixes do not stack: no "kkm", even with "km" in the catalog
+            if unit is not None and not _is_prefixed(unit, units, table, key):
+                prefixed = _prefixed(unit, table[prefix])
+                if prefixed is not None:
+                    return prefixed
+    return None
+
+
+def resolve_prefixed(
+    registry: "UnitRegistry", reference: str
+) -> "RegisteredUnit | None":
+    """A catalog unit with an SI prefix applied, memoized per registry snapshot."""
+    return registry.prefixed.get_or_compute(
+        reference, lambda: _expand(registry, reference)
+    )
@@ -0,0 +1,210 @@
+"""
+Unit-aware values: a `Quantity` scalar and a NumPy-backed `QuantityArray`.
+
+Both hold a magnitude, a `RegisteredUnit` and the registry snapshot the unit
+was resolved against. Arithmetic and comparisons between two quantities
+convert the right operand into the left one's unit first, with the same
+vectorized path as the conversion endpoints, so a whole array of readings is
+converted, compared or summed without per-element Python objects. Mixing a
+scalar with an array gives an array.
+
+Sums and differences of values in one unit add their magnitudes, offset or
+not: `20 °C + 5 °C` is 25 °C, and so is the `.sum()` of `[20, 5] °C`. Across
+two units they are only defined when neither has an offset: `20 °C + 5 K` is
+rejected, since which of the two temperatures is meant is ambiguous.
+Multiplying two quantities is not supported; scale them by plain numbers.
+"""
+
+import operator
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+from app.units.conversion import ConversionError, UnitNotFoundError, convert_array
+from app.units.registry import RegisteredUnit, UnitRegistry
+
+Magnitude = float | np.ndarray
+
+
+def _resolve(registry: UnitRegistry, unit: RegisteredUnit | str) -> RegisteredUnit:
+    if isinstance(unit, RegisteredUnit):
+        return unit
+    resolved = registry.resolve(unit)
+    if resolved is None:
+        raise UnitNotFoundError(unit)
+    return resolved
+
+
+def _has_offset(unit: RegisteredUnit) -> bool:
+    affine = unit.affine
+    return affine is None or affine.offset != 0
+
+
+class _UnitValue:
+    __slots__ = ("magnitude", "unit", "registry")
+
+    magnitude: Magnitude
+    unit: RegisteredUnit
+    registry: UnitRegistry
+
+    # Make NumPy defer to our reflected operators, so `array * quantity` keeps its unit
+    __array_ufunc__ = None
+
+    def _convert(self, unit: RegisteredUnit) -> np.ndarray:
+        return convert_array(
+            np.asarray(self.magnitude),
+            self.unit,
+            unit,
+            self.registry.direct_conversion(self.unit, unit),
+        )
+
+    def to(self, unit: RegisteredUnit | str) -> Any:
+        """The same value expressed in `unit`."""
+        target = _resolve(self.registry, unit)
+        return _new(self._convert(target), target, self.registry)
+
+    def magnitude_in(self, unit: RegisteredUnit | str) -> Magnitude:
+        magnitude: Magnitude = self.to(unit).magnitude
+        return magnitude
+
+    def _operand(self, other: object) -> Magnitude | None:
+        """`other`'s magnitude in this value's unit, None if it is not a quantity."""
+        if not isinstance(other, _UnitValue):
+            return None
+        if other.unit.id == self.unit.id:
+            return other.magnitude
+        return other._convert(self.unit)
+
+    def _additive(self, other: object, op: Callable[[Any, Any], Any]) -> Any:
+        if not isinstance(other, _UnitValue):
+            return NotImplemented
+        if other.unit.id != self.unit.id and (
+            _has_offset(self.unit) or _has_offset(other.unit)
+        ):
+            raise ConversionError(
+                f"Cannot add or subtract '{other.unit.value}' and '{self.unit.value}': "
+                "convert both to the same unit first"
+            )
+        return _new(op(self.magnitude, self._operand(other)), self.unit, self.registry)
+
+    def __add__(self, other: object) -> Any:
+        return self._additive(other, operator.add)
+
+    def __sub__(self, other: object) -> Any:
+        return self._additive(other, operator.sub)
+
+    def _scaled(self, other: object, op: Callable[[Any, Any], Any]) -> Any:
+        if isinstance(other, _UnitValue) or not isinstance(
+            other, int | float | np.number | np.ndarray
+        ):
+            return NotImplemented
+        return _new(op(self.magnitude, other), self.unit, self.registry)
+
+    def __mul__(self, other: object) -> Any:
+        return self._scaled(other, operator.mul)
+
+    def __rmul__(self, other: object) -> Any:
+        return self._scaled(other, operator.mul)
+
+    def __truediv__(self, other: object) -> Any:
+        return self._scaled(other, operator.truediv)
+
+    def __neg__(self) -> Any:
+        return _new(-self.magnitude, self.unit, self.registry)
+
+    def __abs__(self) -> Any:
+        return _new(abs(self.magnitude), self.unit, self.registry)
+
+    def _compare(self, other: object, op: Callable[[Any, Any], Any]) -> Any:
+        operand = self._operand(other)
+        if operand is None:
+            return NotImplemented
+        result = op(self.magnitude, operand)
+        return bool(result) if np.ndim(result) == 0 else result
+
+    def __eq__(self, other: object) -> Any:
+        return self._compare(other, operator.eq)
+
+    def __ne__(self, other: object) -> Any:
+        return self._compare(other, operator.ne)
+
+    def __lt__(self, other: object) -> Any:
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other: object) -> Any:
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other: object) -> Any:
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other: object) -> Any:
+        return self._compare(other, operator.ge)
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+class Quantity(_UnitValue):
+    __slots__ = ()
+
+    magnitude: float
+
+    def __init__(
+        self, magnitude: float, unit: RegisteredUnit | str, registry: UnitRegistry
+    ) -> None:
+        self.magnitude = float(magnitude)
+        self.unit = _resolve(registry, unit)
+        self.registry = registry
+
+    def __float__(self) -> float:
+        return self.magnitude
+
+    def __repr__(self) -> str:
+        return f"Quantity({self.magnitude!r}, {self.unit.value!r})"
+
+
+class QuantityArray(_UnitValue):
+    __slots__ = ()
+
+    magnitude: np.ndarray
+
+    def __init__(
+        self, magnitude: Any, unit: RegisteredUnit | str, registry: UnitRegistry
+    ) -> None:
+        self.magnitude = np.asarray(magnitude, dtype=np.float64)
+        self.unit = _resolve(registry, unit)
+        self.registry = registry
+
+    def __len__(self) -> int:
+        return len(self.magnitude)
+
+    def __getitem__(self, key: Any) -> "Quantity | QuantityArray":
+        return _new(self.magnitude[key], self.unit, self.registry)
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self.magnitude.shape
+
+    def sum(self) -> Quantity:
+        # The same rule as `+`: magnitudes in one unit add as they are
+        return Quantity(float(self.magnitude.sum()), self.unit, self.registry)
+
+    def min(self) -> Quantity:
+        return Quantity(float(self.magnitude.min()), self.unit, self.registry)
+
+    def max(self) -> Quantity:
+        return Quantity(float(self.magnitude.max()), self.unit, self.registry)
+
+    def mean(self) -> Quantity:
+        return Quantity(float(self.magnitude.mean()), self.unit, self.registry)
+
+    def __repr__(self) -> str:
+        return f"QuantityArray({self.magnitude!r}, {self.unit.value!r})"
+
+
+def _new(
+    magnitude: Any, unit: RegisteredUnit, registry: UnitRegistry
+) -> Quantity | QuantityArray:
+    if np.ndim(magnitude) == 0:
+        return Quantity(magnitude, unit, registry)
+    return QuantityArray(magnitude, unit, registry)
@@ -0,0 +1,236 @@
+"""
+Re-expression of project objectives and test values in another unit system.
+
+The rows hold no unit column of their own: the unit a value is expressed in
+is the row's `physicalQuantity`, resolved like any unit reference (symbol,
+name, alias or id). Each row moves to the unit the target system prefers for
+that unit's physical quantity; rows whose quantity has no preferred unit
+there are left as they are.
+
+Everything is set-based: one SELECT per kind of row, one vectorized
+conversion per (source unit, target unit) pair however many rows share it,
+and one executemany UPDATE per kind of row when the result is written.
+"""
+
+import math
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlmodel import Session, SQLModel
+
+from app.models import (
+    Project,
+    ProjectObjective,
+    Reading,
+    RealCondition,
+    ReexpressedValues,
+    SkippedReexpression,
+    Test,
+    UnitReexpressionReport,
+    VLReading,
+)
+from app.units.conversion import ConversionError
+from app.units.membership import get_members
+from app.units.quantity import QuantityArray
+from app.units.registry import RegisteredUnit, UnitRegistry
+
+
+@dataclass(frozen=True)
+class _ValueKind:
+    name: str
+    model: type[SQLModel]
+    parent: type[SQLModel]
+    parent_column: str
+    fields: tuple[str, ...]
+    # Values stored as text (and possibly formulas) rather than floats
+    text: bool
+
+
+VALUE_KINDS = (
+    _ValueKind(
+        "objective",
+        ProjectObjective,
+        Project,
+        "project_id",
+        ("valueMin", "valueMax"),
+        False,
+    ),
+    _ValueKind("realCondition", RealCondition, Test, "test_id", ("value",), True),
+    _ValueKind("reading", Reading, Test, "test_id", ("value",), True),
+    _ValueKind("vlReading", VLReading, Test, "test_id", ("value",), True),
+)
+
+
+@dataclass
+class _Row:
+    kind: _ValueKind
+    id: UUID
+    parent_id: UUID
+    source: RegisteredUnit
+    target: RegisteredUnit
+    values: dict[str, float | None]
+
+
+@dataclass
+class ReexpressionPlan:
+    rows: list[_Row] = field(default_factory=list)
+    skipped: list[SkippedReexpression] = field(default_factory=list)
+    unchanged: int = 0
+
+    def report(self, dry_run: bool) -> UnitReexpressionReport:
+        return UnitReexpressionReport(
+            dry_run=dry_run,
+            converted=[
+                ReexpressedValues(
+                    kind=row.kind.name,
+                    id=row.id,
+                    source=row.source.value,
+                    target=row.target.value,
+                    values=row.values,
+                )
+                for row in self.rows
+            ],
+            skipped=self.skipped,
+            unchanged=self.unchanged,
+        )
+
+
+def _number(value: Any) -> float | None:
+    if value is None or value == "":
+        return None
+    result = float(value)
+    if not math.isfinite(result):
+        raise ValueError(value)
+    return result
+
+
+def _target_unit(
+    unit: RegisteredUnit, preferred: dict[UUID, RegisteredUnit]
+) -> RegisteredUnit | None:
+    for quantity_id in unit.quantity_ids:
+        target = preferred.get(quantity_id)
+        if target is not None:
+            return target
+    return None
+
+
+def plan_reexpression(
+    session: Session,
+    registry: UnitRegistry,
+    unitsystem_id: UUID,
+    project_ids: Iterable[UUID],
+    test_ids: Iterable[UUID],
+) -> ReexpressionPlan:
+    preferred = {
+        quantity_id: registry.units_by_id[unit_id]
+        for quantity_id, unit_id in get_members(session, unitsystem_id).items()
+        if unit_id is not None and unit_id in registry.units_by_id
+    }
+    parents = {Project: list(set(project_ids)), Test: list(set(test_ids))}
+    plan = ReexpressionPlan()
+    for kind in VALUE_KINDS:
+        ids = parents[kind.parent]
+        if not ids:
+            continue
+        model: Any = kind.model
+        parent_column = getattr(model, kind.parent_column)
+        result = session.execute(
+            select(
+                model.id,
+                parent_column,
+                model.physicalQuantity,
+                *(getattr(model, f) for f in kind.fields),
+            ).where(parent_column.in_(ids))
+        )
+        for row_id, parent_id, reference, *raw in result:
+            source = registry.resolve(reference) if reference else None
+            if source is None:
+                plan.skipped.append(
+                    SkippedReexpression(
+                        kind=kind.name,
+                        id=row_id,
+                        reason=f"Unit '{reference}' not found",
+                    )
+                )
+                continue
+            target = _target_unit(source, preferred)
+            if target is None or target.id == source.id:
+                plan.unchanged += 1
+                continue
+            try:
+                values = {f: _number(v) for f, v in zip(kind.fields, raw, strict=True)}
+            except ValueError:
+                plan.skipped.append(
+                    SkippedReexpression(
+                        kind=kind.name, id=row_id, reason="Value is not a number"
+                    )
+                )
+                continue
+            plan.rows.append(_Row(kind, row_id, parent_id, source, target, values))
+
+    _convert_rows(registry, plan)
+    return plan
+
+
+def _convert_rows(registry: UnitRegistry, plan: ReexpressionPlan) -> None:
+    groups: dict[tuple[UUID, UUID], list[_Row]] = {}
+    for row in plan.rows:
+        groups.setdefault((row.source.id, row.target.id), []).append(row)
+    converted_rows = []
+    for rows in groups.values():
+        # Every value of every row in the group, converted in one call
+        slots = [
+            (row, f) for row in rows for f, v in row.values.items() if v is not None
+        ]
+        if slots:
+            try:
+                converted = (
+                    QuantityArray(
+                        [row.values[f] for row, f in slots], rows[0].source, registry
+                    )
+                    .to(rows[0].target)
+                    .magnitude.tolist()
+                )
+            except ConversionError as e:
+                plan.skipped.extend(
+                    SkippedReexpression(kind=row.kind.name, id=row.id, reason=str(e))
+                    for row in rows
+                )
+                continue
+            for (row, f), value in zip(slots, converted, strict=True):
+                row.values[f] = value
+        converted_rows.extend(rows)
+    plan.rows = converted_rows
+
+
+def apply_reexpression(session: Session, plan: ReexpressionPlan, now: datetime) -> None:
+    """Write the plan in the caller's transaction; the caller commits."""
+    touched: dict[type[SQLModel], set[UUID]] = {}
+    for kind in VALUE_KINDS:
+        updates = [
+            {
+                "id": row.id,
+                "physicalQuantity": row.target.value,
+                # Empty values stay as they are
+                **{
+                    f: repr(v) if kind.text else v
+                    for f, v in row.values.items()
+                    if v is not None
+                },
+            }
+            for row in plan.rows
+            if row.kind is kind
+        ]
+        if updates:
+            # Bulk UPDATE by primary key, sent as a single executemany
+            session.execute(update(kind.model), updates)
+            touched.setdefault(kind.parent, set()).update(
+                row.parent_id for row in plan.rows if row.kind is kind
+            )
+    for parent, ids in touched.items():
+        model: Any = parent
+        session.execute(update(model).where(model.id.in_(ids)).values(updatedAt=now))
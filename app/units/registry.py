@@ -0,0 +1,429 @@
+"""
+In-process, immutable snapshot of the unit catalog.
+
+Every worker builds one `UnitRegistry` from the database and serves unit reads
+and conversions from it. Writes to physical quantities or units bump the
+catalog version stored in the database; a worker checks that version at most
+every `UNIT_REGISTRY_CHECK_INTERVAL` seconds and swaps in a freshly built
+snapshot when it has moved.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import cached_property
+from pathlib import Path
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import subqueryload
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.models import (
+    CatalogVersion,
+    FunctionalUnit,
+    LinearUnit,
+    PhysicalQuantity,
+    TabulatedUnit,
+)
+from app.units.affine import Affine, detect_unit_affine
+from app.units.cache import LRUCache
+from app.units.catalog_hash import CatalogHashes, build_catalog_hashes
+from app.units.formulas import CompiledFunctionalUnit, FormulaError, formula_cache
+from app.units.prefixes import SIPrefix, resolve_prefixed
+from app.units.search import UnitSearchIndex
+from app.units.snapshot import load_tables, publish_tables
+from app.units.tables import ConversionTable, build_tables
+from app.units.tabulated import TableError, TabulatedCurve
+
+if TYPE_CHECKING:
+    from app.units.expressions import CompoundUnit
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RegisteredUnit:
+    id: UUID
+    name: str
+    value: str
+    base: str
+    # Position of the unit in the registry arrays
+    index: int
+    quantity_ids: tuple[UUID, ...]
+    updatedAt: datetime | None = None
+    aliases: tuple[str, ...] = ()
+    factorToBase: float | None = None
+    toBase: str | None = None
+    fromBase: str | None = None
+    compiled: CompiledFunctionalUnit | None = field(
+        default=None, compare=False, repr=False
+    )
+    # Functional units whose formulas reduce to scale * x + offset
+    folded_affine: Affine | None = None
+    tabulated: TabulatedCurve | None = field(default=None, compare=False, repr=False)
+    # SI-prefixed units derived on the fly: the prefix and the catalog unit it scales
+    prefix: SIPrefix | None = None
+    unprefixed: "RegisteredUnit | None" = field(default=None, compare=False, repr=False)
+
+    @property
+    def is_linear(self) -> bool:
+        return self.factorToBase is not None
+
+    @property
+    def affine(self) -> Affine | None:
+        """The map to the base unit, `base = scale * x + offset`, if the unit is affine."""
+        if self.factorToBase is not None:
+            return Affine(self.factorToBase, 0.0)
+        return self.folded_affine
+
+
+@dataclass(frozen=True)
+class RegisteredQuantity:
+    id: UUID
+    quantity: str
+    unit_ids: tuple[UUID, ...]
+    read: PhysicalQuantity.Read = field(compare=False, repr=False)
+
+
+@dataclass(frozen=True)
+class UnitRegistry:
+    version: int
+    units: tuple[RegisteredUnit, ...]
+    quantities: tuple[RegisteredQuantity, ...]
+    units_by_id: Mapping[UUID, RegisteredUnit]
+    units_by_name: Mapping[str, RegisteredUnit]
+    units_by_value: Mapping[str, RegisteredUnit]
+    units_by_alias: Mapping[str, RegisteredUnit]
+    quantities_by_id: Mapping[UUID, RegisteredQuantity]
+    quantities_by_name: Mapping[str, RegisteredQuantity]
+    # factorToBase for every unit by index, NaN for functional and tabulated units
+    factors: np.ndarray = field(compare=False, repr=False)
+    tables: Mapping[UUID, ConversionTable] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+    # Compound unit expressions resolved against this snapshot
+    expressions: "LRUCache[str, CompoundUnit]" = field(
+        default_factory=lambda: LRUCache(settings.UNIT_EXPRESSION_CACHE_SIZE),
+        compare=False,
+        repr=False,
+    )
+    # SI-prefixed units derived on first use, None for references that are not one
+    prefixed: "LRUCache[str, RegisteredUnit | None]" = field(
+        default_factory=lambda: LRUCache(settings.UNIT_PREFIX_CACHE_SIZE),
+        compare=False,
+        repr=False,
+    )
+    # Exact conversion maps composed per (source, target) reference pair
+    exact_chains: LRUCache[tuple[str, str], Affine] = field(
+        default_factory=lambda: LRUCache(settings.UNIT_EXACT_CACHE_SIZE),
+        compare=False,
+        repr=False,
+    )
+
+    def resolve(self, reference: str) -> RegisteredUnit | None:
+        """Look a unit up by id, symbol (`value`) or name, then as an SI-prefixed unit."""
+        try:
+            unit = self.units_by_id.get(UUID(reference))
+        except ValueError:
+            unit = None
+        return (
+            unit
+            or self.units_by_value.get(reference)
+            or self.units_by_name.get(reference)
+            or self.units_by_alias.get(reference)
+            or resolve_prefixed(self, reference)
+        )
+
+    def direct_conversion(
+        self, source: RegisteredUnit, target: RegisteredUnit
+    ) -> tuple[float, float] | None:
+        """`(a, b)` such that `target = a * source + b`, from a precomputed table."""
+        for quantity_id in source.quantity_ids:
+            table = self.tables.get(quantity_id)
+            if table is not None:
+                coefficients = table.lookup(source.id, target.id)
+                if coefficients is not None:
+                    return coefficients
+        return None
+
+    def physical_quantities(self) -> list[PhysicalQuantity.Read]:
+        return [quantity.read for quantity in self.quantities]
+
+    @cached_property
+    def catalog_hashes(self) -> CatalogHashes:
+        return build_catalog_hashes(self)
+
+    @cached_property
+    def search_index(self) -> UnitSearchIndex:
+        # Built on the first search against this snapshot
+        return UnitSearchIndex(self.units, keep=settings.UNIT_SEARCH_MAX_RESULTS)
+
+
+def _freeze(mapping: dict[Any, Any]) -> Mapping[Any, Any]:
+    return MappingProxyType(mapping)
+
+
+def build_registry(
+    session: Session, version: int, previous: UnitRegistry | None = None
+) -> UnitRegistry:
+    # Every relationship is loaded in one query, whatever the catalog size.
+    # selectinload would send the quantity ids in batches of 500, one query each.
+    quantities = session.exec(
+        select(PhysicalQuantity)
+        .options(
+            subqueryload(PhysicalQuantity.linear_units),  # type: ignore[arg-type]
+            subqueryload(PhysicalQuantity.functional_units),  # type: ignore[arg-type]
+            subqueryload(PhysicalQuantity.tabulated_units),  # type: ignore[arg-type]
+        )
+        .order_by(PhysicalQuantity.quantity)
+    ).all()
+    linear_units = session.exec(select(LinearUnit)).all()
+    functional_units = session.exec(select(FunctionalUnit)).all()
+    tabulated_units = session.exec(select(TabulatedUnit)).all()
+    return assemble_registry(
+        version,
+        quantities,
+        [*linear_units, *functional_units, *tabulated_units],
+        previous,
+    )
+
+
+def assemble_registry(
+    version: int,
+    quantities: Sequence[PhysicalQuantity],
+    rows: Sequence[LinearUnit | FunctionalUnit | TabulatedUnit],
+    previous: UnitRegistry | None = None,
+) -> UnitRegistry:
+    """
+    Build a snapshot from loaded rows: quantities with their unit relationships,
+    and every live unit. Split from `build_registry` so catalogs that never
+    touched the database (benchmarks) go through the same code.
+    """
+    quantity_ids_by_unit: dict[UUID, list[UUID]] = {}
+    for pq in quantities:
+        linked_units: list[LinearUnit | FunctionalUnit | TabulatedUnit] = [
+            *pq.linear_units,
+            *pq.functional_units,
+            *pq.tabulated_units,
+        ]
+        for linked in linked_units:
+            quantity_ids_by_unit.setdefault(linked.id, []).append(pq.id)
+    ordered = sorted(rows, key=lambda u: (u.value, str(u.id)))
+    units: list[RegisteredUnit] = []
+    for row in ordered:
+        quantity_ids = tuple(quantity_ids_by_unit.get(row.id, ()))
+        # Positions in the registry arrays, so skipped rows leave no gaps
+        index = len(units)
+        # Rows written before formulas and tables were validated may not compile;
+        # one of them must not take every unit endpoint down with it
+        try:
+            if isinstance(row, LinearUnit):
+                unit = RegisteredUnit(
+                    id=row.id,
+                    name=row.name,
+                    value=row.value,
+                    base=row.base,
+                    index=index,
+                    quantity_ids=quantity_ids,
+                    updatedAt=row.updatedAt,
+                    aliases=tuple(row.aliases or ()),
+                    factorToBase=row.factorToBase,
+                )
+            elif isinstance(row, TabulatedUnit):
+                unit = RegisteredUnit(
+                    id=row.id,
+                    name=row.name,
+                    value=row.value,
+                    base=row.base,
+                    index=index,
+                    quantity_ids=quantity_ids,
+                    updatedAt=row.updatedAt,
+                    aliases=tuple(row.aliases or ()),
+                    tabulated=TabulatedCurve.from_points(
+                        row.unitPoints, row.basePoints
+                    ),
+                )
+            else:
+                unit = RegisteredUnit(
+                    id=row.id,
+                    name=row.name,
+                    value=row.value,
+                    base=row.base,
+                    index=index,
+                    quantity_ids=quantity_ids,
+                    updatedAt=row.updatedAt,
+                    aliases=tuple(row.aliases or ()),
+                    toBase=row.toBase,
+                    fromBase=row.fromBase,
+                    compiled=formula_cache.get(row),
+                    folded_affine=detect_unit_affine(row.toBase, row.fromBase),
+                )
+        except (FormulaError, TableError) as e:
+            logger.warning("Skipping unit %s (%s): %s", row.value, row.id, e)
+            continue
+        units.append(unit)
+
+    registered_quantities = []
+    for pq in quantities:
+        live_linear = [u for u in pq.linear_units if not u.is_deleted]
+        live_functional = [u for u in pq.functional_units if not u.is_deleted]
+        live_tabulated = [u for u in pq.tabulated_units if not u.is_deleted]
+        live: list[LinearUnit | FunctionalUnit | TabulatedUnit] = [
+            *live_linear,
+            *live_functional,
+            *live_tabulated,
+        ]
+        # Built from plain dicts so the detached copies carry no relationships
+        read = PhysicalQuantity.Read.model_validate(
+            {
+                "id": pq.id,
+                "quantity": pq.quantity,
+                "linear_units": [u.model_dump() for u in live_linear],
+                "functional_units": [u.model_dump() for u in live_functional],
+                "tabulated_units": [u.model_dump() for u in live_tabulated],
+            }
+        )
+        registered_quantities.append(
+            RegisteredQuantity(
+                id=pq.id,
+                quantity=pq.quantity,
+                unit_ids=tuple(u.id for u in live),
+                read=read,
+            )
+        )
+
+    by_value: dict[str, RegisteredUnit] = {}
+    by_name: dict[str, RegisteredUnit] = {}
+    by_alias: dict[str, RegisteredUnit] = {}
+    for unit in units:
+        by_value.setdefault(unit.value, unit)
+        by_name.setdefault(unit.name, unit)
+        for alias in unit.aliases:
+            by_alias.setdefault(alias, unit)
+    factors = np.array(
+        [u.factorToBase if u.is_linear else np.nan for u in units], dtype=np.float64
+    )
+    factors.flags.writeable = False
+    units_by_id = {u.id: u for u in units}
+    units_by_quantity = {
+        q.id: [units_by_id[i] for i in q.unit_ids if i in units_by_id]
+        for q in registered_quantities
+    }
+    if settings.UNIT_SNAPSHOT_DIR:
+        tables = _shared_tables(
+            Path(settings.UNIT_SNAPSHOT_DIR), version, units_by_quantity
+        )
+    else:
+        tables = build_tables(
+            units_by_quantity,
+            previous.tables if previous is not None else None,
+            max_units=settings.UNIT_TABLE_MAX_UNITS,
+        )
+
+    return UnitRegistry(
+        version=version,
+        units=tuple(units),
+        quantities=tuple(registered_quantities),
+        units_by_id=_freeze(units_by_id),
+        units_by_name=_freeze(by_name),
+        units_by_value=_freeze(by_value),
+        units_by_alias=_freeze(by_alias),
+        quantities_by_id=_freeze({q.id: q for q in registered_quantities}),
+        quantities_by_name=_freeze({q.quantity: q for q in registered_quantities}),
+        factors=factors,
+        tables=_freeze(tables),
+    )
+
+
+def _shared_tables(
+    directory: Path,
+    version: int,
+    units_by_quantity: Mapping[UUID, list[RegisteredUnit]],
+) -> dict[UUID, ConversionTable]:
+    """
+    Map the tables other workers published; build and publish a new generation
+    only when some table is missing or was built from other units.
+    """
+    shared = load_tables(directory) or {}
+    tables = build_tables(
+        units_by_quantity, shared, max_units=settings.UNIT_TABLE_MAX_UNITS
+    )
+    if tables.keys() == shared.keys() and all(tables[q] is shared[q] for q in tables):
+        return tables
+    try:
+        publish_tables(directory, version, tables)
+    except OSError:
+        logger.exception("Could not publish the conversion table snapshot")
+        return tables
+    # Swap this worker's freshly built arrays for the shared mapping
+    return build_tables(
+        units_by_quantity,
+        load_tables(directory) or tables,
+        max_units=settings.UNIT_TABLE_MAX_UNITS,
+    )
+
+
+def get_catalog_version(session: Session) -> int:
+    row = session.get(CatalogVersion, 1, populate_existing=True)
+    return row.version if row else 0
+
+
+def bump_catalog_version(session: Session) -> int:
+    """Increment the catalog version in the caller's transaction; the caller commits."""
+    statement = (
+        insert(CatalogVersion)
+        .values(id=1, version=1)
+        .on_conflict_do_update(
+            index_elements=[col(CatalogVersion.id)],
+            set_={"version": col(CatalogVersion.version) + 1},
+        )
+        .returning(col(CatalogVersion.version))
+    )
+    version: int = session.execute(statement).scalar_one()
+    # Let this worker pick the new snapshot up as soon as the write is visible
+    event.listen(
+        session, "after_commit", lambda _: unit_registry.invalidate(), once=True
+    )
+    return version
+
+
+class UnitRegistryCache:
+    """Holds the current snapshot for this worker and swaps it when the version moves."""
+
+    def __init__(self) -> None:
+        self._registry: UnitRegistry | None = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def get(self, session: Session) -> UnitRegistry:
+        registry = self._registry
+        now = time.monotonic()
+        if (
+            registry is not None
+            and now - self._checked_at < settings.UNIT_REGISTRY_CHECK_INTERVAL
+        ):
+            return registry
+        version = get_catalog_version(session)
+        self._checked_at = now
+        if registry is not None and registry.version == version:
+            return registry
+        with self._lock:
+            if self._registry is None or self._registry.version != version:
+                self._registry = build_registry(session, version, self._registry)
+            return self._registry
+
+    def invalidate(self) -> None:
+        """Force a version check on the next `get`."""
+        self._checked_at = float("-inf")
+
+
+unit_registry = UnitRegistryCache()
@@ -0,0 +1,175 @@
+"""
+Autocomplete over unit names, symbols and aliases.
+
+Terms are case-folded into a trie whose every node keeps the best-ranked
+entries below it, so a prefix query is one walk down the trie. When the
+prefix alone does not fill the requested results, a bounded Levenshtein walk
+over the same trie adds near matches ("metr", "kilogam"). The index belongs
+to a registry snapshot and is rebuilt with it when the catalog version moves.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from app.units.registry import RegisteredUnit
+
+MatchKind = Literal["value", "name", "alias"]
+_KIND_ORDER = {"value": 0, "name": 1, "alias": 2}
+
+
+@dataclass(frozen=True)
+class SearchEntry:
+    term: str
+    folded: str
+    kind: MatchKind
+    unit: "RegisteredUnit"
+
+
+@dataclass(frozen=True)
+class SearchMatch:
+    entry: SearchEntry
+    # Edit distance between the query and a prefix of the term
+    distance: int
+
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        # Indexes of the best-ranked entries in this subtree, best first
+        self.top: tuple[int, ...] = ()
+
+
+def _max_distance(query: str) -> int:
+    if len(query) < 3:
+        return 0
+    return 1 if len(query) < 6 else 2
+
+
+class UnitSearchIndex:
+    def __init__(self, units: Iterable["RegisteredUnit"], keep: int) -> None:
+        entries: list[SearchEntry] = []
+        for unit in units:
+            terms: list[tuple[str, MatchKind]] = [
+                (unit.value, "value"),
+                (unit.name, "name"),
+            ]
+            terms += [(alias, "alias") for alias in unit.aliases]
+            for term, kind in terms:
+                if term:
+                    entries.append(SearchEntry(term, term.casefold(), kind, unit))
+        # Shorter terms first: "m" before "mile" for the query "m"
+        entries.sort(key=lambda e: (len(e.folded), _KIND_ORDER[e.kind], e.folded))
+        self.entries = tuple(entries)
+        self.keep = keep
+        self.root = _Node()
+        ending: dict[int, list[int]] = {}
+        for index, entry in enumerate(self.entries):
+            node = self.root
+            for char in entry.folded:
+                node = node.children.setdefault(char, _Node())
+            ending.setdefault(id(node), []).append(index)
+        self._collect(self.root, ending)
+
+    def _collect(self, node: _Node, ending: dict[int, list[int]]) -> tuple[int, ...]:
+        candidates = list(ending.get(id(node), ()))
+        for child in node.children.values():
+            candidates.extend(self._collect(child, ending))
+        # Entry indexes are already in rank order
+        node.top = tuple(sorted(candidates)[: self.keep])
+        return node.top
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _prefix_node(self, query: str) -> _Node | None:
+        node = self.root
+        for char in query:
+            next_node = node.children.get(char)
+            if next_node is None:
+                return None
+            node = next_node
+        return node
+
+    def _fuzzy(self, query: str, max_distance: int) -> dict[int, int]:
+        """
+        Entry index -> smallest edit distance from `query` to a prefix of the entry,
+        for entries starting with the same character as `query`.
+        """
+        # Typos in the first character are rare, and anchoring on it keeps the walk small
+        start = self.root.children.get(query[0])
+        if start is None:
+            return {}
+        matched: dict[int, tuple[_Node, int]] = {}
+        size = len(query)
+        too_far = max_distance + 1
+        stack = [(start, query[0], 1, list(range(size + 1)))]
+        while stack:
+            node, char, depth, previous = stack.pop()
+            # Only cells within `max_distance` of the diagonal can stay under the bound
+            row = [too_far] * (size + 1)
+            row[0] = min(depth, too_far)
+            for i in range(
+                max(1, depth - max_distance), min(size, depth + max_distance) + 1
+            ):
+                row[i] = min(
+                    row[i - 1] + 1,
+                    previous[i] + 1,
+                    previous[i - 1] + (query[i - 1] != char),
+                    too_far,
+                )
+            lowest = min(row)
+            if row[-1] <= max_distance:
+                matched[id(node)] = (node, row[-1])
+                # Deeper nodes only repeat entries of this subtree, at no smaller distance
+                if lowest >= row[-1]:
+                    continue
+            if lowest <= max_distance:
+                stack.extend(
+                    (child, c, depth + 1, row) for c, child in node.children.items()
+                )
+
+        found: dict[int, int] = {}
+        for node, distance in sorted(matched.values(), key=lambda item: item[1]):
+            for index in node.top:
+                found.setdefault(index, distance)
+        return found
+
+    def search(self, query: str, limit: int) -> list[SearchMatch]:
+        folded = query.strip().casefold()
+        if not folded or limit <= 0:
+            return []
+        distances: dict[int, int] = {}
+        node = self._prefix_node(folded)
+        if node is not None:
+            distances.update((index, 0) for index in node.top)
+        max_distance = _max_distance(folded)
+        if len(distances) < limit and max_distance:
+            for index, distance in self._fuzzy(folded, max_distance).items():
+                distances.setdefault(index, distance)
+
+        stripped = query.strip()
+        ranked = sorted(
+            distances.items(),
+            key=lambda item: (
+                item[1],
+                # Exact matches first, case-sensitive ones ("Mm" vs "mm") before the rest
+                self.entries[item[0]].term != stripped,
+                self.entries[item[0]].folded != folded,
+                item[0],
+            ),
+        )
+        matches: list[SearchMatch] = []
+        seen = set()
+        for index, distance in ranked:
+            entry = self.entries[index]
+            if entry.unit.id in seen:
+                continue
+            seen.add(entry.unit.id)
+            matches.append(SearchMatch(entry, distance))
+            if len(matches) == limit:
+                break
+        return matches
@@ -0,0 +1,134 @@
+"""
+Conversion tables shared by every worker on a host through memory-mapped files.
+
+The all-pairs tables are the largest part of a registry snapshot. Instead of
+each uvicorn worker holding its own copy, one worker writes them to a
+generation in `UNIT_SNAPSHOT_DIR` and every worker maps that file read-only,
+so the pages live once in the page cache however many workers there are.
+
+A generation is a flat float64 `.npy` file holding every table's scale and
+offset matrices, plus a JSON manifest giving each table's position and
+signature. Files are written under temporary names and renamed into place,
+and the `CURRENT` pointer is replaced last, so readers only ever see complete
+generations. Tables are reused by signature, so a worker never maps tables
+built from a different catalog state than its own.
+
+The directory is created with mode 0700, and a directory that is not owned by
+the worker's user, or that others can write to, is neither written nor read:
+anyone able to drop files there could otherwise feed every worker its tables.
+"""
+
+import json
+import os
+import stat
+import tempfile
+import uuid
+from collections.abc import Callable, Mapping
+from pathlib import Path
+from types import MappingProxyType
+from typing import BinaryIO
+from uuid import UUID
+
+import numpy as np
+
+from app.units.tables import ConversionTable, TableSignature
+
+CURRENT = "CURRENT"
+# Generations kept on disk besides the current one, for workers still mapping them
+KEEP_GENERATIONS = 2
+
+
+def _check_directory(directory: Path) -> None:
+    info = directory.stat()
+    if info.st_uid != os.getuid() or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(
+            f"{directory} must be owned by the current user and writable by it alone"
+        )
+
+
+def _write_atomically(path: Path, write: Callable[[BinaryIO], object]) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def publish_tables(
+    directory: Path, version: int, tables: Mapping[UUID, ConversionTable]
+) -> str:
+    """Write `tables` as a new generation and make it current; returns its name."""
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    _check_directory(directory)
+    generation = f"{version:012d}-{uuid.uuid4().hex[:12]}"
+    entries = []
+    starts = []
+    start = 0
+    for table in tables.values():
+        entries.append(
+            {
+                "quantity_id": str(table.quantity_id),
+                "signature": [[str(i), s, o] for i, s, o in table.signature],
+                "start": start,
+            }
+        )
+        starts.append(start)
+        start += 2 * len(table) ** 2
+    data = np.empty(start, dtype=np.float64)
+    for start, table in zip(starts, tables.values(), strict=True):
+        size = len(table) ** 2
+        data[start : start + size] = table.scale.ravel()
+        data[start + size : start + 2 * size] = table.offset.ravel()
+
+    manifest = {"version": version, "data": f"{generation}.npy", "tables": entries}
+    _write_atomically(directory / f"{generation}.npy", lambda f: np.save(f, data))
+    _write_atomically(
+        directory / f"{generation}.json",
+        lambda f: f.write(json.dumps(manifest).encode()),
+    )
+    _write_atomically(directory / CURRENT, lambda f: f.write(generation.encode()))
+    _remove_old_generations(directory, generation)
+    return generation
+
+
+def _remove_old_generations(directory: Path, current: str) -> None:
+    manifests = sorted(directory.glob("*.json"), key=lambda p: p.name, reverse=True)
+    for manifest in manifests[KEEP_GENERATIONS + 1 :]:
+        if manifest.stem == current:
+            continue
+        # Workers that still map the data keep it alive until they unmap it
+        for path in (manifest, manifest.with_suffix(".npy")):
+            path.unlink(missing_ok=True)
+
+
+def load_tables(directory: Path) -> dict[UUID, ConversionTable] | None:
+    """Map the current generation read-only, or None if there is none yet."""
+    try:
+        _check_directory(directory)
+        generation = (directory / CURRENT).read_text().strip()
+        manifest = json.loads((directory / f"{generation}.json").read_text())
+        data = np.load(directory / manifest["data"], mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+    tables = {}
+    for entry in manifest["tables"]:
+        signature: TableSignature = tuple(
+            (UUID(i), float(s), float(o)) for i, s, o in entry["signature"]
+        )
+        n = len(signature)
+        start = entry["start"]
+        quantity_id = UUID(entry["quantity_id"])
+        tables[quantity_id] = ConversionTable(
+            quantity_id=quantity_id,
+            signature=signature,
+            positions=MappingProxyType({e[0].int: i for i, e in enumerate(signature)}),
+            scale=data[start : start + n * n].reshape(n, n),
+            offset=data[start + n * n : start + 2 * n * n].reshape(n, n),
+        )
+    return tables
@@ -0,0 +1,183 @@
+"""
+Chunked conversion of one column of a CSV or NDJSON stream.
+
+Input lines are grouped into batches of a fixed number of rows; each batch is
+parsed, its column converted in one vectorized call and written back out
+before the next batch is read, so memory use does not depend on the size of
+the stream. Parsing and conversion run in the thread pool, so a large batch
+does not hold up the event loop. Empty CSV cells and missing or null NDJSON
+values pass through unchanged. CSV fields must not contain line breaks.
+
+Once the first batch is out, an error can no longer become an error response:
+the stream ends with an error record instead (see `csv_error` and
+`ndjson_error`), so a client can tell a failed conversion from a short file.
+"""
+
+import csv
+import io
+import math
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+import numpy as np
+from pydantic_core import from_json, to_json
+from starlette.concurrency import run_in_threadpool
+
+ConvertValues = Callable[[np.ndarray], np.ndarray]
+
+# First field of the row a CSV stream ends with when it fails part way
+CSV_ERROR_MARKER = "#error"
+
+
+class StreamFormatError(ValueError):
+    pass
+
+
+async def iter_line_batches(
+    chunks: AsyncIterator[bytes], rows: int, max_line_bytes: int
+) -> AsyncIterator[list[bytes]]:
+    """Regroup arbitrary byte chunks into batches of at most `rows` complete lines."""
+    buffer = b""
+    pending: list[bytes] = []
+    async for chunk in chunks:
+        buffer += chunk
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        if len(buffer) > max_line_bytes or any(
+            len(line) > max_line_bytes for line in lines
+        ):
+            raise StreamFormatError(
+                f"Lines must be at most {max_line_bytes} bytes long"
+            )
+        pending.extend(lines)
+        while len(pending) >= rows:
+            yield pending[:rows]
+            pending = pending[rows:]
+    if buffer:
+        pending.append(buffer)
+    if pending:
+        yield pending
+
+
+def _decode(lines: list[bytes]) -> list[str]:
+    try:
+        return [text for line in lines if (text := line.decode().rstrip("\r"))]
+    except UnicodeDecodeError as e:
+        raise StreamFormatError(f"Input is not valid UTF-8: {e}")
+
+
+def _parse_float(value: object, row: int) -> float:
+    if value is None or value == "":
+        return math.nan
+    try:
+        return float(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        raise StreamFormatError(f"Row {row}: '{value}' is not a number")
+
+
+def _convert_csv_rows(
+    rows: list[list[str]],
+    index: int,
+    column: str,
+    first_row: int,
+    convert: ConvertValues,
+) -> list[list[str]]:
+    values = np.empty(len(rows), dtype=np.float64)
+    for i, row in enumerate(rows):
+        if index >= len(row):
+            raise StreamFormatError(f"Row {first_row + i}: missing column '{column}'")
+        values[i] = _parse_float(row[index], first_row + i)
+    for row, value in zip(rows, convert(values).tolist(), strict=True):
+        # Empty cells stay empty; anything else, "nan" included, is written back
+        if row[index] != "":
+            row[index] = repr(value)
+    return rows
+
+
+def _convert_csv_batch(
+    lines: list[bytes],
+    index: int | None,
+    column: str,
+    first_row: int,
+    convert: ConvertValues,
+) -> tuple[bytes, int | None, int]:
+    rows = list(csv.reader(_decode(lines)))
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    if index is None:
+        if not rows:
+            return b"", None, 0
+        header = rows.pop(0)
+        if column not in header:
+            raise StreamFormatError(f"Column '{column}' not found in the CSV header")
+        index = header.index(column)
+        writer.writerow(header)
+    writer.writerows(_convert_csv_rows(rows, index, column, first_row, convert))
+    return out.getvalue().encode(), index, len(rows)
+
+
+async def convert_csv(
+    batches: AsyncIterator[list[bytes]], column: str, convert: ConvertValues
+) -> AsyncIterator[bytes]:
+    index: int | None = None
+    row_number = 1
+    async for lines in batches:
+        out, index, converted = await run_in_threadpool(
+            _convert_csv_batch, lines, index, column, row_number, convert
+        )
+        row_number += converted
+        if out:
+            yield out
+
+
+def _convert_ndjson_batch(
+    lines: list[bytes], column: str, first_row: int, convert: ConvertValues
+) -> tuple[bytes, int]:
+    records: list[dict[str, Any]] = []
+    values: list[float] = []
+    for line in lines:
+        if not line.strip():
+            continue
+        row_number = first_row + len(records)
+        try:
+            record = from_json(line)
+        except ValueError as e:
+            raise StreamFormatError(f"Row {row_number}: invalid JSON ({e})")
+        if not isinstance(record, dict):
+            raise StreamFormatError(f"Row {row_number}: expected a JSON object")
+        records.append(record)
+        values.append(_parse_float(record.get(column), row_number))
+    out = bytearray()
+    converted = convert(np.array(values, dtype=np.float64)).tolist()
+    for record, value in zip(records, converted, strict=True):
+        if record.get(column) is not None:
+            record[column] = value
+        # JSON has no NaN or infinity; they are written as null
+        out += to_json(record, inf_nan_mode="null")
+        out += b"\n"
+    return bytes(out), len(records)
+
+
+async def convert_ndjson(
+    batches: AsyncIterator[list[bytes]], column: str, convert: ConvertValues
+) -> AsyncIterator[bytes]:
+    row_number = 1
+    async for lines in batches:
+        out, converted = await run_in_threadpool(
+            _convert_ndjson_batch, lines, column, row_number, convert
+        )
+        row_number += converted
+        if out:
+            yield out
+
+
+def csv_error(message: str) -> bytes:
+    """The row a CSV stream ends with when its conversion fails part way."""
+    out = io.StringIO()
+    csv.writer(out, lineterminator="\n").writerow([CSV_ERROR_MARKER, message])
+    return out.getvalue().encode()
+
+
+def ndjson_error(message: str) -> bytes:
+    """The record an NDJSON stream ends with when its conversion fails part way."""
+    return to_json({"error": message}) + b"\n"
@@ -0,0 +1,108 @@
+"""
+Precomputed all-pairs conversion tables, one per physical quantity.
+
+For every unit of a quantity that converts to its base as `base = s * x + o`
+(all linear units, `o == 0`), the table stores the coefficients of the direct
+conversion between each pair, so converting `x` from unit i to unit j is
+`scale[i, j] * x + offset[i, j]` with no detour through the base unit.
+"""
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from app.units.registry import RegisteredUnit
+
+# Identifies the content of a table: unit ids with their base coefficients
+TableSignature = tuple[tuple[UUID, float, float], ...]
+
+
+@dataclass(frozen=True)
+class ConversionTable:
+    quantity_id: UUID
+    signature: TableSignature
+    # Keyed by `UUID.int`: hashing a UUID object goes through Python code
+    positions: Mapping[int, int]
+    scale: np.ndarray = field(compare=False, repr=False)
+    offset: np.ndarray = field(compare=False, repr=False)
+    # Row-major (a, b) pairs as Python floats; indexing NumPy per scalar lookup is
+    # slower. None for tables mapped from a shared snapshot, which stay in NumPy.
+    pairs: tuple[tuple[tuple[float, float], ...], ...] | None = field(
+        default=None, compare=False, repr=False
+    )
+
+    def lookup(self, source_id: UUID, target_id: UUID) -> tuple[float, float] | None:
+        i = self.positions.get(source_id.int)
+        j = self.positions.get(target_id.int)
+        if i is None or j is None:
+            return None
+        if self.pairs is None:
+            return float(self.scale[i, j]), float(self.offset[i, j])
+        return self.pairs[i][j]
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+
+def table_signature(units: Iterable["RegisteredUnit"]) -> TableSignature:
+    signature = []
+    for unit in units:
+        affine = unit.affine
+        if affine is not None:
+            signature.append((unit.id, float(affine.scale), float(affine.offset)))
+    return tuple(signature)
+
+
+def build_table(quantity_id: UUID, signature: TableSignature) -> ConversionTable:
+    s = np.array([entry[1] for entry in signature], dtype=np.float64)
+    o = np.array([entry[2] for entry in signature], dtype=np.float64)
+    # y = (s_i * x + o_i - o_j) / s_j
+    scale = s[:, np.newaxis] / s[np.newaxis, :]
+    offset = (o[:, np.newaxis] - o[np.newaxis, :]) / s[np.newaxis, :]
+    scale.flags.writeable = False
+    offset.flags.writeable = False
+    return ConversionTable(
+        quantity_id=quantity_id,
+        signature=signature,
+        positions=MappingProxyType(
+            {entry[0].int: i for i, entry in enumerate(signature)}
+        ),
+        scale=scale,
+        offset=offset,
+        pairs=tuple(
+            tuple(zip(scale_row, offset_row, strict=True))
+            for scale_row, offset_row in zip(
+                scale.tolist(), offset.tolist(), strict=True
+            )
+        ),
+    )
+
+
+def build_tables(
+    units_by_quantity: Mapping[UUID, Iterable["RegisteredUnit"]],
+    previous: Mapping[UUID, ConversionTable] | None = None,
+    max_units: int | None = None,
+) -> dict[UUID, ConversionTable]:
+    """
+    Build the tables of every quantity, reusing those of `previous` whose units
+    did not change, so adding a unit only recomputes the table of its quantity.
+    Quantities with more than `max_units` affine units get no table: its size
+    grows with the square of the unit count, and their conversions compose the
+    two affine maps instead.
+    """
+    previous = previous or {}
+    tables = {}
+    for quantity_id, units in units_by_quantity.items():
+        signature = table_signature(units)
+        if not signature or (max_units is not None and len(signature) > max_units):
+            continue
+        table = previous.get(quantity_id)
+        if table is None or table.signature != signature:
+            table = build_table(quantity_id, signature)
+        tables[quantity_id] = table
+    return tables
@@ -0,0 +1,73 @@
+"""
+Tabulated units: conversions given by a calibration table rather than a formula.
+
+A table is a list of breakpoints `(unitPoints[i], basePoints[i])`, sorted by
+`unitPoints` and strictly monotonic in `basePoints` so it can be inverted.
+Values between breakpoints are interpolated linearly; `np.interp` finds the
+segment of every value by binary search over the breakpoints, so a whole
+batch converts in one vectorized call. Values outside the table are rejected
+rather than clamped to its ends.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+class TableError(ValueError):
+    pass
+
+
+def _readonly(points: Sequence[float]) -> np.ndarray:
+    array = np.array(points, dtype=np.float64)
+    array.flags.writeable = False
+    return array
+
+
+def validate_table(unit_points: Sequence[float], base_points: Sequence[float]) -> None:
+    if len(unit_points) != len(base_points):
+        raise TableError("unitPoints and basePoints must have the same length")
+    if len(unit_points) < 2:
+        raise TableError("A table needs at least two breakpoints")
+    units = np.asarray(unit_points, dtype=np.float64)
+    bases = np.asarray(base_points, dtype=np.float64)
+    if not (np.isfinite(units).all() and np.isfinite(bases).all()):
+        raise TableError("Breakpoints must be finite numbers")
+    if not (np.diff(units) > 0).all():
+        raise TableError("unitPoints must be strictly increasing")
+    steps = np.diff(bases)
+    if not ((steps > 0).all() or (steps < 0).all()):
+        raise TableError(
+            "basePoints must be strictly increasing or strictly decreasing"
+        )
+
+
+@dataclass(frozen=True)
+class TabulatedCurve:
+    unit_points: np.ndarray = field(repr=False)
+    base_points: np.ndarray = field(repr=False)
+
+    @classmethod
+    def from_points(
+        cls, unit_points: Sequence[float], base_points: Sequence[float]
+    ) -> "TabulatedCurve":
+        validate_table(unit_points, base_points)
+        return cls(_readonly(unit_points), _readonly(base_points))
+
+    def _interp(self, values: np.ndarray, xp: np.ndarray, fp: np.ndarray) -> np.ndarray:
+        if xp[0] > xp[-1]:
+            xp, fp = xp[::-1], fp[::-1]
+        values = np.asarray(values, dtype=np.float64)
+        if values.size and (values.min() < xp[0] or values.max() > xp[-1]):
+            raise TableError(
+                f"Values must lie within the table range [{xp[0]:g}, {xp[-1]:g}]"
+            )
+        interpolated: np.ndarray = np.interp(values, xp, fp)
+        return interpolated
+
+    def to_base(self, values: np.ndarray) -> np.ndarray:
+        return self._interp(values, self.unit_points, self.base_points)
+
+    def from_base(self, values: np.ndarray) -> np.ndarray:
+        return self._interp(values, self.base_points, self.unit_points)